@@ -0,0 +1,287 @@
+"""algo.dedup
+
+近重复新闻检测：通稿被多家媒体转载时，正文只差来源、标点或个别字句，
+对其中一篇调用 LLM 生成摘要后，其余篇目直接复用摘要与关键词。
+
+两种签名（均基于清洗后正文的字符 k-gram）：
+    * minhash ：MinHash + LSH 分桶，相似度为估计的 Jaccard；适合阈值 0.6~0.95；
+    * simhash ：64 位 SimHash + 置换表索引，相似度为 1 - 汉明距离/64；内存更省，只支持高阈值（约 ≥ 0.9）。
+
+`NearDupIndex` 增量插入，按 LRU 淘汰，条目数不超过 `capacity`，内存与处理总量无关。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from itertools import combinations
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+_TAG_RE = re.compile(r"<[^>]+>|&[a-z]+;")
+_NOISE_RE = re.compile(r"[\s\W_]+", re.UNICODE)
+
+_PRIME = (1 << 61) - 1
+_MASK32 = (1 << 32) - 1
+
+METHODS = ("minhash", "simhash")
+
+SIMHASH_MIN_KEY_BITS = 16  # 每张表的查询键至少 16 位，随机签名误入同桶的概率 ≤ 2^-16
+SIMHASH_MAX_TABLES = 32
+
+
+def normalize(text: str) -> str:
+    """去 HTML、空白与标点并转小写，只保留影响语义的字符。"""
+    return _NOISE_RE.sub("", _TAG_RE.sub("", text or "")).lower()
+
+
+def shingles(text: str, k: int = 3) -> Set[str]:
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i: i + k] for i in range(len(text) - k + 1)}
+
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# ----------------------------- SimHash ----------------------------- #
+def simhash(features: Iterable[str], bits: int = 64) -> int:
+    weights = [0] * bits
+    for feature in features:
+        h = _h64(feature)
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, w in enumerate(weights) if w > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def simhash_tables(
+    max_dist: int,
+    bits: int = 64,
+    *,
+    min_key_bits: int = SIMHASH_MIN_KEY_BITS,
+    max_tables: int = SIMHASH_MAX_TABLES,
+) -> Tuple[List[Tuple[int, int]], List[Tuple[int, ...]]]:
+    """置换表布局：签名切成 n 块，每张表取其中 n-k 块拼成查询键。
+
+    汉明距离 ≤ k 时至多 k 块不同，必有一张表的键完全相同。取键宽 ≥ min_key_bits 的最小 n
+    （表数 C(n, k) 随 n 单调增）；表数超过 max_tables 说明阈值过低，直接拒绝。
+    返回 ([(位移, 掩码)] 各块, [块下标组合] 各表)。
+    """
+    for n in range(max_dist + 1, bits + 1):
+        base, extra = divmod(bits, n)
+        widths = [base + 1 if i < extra else base for i in range(n)]
+        if sum(sorted(widths)[: n - max_dist]) < min_key_bits:
+            continue
+        tables = list(combinations(range(n), n - max_dist))
+        if len(tables) > max_tables:
+            break
+        shifts = [sum(widths[:i]) for i in range(n)]
+        return [(sh, (1 << w) - 1) for sh, w in zip(shifts, widths)], tables
+    raise ValueError(
+        f"simhash 汉明距离上限 {max_dist} 过大，无法在 {max_tables} 张表内保证键宽 ≥ {min_key_bits} 位；"
+        "请提高阈值（约 ≥ 0.9）或改用 minhash"
+    )
+
+
+# ----------------------------- MinHash ----------------------------- #
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        hv = [_h64(f) & _MASK32 for f in features]
+        if not hv:
+            return tuple([_MASK32] * self.num_perm)
+        return tuple(min(((a * x + b) % _PRIME) & _MASK32 for x in hv) for a, b in self._perms)
+
+
+def jaccard_estimate(a: Sequence[int], b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """选 (bands, rows)，使 S 曲线拐点 (1/b)^(1/r) 最接近阈值。"""
+    best, best_err = (1, num_perm), float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+# ----------------------------- 索引 ----------------------------- #
+@dataclass
+class NearDupMatch:
+    key: Hashable
+    similarity: float
+    payload: Any
+
+
+@dataclass
+class DedupStats:
+    seen: int = 0
+    duplicates: int = 0
+    saved_calls: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.duplicates / self.seen if self.seen else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "ratio": round(self.ratio, 4)}
+
+
+class NearDupIndex:
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.8,
+        method: str = "minhash",
+        capacity: int = 10_000,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold 须在 (0, 1] 区间")
+        if method not in METHODS:
+            raise ValueError(f"未知的去重方法: {method}，可选 {METHODS}")
+        self.threshold = threshold
+        self.method = method
+        self.capacity = capacity
+        self.shingle_size = shingle_size
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()  # key -> (sig, payload)
+        self._buckets: Dict[Tuple[int, Any], Set[Hashable]] = {}
+        if method == "minhash":
+            self._hasher = MinHasher(num_perm, seed)
+            self._bands, self._rows = lsh_params(threshold, num_perm)
+        else:
+            self._max_dist = int((1 - threshold) * 64)
+            self._blocks, self._tables = simhash_tables(self._max_dist)
+        self.stats = DedupStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> Any:
+        feats = shingles(normalize(text), self.shingle_size)
+        if self.method == "minhash":
+            return self._hasher.signature(feats)
+        return simhash(feats)
+
+    def _band_keys(self, sig: Any) -> List[Tuple[int, Any]]:
+        if self.method == "minhash":
+            r = self._rows
+            return [(i, sig[i * r: (i + 1) * r]) for i in range(self._bands)]
+        blocks = [(sig >> shift) & mask for shift, mask in self._blocks]
+        return [(t, tuple(blocks[j] for j in table)) for t, table in enumerate(self._tables)]
+
+    def _similarity(self, a: Any, b: Any) -> float:
+        if self.method == "minhash":
+            return jaccard_estimate(a, b)
+        return 1 - hamming(a, b) / 64
+
+    def _candidates(self, sig: Any) -> Set[Hashable]:
+        candidates: Set[Hashable] = set()
+        for band in self._band_keys(sig):
+            candidates |= self._buckets.get(band, set())
+        return candidates
+
+    def find(self, text: str, sig: Any = None) -> Optional[NearDupMatch]:
+        """返回相似度最高且 ≥ threshold 的已索引条目。"""
+        if not normalize(text):
+            return None
+        sig = self.signature(text) if sig is None else sig
+        best: Optional[NearDupMatch] = None
+        for key in self._candidates(sig):
+            other, payload = self._entries[key]
+            sim = self._similarity(sig, other)
+            if sim >= self.threshold and (best is None or sim > best.similarity):
+                best = NearDupMatch(key, sim, payload)
+        if best is not None:
+            self._entries.move_to_end(best.key)
+        return best
+
+    def add(self, key: Hashable, text: str, payload: Any = None, sig: Any = None) -> None:
+        if not normalize(text):
+            return
+        if key in self._entries:
+            self._remove(key)
+        sig = self.signature(text) if sig is None else sig
+        self._entries[key] = (sig, payload)
+        for band in self._band_keys(sig):
+            self._buckets.setdefault(band, set()).add(key)
+        while len(self._entries) > self.capacity:
+            self._remove(next(iter(self._entries)))
+
+    def update(self, key: Hashable, payload: Any) -> None:
+        if key in self._entries:
+            sig, _ = self._entries[key]
+            self._entries[key] = (sig, payload)
+
+    def discard(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        sig, _ = self._entries.pop(key)
+        for band in self._band_keys(sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+
+@dataclass
+class BatchPlan:
+    """`copied`：已有结果可直接复用的位置；`leaders`：需调用 LLM 的位置；
+    `followers`：与同批 leader 近重复的位置 -> leader 位置，待 leader 完成后复用其结果。"""
+
+    copied: Dict[int, Any] = field(default_factory=dict)
+    leaders: List[int] = field(default_factory=list)
+    followers: Dict[int, int] = field(default_factory=dict)
+
+    def resolve(self, leader_results: Dict[int, Any]) -> List[Any]:
+        n = len(self.copied) + len(self.leaders) + len(self.followers)
+        out: List[Any] = [None] * n
+        for i, payload in self.copied.items():
+            out[i] = payload
+        for i in self.leaders:
+            out[i] = leader_results.get(i)
+        for i, leader in self.followers.items():
+            out[i] = leader_results.get(leader)
+        return out
+
+
+def plan_batch(index: NearDupIndex, keys: Sequence[Hashable], texts: Sequence[str]) -> BatchPlan:
+    """按序查询索引；未命中者作为 leader 先以空 payload 入索引，以便同批后续近重复挂靠。"""
+    plan = BatchPlan()
+    leader_of: Dict[Hashable, int] = {}
+    for i, (key, text) in enumerate(zip(keys, texts)):
+        index.stats.seen += 1
+        sig = index.signature(text) if normalize(text) else None
+        match = index.find(text, sig) if sig is not None else None
+        if match is not None and match.payload is not None:
+            plan.copied[i] = match.payload
+        elif match is not None and match.key in leader_of:
+            plan.followers[i] = leader_of[match.key]
+        else:
+            plan.leaders.append(i)
+            leader_of[key] = i
+            if sig is not None:
+                index.add(key, text, None, sig)
+            continue
+        index.stats.duplicates += 1
+        index.stats.saved_calls += 1
+    return plan
@@ -0,0 +1,292 @@
+"""algo.keywords
+
+LLM 输出关键词的后处理：全角 / 半角归一、停用词与广告词过滤、去重。
+
+    * 停用词：归一后整词命中即丢弃（“新闻”“记者”“近日”……）；
+    * 广告短语：关键词中 *包含* 任一短语即丢弃（“关注公众号”“领取优惠券”……），只收确定是引流话术的短语；
+    * 广告词：“推广”“团购”“广告”等也常见于正常主题词（“社区团购”“广告行业”），仅整词命中时丢弃；
+    * 去重：按归一形式去重，保留首次出现的顺序；
+    * 长度：默认只限制上限 `max_len`，单字关键词（“锂”“铜”）保留；需要时可设 `min_len`。
+
+三类词表编译进同一个 Aho-Corasick 自动机，一次扫描同时判定。自动机以扁平数组序列化为
+二进制文件（按词表内容哈希命名，只编译一次），各 worker 进程以 mmap 只读映射同一文件，
+物理内存在进程间共享，进程启动时也无需重新构建。
+
+词表为 UTF-8 文本，每行一个词，`#` 开头为注释；通过 `KEYWORD_STOPWORDS` / `KEYWORD_AD_TERMS`
+指定文件路径（可用 `os.pathsep` 分隔多个），与内置的 `BASE_STOPWORDS` / `BASE_AD_TERMS` 合并；
+外部广告词表按短语（包含即命中）处理。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+STOP = 1
+AD = 2  # 包含即命中
+AD_WORD = 4  # 整词命中
+
+BASE_STOPWORDS = [
+    "新闻", "记者", "报道", "消息", "本文", "文章", "来源", "编辑", "责任编辑", "通讯员",
+    "今天", "昨天", "近日", "日前", "目前", "当前", "今年", "去年", "日前消息",
+    "表示", "认为", "指出", "介绍", "进行", "相关", "方面", "情况", "问题", "工作",
+    "其他", "以及", "我们", "他们", "大家", "一个", "没有", "可以", "已经",
+]
+BASE_AD_TERMS = [
+    "扫码领取", "扫码关注", "加微信", "关注公众号", "点击链接", "阅读原文", "领取优惠券",
+    "限时优惠", "免费领取", "领取红包", "下载app", "客服电话", "咨询热线",
+]
+BASE_AD_WORDS = [
+    "扫码", "二维码", "微信号", "公众号", "优惠券", "抽奖", "广告", "推广", "赞助",
+    "包邮", "秒杀", "促销", "团购", "直播间",
+]
+
+_SPACE_RE = re.compile(r"\s+")
+_TRIM = "\"'“”‘’「」『』【】《》〈〉()（）[]{}<>#＃*·•、,，。.!！?？:：;；~～-—_|/\\"
+_MAGIC = b"KWAC\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sII")  # magic, 状态数, 边数
+
+
+def normalize_keyword(keyword: str) -> str:
+    """NFKC（全角字母数字标点转半角）、压缩空白并去掉首尾的引号括号等符号；保留大小写。"""
+    text = unicodedata.normalize("NFKC", keyword or "")
+    return _SPACE_RE.sub(" ", text).strip().strip(_TRIM).strip()
+
+
+def _match_key(keyword: str) -> str:
+    """匹配与去重用的键：归一后再转小写。"""
+    return normalize_keyword(keyword).lower()
+
+
+def read_lexicon(path: str | os.PathLike) -> List[str]:
+    """mmap 读取词表文件，返回匹配键形式的词（跳过空行与 # 注释）。"""
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines = mm[:].decode("utf-8").splitlines()
+    words = (_match_key(line) for line in lines if not line.lstrip().startswith("#"))
+    return [w for w in words if w]
+
+
+# ------------------- 自动机 ------------------- #
+def _build(patterns: Iterable[Tuple[str, int]]) -> Dict[str, array]:
+    """构建 trie + 失败指针，返回扁平数组：状态 s 的出边为 edge_char / edge_target[edge_start[s]:edge_start[s+1]]，
+    按字符码升序排列以便二分查找。"""
+    children: List[Dict[int, int]] = [{}]
+    own: List[int] = [0]
+    depth: List[int] = [0]
+    for word, flag in patterns:
+        state = 0
+        for ch in word:
+            code = ord(ch)
+            nxt = children[state].get(code)
+            if nxt is None:
+                nxt = len(children)
+                children[state][code] = nxt
+                children.append({})
+                own.append(0)
+                depth.append(depth[state] + 1)
+            state = nxt
+        own[state] |= flag
+
+    n = len(children)
+    fail = [0] * n
+    out = list(own)
+    queue = deque(children[0].values())
+    while queue:
+        state = queue.popleft()
+        out[state] |= out[fail[state]]
+        for code, nxt in children[state].items():
+            f = fail[state]
+            while f and code not in children[f]:
+                f = fail[f]
+            fail[nxt] = children[f].get(code, 0)
+            queue.append(nxt)
+
+    edge_start, edge_char, edge_target = array("i", [0]), array("i"), array("i")
+    for state in range(n):
+        for code in sorted(children[state]):
+            edge_char.append(code)
+            edge_target.append(children[state][code])
+        edge_start.append(len(edge_char))
+    return {
+        "edge_start": edge_start,
+        "edge_char": edge_char,
+        "edge_target": edge_target,
+        "fail": array("i", fail),
+        "depth": array("i", depth),
+        "own": array("i", own),
+        "out": array("i", out),
+    }
+
+
+_FIELDS = ("edge_start", "edge_char", "edge_target", "fail", "depth", "own", "out")
+
+
+def compile_lexicons(
+    stopwords: Iterable[str],
+    ad_terms: Iterable[str],
+    path: str | os.PathLike,
+    ad_words: Iterable[str] = (),
+) -> Path:
+    """把各类词表编译为自动机二进制文件（先写临时文件再原子替换，多进程并发编译也安全）。"""
+    patterns = [(w, STOP) for w in stopwords] + [(w, AD) for w in ad_terms] + [(w, AD_WORD) for w in ad_words]
+    arrays = _build((_match_key(w), f) for w, f in patterns if _match_key(w))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(_HEADER.pack(_MAGIC, len(arrays["fail"]), len(arrays["edge_char"])))
+        for name in _FIELDS:
+            arrays[name].tofile(fp)
+    os.replace(tmp, path)
+    return path
+
+
+class CompiledLexicon:
+    """只读映射编译好的自动机文件；各数组为 mmap 上的 memoryview，不复制数据。"""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with open(self.path, "rb") as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_states, n_edges = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} 不是关键词自动机文件")
+        sizes = {"edge_start": n_states + 1, "edge_char": n_edges, "edge_target": n_edges}
+        view = memoryview(self._mm)
+        offset = _HEADER.size
+        for name in _FIELDS:
+            size = sizes.get(name, n_states) * 4
+            setattr(self, name, view[offset: offset + size].cast("i"))
+            offset += size
+        self.n_states = n_states
+
+    def _goto(self, state: int, code: int) -> int:
+        lo, hi = self.edge_start[state], self.edge_start[state + 1]
+        i = bisect_left(self.edge_char, code, lo, hi)
+        if i < hi and self.edge_char[i] == code:
+            return self.edge_target[i]
+        return -1
+
+    def scan(self, text: str) -> int:
+        """text 需为匹配键形式；返回标志位：STOP / AD_WORD 表示整词是停用词 / 广告词，AD 表示包含广告短语。"""
+        state = 0
+        flags = 0
+        for ch in text:
+            code = ord(ch)
+            nxt = self._goto(state, code)
+            while nxt < 0 and state:
+                state = self.fail[state]
+                nxt = self._goto(state, code)
+            state = max(nxt, 0)
+            flags |= self.out[state] & AD
+        if self.depth[state] == len(text):
+            flags |= self.own[state] & (STOP | AD_WORD)
+        return flags
+
+
+# ------------------- 过滤器 ------------------- #
+@dataclass
+class KeywordFilterStats:
+    seen: int = 0
+    kept: int = 0
+    stopword: int = 0
+    ad: int = 0
+    duplicate: int = 0
+    invalid: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class KeywordFilter:
+    """线程安全；`clean` 为唯一入口，统计见 `stats`。"""
+
+    def __init__(self, lexicon: CompiledLexicon, *, min_len: int = 1, max_len: int = 20):
+        self.lexicon = lexicon
+        self.min_len = min_len
+        self.max_len = max_len
+        self.stats = KeywordFilterStats()
+        self._lock = threading.Lock()
+
+    def _valid(self, kw: str) -> bool:
+        if not self.min_len <= len(kw) <= self.max_len:
+            return False
+        return any(ch.isalpha() for ch in kw)  # 纯数字 / 纯符号不是主题词
+
+    def clean(self, keywords: Sequence[str] | None) -> List[str]:
+        """返回归一、过滤、去重后的关键词，保持原有顺序。"""
+        kept: List[str] = []
+        seen: set[str] = set()
+        counts = KeywordFilterStats(seen=len(keywords or ()))
+        for raw in keywords or ():
+            kw = normalize_keyword(raw) if isinstance(raw, str) else ""
+            if not self._valid(kw):
+                counts.invalid += 1
+                continue
+            key = kw.lower()
+            if key in seen:
+                counts.duplicate += 1
+                continue
+            flags = self.lexicon.scan(key)
+            if flags & (AD | AD_WORD):
+                counts.ad += 1
+            elif flags & STOP:
+                counts.stopword += 1
+            else:
+                seen.add(key)
+                kept.append(kw)
+        counts.kept = len(kept)
+        with self._lock:
+            for name, value in counts.as_dict().items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+        return kept
+
+
+def _lexicon_paths(env: str) -> List[str]:
+    return [p for p in os.getenv(env, "").split(os.pathsep) if p]
+
+
+def build_keyword_filter(
+    stop_paths: Sequence[str] = (),
+    ad_paths: Sequence[str] = (),
+    *,
+    cache_dir: str | os.PathLike | None = None,
+    **kwargs,
+) -> KeywordFilter:
+    """合并内置词表与外部词表，按内容哈希复用已编译的自动机文件（不存在时编译）。"""
+    stopwords = sorted({*BASE_STOPWORDS, *(w for p in stop_paths for w in read_lexicon(p))})
+    ad_terms = sorted({*BASE_AD_TERMS, *(w for p in ad_paths for w in read_lexicon(p))})
+    ad_words = sorted(BASE_AD_WORDS)
+    lists = stopwords + ["\0"] + ad_terms + ["\0"] + ad_words
+    digest = hashlib.sha1("\n".join(lists).encode("utf-8")).hexdigest()[:16]
+    cache_dir = Path(cache_dir or os.getenv("KEYWORD_LEXICON_CACHE") or Path(tempfile.gettempdir()) / "news-keywords")
+    path = cache_dir / f"lexicon-{digest}.bin"
+    if not path.exists():
+        compile_lexicons(stopwords, ad_terms, path, ad_words)
+    return KeywordFilter(CompiledLexicon(path), **kwargs)
+
+
+@lru_cache(maxsize=1)
+def get_keyword_filter() -> KeywordFilter:
+    """进程内共享的默认过滤器，词表来自 KEYWORD_STOPWORDS / KEYWORD_AD_TERMS。"""
+    return build_keyword_filter(_lexicon_paths("KEYWORD_STOPWORDS"), _lexicon_paths("KEYWORD_AD_TERMS"))
+
+
+def clean_keywords(keywords: Sequence[str] | None) -> List[str]:
+    return get_keyword_filter().clean(keywords)
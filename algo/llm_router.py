@@ -0,0 +1,319 @@
+"""algo.llm_router
+
+多后端 LLM 路由：对外是一个普通的 LangChain Runnable（可直接放进 `prompt | llm | parser`），
+内部持有多个 ChatModel，按当前延迟与健康度为每个请求挑选后端。
+
+    * 选路：按 EWMA 延迟 ×（1 + 在途数）排序，未测过延迟的后端优先试探；
+    * 熔断：连续失败达到阈值后暂停该后端 `cooldown` 秒（指数增长），到期后放行试探；
+    * 故障转移：请求失败时依次改投下一个后端，全部失败才抛出 `AllBackendsFailed`（附各后端异常）；
+    * 对冲：请求耗时超过所选后端最近延迟的 `hedge_percentile` 分位后，向下一个后端并发补发，先返回者胜出。
+
+同一个 Router 实例可被 `LLMSummarizer` 与 `LLMEvtExtractor` 共享（见 `get_default_router`），
+单个后端变慢时流量会自动转向其它后端，而不是拖住整条流水线。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+DEFAULT_HEDGE_PERCENTILE = 0.95
+
+
+@dataclass
+class Backend:
+    name: str
+    llm: Runnable
+    window: int = 100
+    ewma_alpha: float = 0.3
+    failure_threshold: int = 3
+    cooldown: float = 5.0
+    max_cooldown: float = 120.0
+
+    latencies: Deque[float] = field(default_factory=deque, init=False)
+    ewma: Optional[float] = field(default=None, init=False)
+    inflight: int = field(default=0, init=False)
+    calls: int = field(default=0, init=False)
+    failures: int = field(default=0, init=False)
+    hedges: int = field(default=0, init=False)
+    consecutive_failures: int = field(default=0, init=False)
+    open_until: float = field(default=0.0, init=False)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.open_until
+
+    def score(self) -> float:
+        if self.ewma is None:
+            return 0.0
+        return self.ewma * (1 + self.inflight)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(math.ceil(q * len(values))) - 1)]
+
+    def _add_sample(self, latency: float) -> None:
+        self.latencies.append(latency)
+        while len(self.latencies) > self.window:
+            self.latencies.popleft()
+        self.ewma = latency if self.ewma is None else self.ewma_alpha * latency + (1 - self.ewma_alpha) * self.ewma
+
+    def record_success(self, latency: float) -> None:
+        self._add_sample(latency)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_censored(self, latency: float) -> None:
+        """被取消的调用（如对冲落败）：耗时只是真实延迟的下限，超过当前 EWMA 时才计入，
+        使变慢的后端得分上升、让出首选位置。"""
+        if self.ewma is None or latency > self.ewma:
+            self._add_sample(latency)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        over = self.consecutive_failures - self.failure_threshold
+        if over >= 0:
+            self.open_until = time.monotonic() + min(self.max_cooldown, self.cooldown * (2 ** over))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "inflight": self.inflight,
+            "ewma_ms": round(self.ewma * 1000, 2) if self.ewma is not None else None,
+            "p50_ms": round(self.percentile(0.5) * 1000, 2) if self.latencies else None,
+            "p95_ms": round(self.percentile(0.95) * 1000, 2) if self.latencies else None,
+            "healthy": self.healthy(time.monotonic()),
+        }
+
+
+class AllBackendsFailed(RuntimeError):
+    def __init__(self, errors: Sequence[Tuple[str, BaseException]]):
+        self.errors = list(errors)
+        detail = "; ".join(f"{name}: {e}" for name, e in self.errors)
+        super().__init__(f"所有 LLM 后端均失败: {detail}")
+
+
+class LLMRouter(Runnable):
+    """输入输出与被路由的 ChatModel 一致（PromptValue / messages -> AIMessage）。"""
+
+    def __init__(
+        self,
+        backends: Sequence[Backend],
+        *,
+        hedge_percentile: float | None = DEFAULT_HEDGE_PERCENTILE,
+        hedge_min_samples: int = 20,
+        max_attempts: int | None = None,
+        max_workers: int = 32,
+    ) -> None:
+        if not backends:
+            raise ValueError("LLMRouter 至少需要一个后端")
+        self.backends = list(backends)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_attempts = max_attempts or len(self.backends)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-router")
+
+    # ------------------- 选路 ------------------- #
+    def ranked(self) -> List[Backend]:
+        """健康后端按得分升序；全部熔断时按恢复时间排序，仍保证有后端可试。"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted((b for b in self.backends if b.healthy(now)), key=Backend.score)
+            if healthy:
+                return healthy
+            return sorted(self.backends, key=lambda b: b.open_until)
+
+    def hedge_delay(self, backend: Backend) -> Optional[float]:
+        if self.hedge_percentile is None or len(backend.latencies) < self.hedge_min_samples:
+            return None
+        return backend.percentile(self.hedge_percentile)
+
+    def close(self) -> None:
+        """关闭对冲使用的线程池；仍在后台跑完的落败请求不等待。"""
+        self._pool.shutdown(wait=False)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [b.snapshot() for b in self.backends]
+
+    def _begin(self, backend: Backend, hedge: bool) -> float:
+        with self._lock:
+            backend.inflight += 1
+            backend.calls += 1
+            backend.hedges += 1 if hedge else 0
+        return time.monotonic()
+
+    def _end(self, backend: Backend, start: float, error: BaseException | None) -> None:
+        with self._lock:
+            backend.inflight -= 1
+            if error is None:
+                backend.record_success(time.monotonic() - start)
+            elif isinstance(error, asyncio.CancelledError):
+                backend.record_censored(time.monotonic() - start)
+            else:
+                backend.record_failure()
+
+    # ------------------- 同步 ------------------- #
+    def _call(self, backend: Backend, input: Any, config: Optional[RunnableConfig], hedge: bool) -> Any:
+        start = self._begin(backend, hedge)
+        try:
+            out = backend.llm.invoke(input, config)
+        except BaseException as e:
+            self._end(backend, start, e)
+            raise
+        self._end(backend, start, None)
+        return out
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        candidates = self.ranked()[: self.max_attempts]
+        errors: List[Tuple[str, BaseException]] = []
+        running: Dict[Future, Backend] = {}
+        next_idx = 0
+
+        def launch(hedge: bool = False) -> Backend:
+            nonlocal next_idx
+            backend = candidates[next_idx]
+            next_idx += 1
+            running[self._pool.submit(self._call, backend, input, config, hedge)] = backend
+            return backend
+
+        if self.hedge_delay(candidates[0]) is None or len(candidates) == 1:
+            # 无需对冲：在调用线程内顺序故障转移，省去线程切换
+            for backend in candidates:
+                try:
+                    return self._call(backend, input, config, False)
+                except Exception as e:  # noqa: BLE001
+                    errors.append((backend.name, e))
+            raise AllBackendsFailed(errors)
+
+        primary = launch()
+        delay = self.hedge_delay(primary)
+        while True:
+            can_hedge = delay is not None and next_idx < len(candidates)
+            done, _ = wait(list(running), timeout=delay if can_hedge else None, return_when=FIRST_COMPLETED)
+            if not done:
+                launch(hedge=True)
+                delay = None  # 每个请求至多对冲一次
+                continue
+            for fut in done:
+                backend = running.pop(fut)
+                err = fut.exception()
+                if err is None:
+                    return fut.result()  # 落败的对冲请求在后台跑完，仅用于更新延迟统计
+                errors.append((backend.name, err))
+            if not running:
+                if next_idx >= len(candidates):
+                    raise AllBackendsFailed(errors)
+                launch()
+
+    # ------------------- 异步 ------------------- #
+    async def _acall(self, backend: Backend, input: Any, config: Optional[RunnableConfig], hedge: bool) -> Any:
+        start = self._begin(backend, hedge)
+        try:
+            out = await backend.llm.ainvoke(input, config)
+        except BaseException as e:
+            self._end(backend, start, e)
+            raise
+        self._end(backend, start, None)
+        return out
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        candidates = self.ranked()[: self.max_attempts]
+        errors: List[Tuple[str, BaseException]] = []
+        running: Dict[asyncio.Task, Backend] = {}
+        next_idx = 0
+
+        def launch(hedge: bool = False) -> Backend:
+            nonlocal next_idx
+            backend = candidates[next_idx]
+            next_idx += 1
+            running[asyncio.ensure_future(self._acall(backend, input, config, hedge))] = backend
+            return backend
+
+        primary = launch()
+        delay = self.hedge_delay(primary)
+        try:
+            while True:
+                can_hedge = delay is not None and next_idx < len(candidates)
+                done, _ = await asyncio.wait(
+                    list(running), timeout=delay if can_hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch(hedge=True)
+                    delay = None
+                    continue
+                for task in done:
+                    backend = running.pop(task)
+                    err = task.exception()
+                    if err is None:
+                        return task.result()
+                    errors.append((backend.name, err))
+                if not running:
+                    if next_idx >= len(candidates):
+                        raise AllBackendsFailed(errors)
+                    launch()
+        finally:
+            for task in running:  # 取消落败的对冲请求
+                task.cancel()
+
+
+# ------------------- 默认路由 ------------------- #
+def _build_backend(spec: str) -> Backend:
+    """spec 形如 `ollama=qwen3:4b@http://127.0.0.1:11434` 或 `tongyi=qwen3-4b`。"""
+    kind, _, rest = spec.strip().partition("=")
+    model, _, url = rest.partition("@")
+    if kind == "ollama":
+        from langchain_ollama.chat_models import ChatOllama
+
+        llm = ChatOllama(
+            model=model or os.getenv("OLLAMA_LLM_MODEL", "qwen3:4b"),
+            base_url=url or os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434"),
+            temperature=0,
+            format="json",
+        )
+    elif kind == "tongyi":
+        from langchain_community.chat_models.tongyi import ChatTongyi
+
+        llm = ChatTongyi(  # 与 build_tongyi_llm 一致：JSON 输出、关闭思考
+            model=model or "qwen3-4b",
+            format="json",
+            model_kwargs={"temperature": 0, "enable_thinking": False},
+        )
+    else:
+        raise ValueError(f"未知的 LLM 后端类型: {kind}（支持 ollama / tongyi）")
+    return Backend(name=spec.strip(), llm=llm)
+
+
+def router_from_env(spec: str | None = None) -> Optional[LLMRouter]:
+    """LLM_BACKENDS=逗号分隔的后端列表；未设置时返回 None，各 Processor 沿用原有默认模型。"""
+    spec = spec if spec is not None else os.getenv("LLM_BACKENDS", "")
+    specs = [s for s in spec.split(",") if s.strip()]
+    if not specs:
+        return None
+    hedge = os.getenv("LLM_HEDGE_PERCENTILE", str(DEFAULT_HEDGE_PERCENTILE))
+    return LLMRouter(
+        [_build_backend(s) for s in specs],
+        hedge_percentile=float(hedge) if float(hedge) > 0 else None,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_default_router() -> Optional[LLMRouter]:
+    """进程内共享的路由实例，供 LLMSummarizer / LLMEvtExtractor 共用延迟与健康统计。"""
+    return router_from_env()
@@ -1,12 +1,17 @@
 from __future__ import annotations
-from typing import  Protocol, List
+from typing import  Any, Dict, Optional, Protocol, List, Sequence, Union
 from functools import lru_cache
+import asyncio
 import os
 from dotenv import load_dotenv
 from langchain_ollama.chat_models import ChatOllama
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import BaseModel, Field, ValidationError
+
+from algo.keywords import KeywordFilter, get_keyword_filter
+from algo.text import chunk_sentences, clip_summary, estimate_tokens, truncate_to_budget
 
 load_dotenv()
 
@@ -22,6 +27,13 @@ class SummaryResult(BaseModel):
 DEFAULT_MAX_CHARS = int(os.getenv("MAX_ABSTRACT_CHARS", "160"))
 OLLAMA_MODEL = os.getenv("OLLAMA_LLM_MODEL", "qwen3:4b")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
+PACK_TOKEN_BUDGET = int(os.getenv("PACK_TOKEN_BUDGET", "1500"))  # 单次打包请求的正文 token 预算
+PACK_MAX_ITEMS = int(os.getenv("PACK_MAX_ITEMS", "8"))
+PACK_MAX_ARTICLE_TOKENS = int(os.getenv("PACK_MAX_ARTICLE_TOKENS", "400"))  # 超过则单篇调用
+# 长文处理：≤ INPUT_TOKEN_BUDGET 原样送入；≤ MAP_REDUCE_TOKENS 导语 + 显著性截断；更长则分块 map-reduce
+INPUT_TOKEN_BUDGET = int(os.getenv("SUMMARY_INPUT_TOKENS", "3000"))
+MAP_REDUCE_TOKENS = int(os.getenv("SUMMARY_MAP_REDUCE_TOKENS", "8000"))
+MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
 
 PROMPT_TMPL = """
 你是一名资深中文新闻编辑，请阅读【新闻正文】，在保持核心信息完整的前提下，
@@ -37,19 +49,116 @@ PROMPT_TMPL = """
 【输出格式】
 {format_instructions}
 """
-@lru_cache(maxsize=1)
-def build_tongyi_chain():
-    from langchain_community.chat_models.tongyi import ChatTongyi
-    # prompt = PromptTemplate.from_template(PROMPT_TMPL)
+def build_summary_chain(llm):
+    """prompt | llm | parser；llm 可为任意 LangChain ChatModel（或兼容的 Runnable）。"""
     prompt = ChatPromptTemplate.from_messages([
                     ("system", PROMPT_TMPL),
                     ("human", "【新闻正文】:{article}"),
                 ])
-    llm = ChatTongyi(model="qwen3-4b",  format="json", model_kwargs={"temperature": 0, "enable_thinking": False})
     output_parser = PydanticOutputParser(pydantic_object=SummaryResult)
     chain = prompt.partial(format_instructions=output_parser.get_format_instructions()) | llm | output_parser
     return chain
 
+# -------------------- 多篇打包 ------------------ #
+PACKED_PROMPT_TMPL = """
+你是一名资深中文新闻编辑，下面给出多篇以【新闻 id=编号】开头的新闻正文，请逐篇独立处理：
+用 **一句话** 写出精炼摘要并提取该篇新闻的主题关键词。要求：
+1. 每篇摘要 **长度 ≤ {max_chars} 个汉字**（标点也计入长度，英文/数字按 1 字）。
+2. 避免使用“本文”“文章”等空洞前缀；只写一句，不得分号、顿号并列多句。
+3. 各篇互不参考，不得编造信息，不要加正文里没有的内容；关键词需规避广告、营销等干扰信息。
+
+【输出格式】
+只输出一个 JSON 对象，每个 id 恰好出现一次：
+{{"items": [{{"id": "编号", "summary": "摘要", "keywords": ["关键词", "..."]}}]}}
+"""
+
+def pack_by_budget(
+    texts: Sequence[str],
+    *,
+    token_budget: int = PACK_TOKEN_BUDGET,
+    max_items: int = PACK_MAX_ITEMS,
+    max_article_tokens: int = PACK_MAX_ARTICLE_TOKENS,
+) -> List[List[int]]:
+    """按输入顺序贪心分组，返回位置列表；长文单独成组，短文在预算与条数内合并。"""
+    groups: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if tokens > max_article_tokens:
+            groups.append([i])
+            continue
+        if current and (used + tokens > token_budget or len(current) >= max_items):
+            groups.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_packed_chain(llm):
+    """多篇打包的 prompt | llm；输出逐条校验，故只解析为字符串。"""
+    prompt = ChatPromptTemplate.from_messages([
+                    ("system", PACKED_PROMPT_TMPL),
+                    ("human", "{articles}"),
+                ])
+    return prompt | llm | StrOutputParser()
+
+
+def format_packed(texts: Sequence[str]) -> str:
+    return "\n\n".join(f"【新闻 id={i}】:\n{t}" for i, t in enumerate(texts, 1))
+
+
+def parse_packed(raw: str, n: int) -> List[Optional[SummaryResult]]:
+    """按 id 取回各篇结果；缺失、重复编号以外的多余条目忽略，字段不合法的记为 None。"""
+    out: List[Optional[SummaryResult]] = [None] * n
+    try:
+        payload = parse_json_markdown(raw)
+    except (ValueError, TypeError):
+        return out
+    items = payload.get("items", []) if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        return out
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(str(item.get("id", "")).strip()) - 1
+            result = SummaryResult.model_validate(item)
+        except (ValueError, ValidationError):
+            continue
+        if 0 <= idx < n and out[idx] is None:
+            out[idx] = result
+    return out
+
+
+@lru_cache(maxsize=1)
+def build_tongyi_llm():
+    from langchain_community.chat_models.tongyi import ChatTongyi
+    return ChatTongyi(model="qwen3-4b",  format="json", model_kwargs={"temperature": 0, "enable_thinking": False})
+
+def _item_configs(config, n: int) -> List[Optional[Dict[str, Any]]]:
+    """config 可为单个 RunnableConfig（整批共用）或与输入等长的列表。"""
+    if isinstance(config, (list, tuple)):
+        return list(config)
+    return [config] * n
+
+
+def _pack_config(configs: Sequence[Optional[Dict[str, Any]]], group: Sequence[int]) -> Optional[Dict[str, Any]]:
+    """打包请求沿用组内首篇的 config，metadata.trace_ids 合并各篇，用量记账时按篇均摊。"""
+    first = configs[group[0]]
+    if not first:
+        return None
+    trace_ids = [t for i in group for t in ((configs[i] or {}).get("metadata") or {}).get("trace_ids", [])]
+    return {**first, "metadata": {**(first.get("metadata") or {}), "trace_ids": trace_ids}}
+
+
+@lru_cache(maxsize=1)
+def build_tongyi_chain():
+    return build_summary_chain(build_tongyi_llm())
+
 class LLMSummarizerImpl(AbstractSummarizer):
     def __init__(
         self,
@@ -57,40 +166,213 @@ class LLMSummarizerImpl(AbstractSummarizer):
         model: str = OLLAMA_MODEL,
         base_url: str = OLLAMA_BASE_URL,
         chain=None,  # 新增参数
+        llm=None,
+        packed_chain=None,
+        input_token_budget: int = INPUT_TOKEN_BUDGET,
+        map_reduce_tokens: int = MAP_REDUCE_TOKENS,
+        map_concurrency: int = MAP_CONCURRENCY,
+        keyword_filter: KeywordFilter | None = None,
     ):
+        """传入 llm 时同时构建单篇与打包 chain；只注入 chain 时打包模式退化为逐篇调用。"""
         self.max_chars = max_chars
         self.model = model
         self.base_url = base_url
-        self._chain = chain or self._build_chain()  # 支持注入
+        self.input_token_budget = input_token_budget
+        self.map_reduce_tokens = max(map_reduce_tokens, input_token_budget)
+        self.map_concurrency = map_concurrency
+        # LLM 输出的关键词经停用词 / 广告词过滤与去重后再返回
+        self.keyword_filter = keyword_filter or get_keyword_filter()
+        if llm is None and chain is None:
+            llm = ChatOllama(base_url=self.base_url, model=self.model, temperature=0, format="json")
+        self._chain = chain or build_summary_chain(llm)  # 支持注入
+        self._packed_chain = packed_chain or (build_packed_chain(llm) if llm is not None else None)
 
-    @lru_cache(maxsize=1)
-    def _build_chain(self):
-        prompt = PromptTemplate.from_template(PROMPT_TMPL)
-        llm = ChatOllama(base_url=OLLAMA_BASE_URL, model=OLLAMA_MODEL, temperature=0, format="json")
-        output_parser = PydanticOutputParser(pydantic_object=SummaryResult)
-        chain = prompt.partial(format_instructions=output_parser.get_format_instructions()) | llm | output_parser
-        return chain
+    def _finish(self, result: SummaryResult, max_chars: int) -> SummaryResult:
+        """所有路径（单篇 / 打包 / map-reduce）的统一收尾：摘要截到 max_chars，关键词后处理。"""
+        return SummaryResult(
+            summary=clip_summary(result.summary, max_chars), keywords=self.keyword_filter.clean(result.keywords)
+        )
 
-    def summarize(self, text: str, max_chars: int = None) -> SummaryResult:
+    def _parse_pack(self, raw: str, n: int, max_chars: int) -> List[Optional[SummaryResult]]:
+        return [r if r is None else self._finish(r, max_chars) for r in parse_packed(raw, n)]
+
+    # --------- 长文预处理 ---------
+    def needs_map_reduce(self, text: str) -> bool:
+        return estimate_tokens(text) > self.map_reduce_tokens
+
+    def prepare(self, text: str) -> str:
+        """超出输入预算的正文按导语 + 显著性截断到预算内。"""
+        return truncate_to_budget(text, self.input_token_budget)
+
+    def _map_inputs(self, text: str, max_chars: int) -> List[Dict[str, object]]:
+        return [{"article": c, "max_chars": max_chars} for c in chunk_sentences(text, self.input_token_budget)]
+
+    def _reduce_input(self, partials: List[SummaryResult], max_chars: int) -> Dict[str, object]:
+        merged = "\n".join(p.summary for p in partials if p.summary)
+        return {"article": self.prepare(merged), "max_chars": max_chars}
+
+    @staticmethod
+    def _merge(final: SummaryResult, partials: List[SummaryResult]) -> SummaryResult:
+        """合并关键词：先取归约结果，再补在多个分块中重复出现的关键词。"""
+        counts: Dict[str, int] = {}
+        for p in partials:
+            for kw in dict.fromkeys(p.keywords):
+                counts[kw] = counts.get(kw, 0) + 1
+        extra = [kw for kw, n in sorted(counts.items(), key=lambda x: -x[1]) if n > 1]
+        keywords = list(dict.fromkeys([*final.keywords, *extra]))
+        return SummaryResult(summary=final.summary, keywords=keywords)
+
+    def _map_reduce(self, text: str, max_chars: int, config=None) -> SummaryResult:
+        partials = self._chain.batch(
+            self._map_inputs(text, max_chars), config={**(config or {}), "max_concurrency": self.map_concurrency}
+        )
+        final = self._chain.invoke(self._reduce_input(partials, max_chars), config=config)
+        return self._merge(final, partials)
+
+    async def _amap_reduce(self, text: str, max_chars: int, config=None) -> SummaryResult:
+        partials = await self._chain.abatch(
+            self._map_inputs(text, max_chars), config={**(config or {}), "max_concurrency": self.map_concurrency}
+        )
+        final = await self._chain.ainvoke(self._reduce_input(partials, max_chars), config=config)
+        return self._merge(final, partials)
+
+    def summarize(self, text: str, max_chars: int = None, config=None) -> SummaryResult:
+        """config 为透传给 chain 的 RunnableConfig（回调、tags、metadata 等）。"""
         if max_chars is None:
             max_chars = self.max_chars
         try:
             if not text:
                 return SummaryResult(summary="", keywords=[])
-            result = self._chain.invoke({"article": text, "max_chars": max_chars})
-            # TODO 停用词，LLM输出关键词可能含有广告
-            return result
+            if self.needs_map_reduce(text):
+                return self._finish(self._map_reduce(text, max_chars, config), max_chars)
+            result = self._chain.invoke({"article": self.prepare(text), "max_chars": max_chars}, config=config)
+            return self._finish(result, max_chars)
         except Exception as e:
             raise e
 
-    async def summarize_async(self, text: str, max_chars: int = None) -> SummaryResult:
+    async def summarize_async(self, text: str, max_chars: int = None, config=None) -> SummaryResult:
         if max_chars is None:
             max_chars = self.max_chars
         try:
             if not text:
                 return SummaryResult(summary="", keywords=[])
-            result = await self._chain.ainvoke({"article": text, "max_chars": max_chars})
-            # TODO 停用词，LLM输出关键词可能含有广告
-            return result
+            if self.needs_map_reduce(text):
+                return self._finish(await self._amap_reduce(text, max_chars, config), max_chars)
+            result = await self._chain.ainvoke({"article": self.prepare(text), "max_chars": max_chars}, config=config)
+            return self._finish(result, max_chars)
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+
+    def summarize_batch(
+        self, texts: List[str], max_chars: int = None, config=None
+    ) -> List[Union[SummaryResult, Exception]]:
+        """批量摘要，借助 Runnable.batch 并发调用；单条失败以 Exception 占位返回。超长文单独走 map-reduce。
+
+        config 可为整批共用的 RunnableConfig，或与 texts 等长的列表（逐条归属用量）。
+        """
+        if max_chars is None:
+            max_chars = self.max_chars
+        configs = _item_configs(config, len(texts))
+        results: List[Union[SummaryResult, Exception, None]] = [None] * len(texts)
+        inputs, positions = [], []
+        for i, text in enumerate(texts):
+            if not text:
+                results[i] = SummaryResult(summary="", keywords=[])
+            elif self.needs_map_reduce(text):
+                try:
+                    results[i] = self._finish(self._map_reduce(text, max_chars, configs[i]), max_chars)
+                except Exception as e:  # noqa: BLE001
+                    results[i] = e
+            else:
+                inputs.append({"article": self.prepare(text), "max_chars": max_chars})
+                positions.append(i)
+        if inputs:
+            outs = self._chain.batch(inputs, config=[configs[i] for i in positions], return_exceptions=True)
+            for i, out in zip(positions, outs):
+                results[i] = out if isinstance(out, Exception) else self._finish(out, max_chars)
+        return results  # type: ignore[return-value]
+
+    # --------- 打包模式 ---------
+    def _packed_input(self, texts: Sequence[str], max_chars: int) -> Dict[str, object]:
+        return {"articles": format_packed(texts), "max_chars": max_chars}
+
+    def summarize_pack(
+        self, texts: Sequence[str], max_chars: int = None, config=None
+    ) -> List[Optional[SummaryResult]]:
+        """一次请求处理一组文章；缺失或不合法的条目为 None，由调用方回退单篇。"""
+        if max_chars is None:
+            max_chars = self.max_chars
+        if self._packed_chain is None or len(texts) < 2:
+            return [None] * len(texts)
+        raw = self._packed_chain.invoke(self._packed_input(texts, max_chars), config=config)
+        return self._parse_pack(raw, len(texts), max_chars)
+
+    async def asummarize_pack(
+        self, texts: Sequence[str], max_chars: int = None, config=None
+    ) -> List[Optional[SummaryResult]]:
+        if max_chars is None:
+            max_chars = self.max_chars
+        if self._packed_chain is None or len(texts) < 2:
+            return [None] * len(texts)
+        raw = await self._packed_chain.ainvoke(self._packed_input(texts, max_chars), config=config)
+        return self._parse_pack(raw, len(texts), max_chars)
+
+    def _packs(self, texts: Sequence[str], kwargs) -> List[List[int]]:
+        live = [i for i, t in enumerate(texts) if t]
+        groups = pack_by_budget([texts[i] for i in live], **kwargs)
+        return [[live[j] for j in g] for g in groups]
+
+    def summarize_packed(
+        self, texts: List[str], max_chars: int = None, config=None, **pack_kwargs
+    ) -> List[Union[SummaryResult, Exception]]:
+        """按 token 预算打包后并发请求，未取回的条目经 `summarize_batch` 逐篇补齐。config 同 `summarize_batch`。"""
+        if max_chars is None:
+            max_chars = self.max_chars
+        configs = _item_configs(config, len(texts))
+        results: List[Union[SummaryResult, Exception, None]] = [
+            None if t else SummaryResult(summary="", keywords=[]) for t in texts
+        ]
+        packs = [g for g in self._packs(texts, pack_kwargs) if len(g) > 1]
+        if packs and self._packed_chain is not None:
+            raws = self._packed_chain.batch(
+                [self._packed_input([texts[i] for i in g], max_chars) for g in packs],
+                config=[_pack_config(configs, g) for g in packs],
+                return_exceptions=True,
+            )
+            for group, raw in zip(packs, raws):
+                if isinstance(raw, Exception):
+                    continue
+                for i, r in zip(group, self._parse_pack(raw, len(group), max_chars)):
+                    results[i] = r
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            retry = self.summarize_batch([texts[i] for i in missing], max_chars, [configs[i] for i in missing])
+            for i, r in zip(missing, retry):
+                results[i] = r
+        return results  # type: ignore[return-value]
+
+    async def asummarize_packed(
+        self, texts: List[str], max_chars: int = None, config=None, **pack_kwargs
+    ) -> List[Union[SummaryResult, Exception]]:
+        if max_chars is None:
+            max_chars = self.max_chars
+        configs = _item_configs(config, len(texts))
+        results: List[Union[SummaryResult, Exception, None]] = [
+            None if t else SummaryResult(summary="", keywords=[]) for t in texts
+        ]
+        packs = [g for g in self._packs(texts, pack_kwargs) if len(g) > 1]
+        outs = await asyncio.gather(
+            *(self.asummarize_pack([texts[i] for i in g], max_chars, _pack_config(configs, g)) for g in packs),
+            return_exceptions=True,
+        )
+        for group, out in zip(packs, outs):
+            if not isinstance(out, Exception):
+                for i, r in zip(group, out):
+                    results[i] = r
+        missing = [i for i, r in enumerate(results) if r is None]
+        singles = await asyncio.gather(
+            *(self.summarize_async(texts[i], max_chars, configs[i]) for i in missing), return_exceptions=True
+        )
+        for i, r in zip(missing, singles):
+            results[i] = r
+        return results  # type: ignore[return-value]
@@ -0,0 +1,117 @@
+"""algo.text
+
+中文文本的轻量工具，供事件门控、打包摘要、长文切分等复用：
+
+    * `split_sentences`   ：按句末标点与换行分句；
+    * `estimate_tokens`   ：不依赖 tokenizer 的 token 数粗估；
+    * `truncate_to_budget`：导语 + 显著性选句，把长文压到 token 预算内；
+    * `chunk_sentences`   ：按句子边界切成不超过预算的块（map-reduce 摘要的 map 输入）；
+    * `clip_summary`      ：把摘要硬截到 max_chars 内，尽量落在句末。
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import List
+
+# 句末标点（可连续，如“！？”）后允许跟随右引号 / 右括号；换行同样视为句子边界
+_SENT_RE = re.compile(r"[^。！？!?；;\n]+(?:[。！？!?；;]+[”’\"』」）)]*)?|[。！？!?；;]+")
+_CJK_RE = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+_WORDISH_RE = re.compile(r"[\u3400-\u9fff\uf900-\ufaffA-Za-z0-9]")
+_CLIP_END = "。！？!?；;”』」）)"
+
+
+def split_sentences(text: str) -> List[str]:
+    """按中文句末标点与换行分句，保留标点，丢弃空白句。拼接结果与原文去换行后一致。"""
+    return [s for s in (m.group(0).strip() for m in _SENT_RE.finditer(text or "")) if s]
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计 token 数：中文约 1 字 1 token，其余字符约 4 个 1 token。"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _bigrams(sentence: str) -> List[str]:
+    chars = _WORDISH_RE.findall(sentence)
+    return ["".join(chars[i: i + 2]) for i in range(len(chars) - 1)]
+
+
+def _hard_split(sentence: str, budget: int) -> List[str]:
+    """单句超预算时按字符硬切。"""
+    pieces, current = [], ""
+    for ch in sentence:
+        if current and estimate_tokens(current + ch) > budget:
+            pieces.append(current)
+            current = ""
+        current += ch
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def truncate_to_budget(text: str, budget: int, *, lead_sentences: int = 3) -> str:
+    """不超预算原样返回；否则保留前 `lead_sentences` 句导语，再按显著性补句，按原文顺序拼接。
+
+    显著性 = 句内字符二元组在全文中的平均词频（与全文主题越接近越高），并对靠前的句子略加权。
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    sentences = split_sentences(text)
+    costs = [estimate_tokens(s) for s in sentences]
+
+    keep: set[int] = set()
+    used = 0
+    for i in range(min(lead_sentences, len(sentences))):
+        if used + costs[i] > budget:
+            break
+        keep.add(i)
+        used += costs[i]
+
+    tf = Counter(b for s in sentences for b in _bigrams(s))
+
+    def salience(i: int) -> float:
+        grams = _bigrams(sentences[i])
+        if not grams:
+            return 0.0
+        return sum(tf[g] for g in grams) / len(grams) * (1 + 1 / (1 + i))
+
+    for i in sorted(set(range(len(sentences))) - keep, key=salience, reverse=True):
+        if used + costs[i] <= budget:
+            keep.add(i)
+            used += costs[i]
+
+    if not keep:  # 首句即超预算
+        return _hard_split(sentences[0] if sentences else text, budget)[0]
+    return "".join(sentences[i] for i in sorted(keep))
+
+
+def chunk_sentences(text: str, budget: int) -> List[str]:
+    """按句子边界贪心切块，每块 ≤ budget（单句超预算时按字符硬切）。"""
+    chunks: List[str] = []
+    current, used = "", 0
+    for sentence in split_sentences(text):
+        cost = estimate_tokens(sentence)
+        parts = _hard_split(sentence, budget) if cost > budget else [sentence]
+        for part in parts:
+            cost = estimate_tokens(part)
+            if current and used + cost > budget:
+                chunks.append(current)
+                current, used = "", 0
+            current += part
+            used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def clip_summary(summary: str, max_chars: int) -> str:
+    """超过 max_chars 时截断；优先停在最后一个句末标点处（不短于一半长度），否则硬截。"""
+    if len(summary) <= max_chars:
+        return summary
+    head = summary[:max_chars]
+    cut = max(head.rfind(ch) for ch in _CLIP_END)
+    if cut + 1 >= max_chars // 2:
+        return head[: cut + 1]
+    return head
@@ -0,0 +1,247 @@
+"""benchmarks.bench_flow_runner
+
+FlowRunner / Processor 全链路基准：用 `FakeChatModel` 代替 Ollama，测吞吐、单篇延迟分位数与峰值内存。
+
+场景：
+    * dummy：cleaner + event_dummy + dummy_summary（纯 CPU，衡量调度开销）；
+    * llm  ：cleaner + summarizer_llm + event_llm（真实 prompt/parser，假 LLM 延迟）；
+    * fused：cleaner + nlp_llm（摘要 / 关键词 / 事件一次请求，与 llm 场景对比调用数与延迟）。
+模式：
+    * single：逐篇 `process()`（对应旧 pipeline 的串行用法）；
+    * stream：`process_many()`（并发 + 微批）；
+    * unbatched：`process_many()` 但关闭微批（`batch_size=0`），用于确认微批不拖慢 LLM 步骤。
+
+`peak_rss_mb` 为该 case 自身的峰值内存：`ru_maxrss` 是进程级只增不减的高水位（且在 fork + exec 后保留），
+因此 Linux 上每个 case 开始前经 `/proc/self/clear_refs` 清零 VmHWM 再读取；
+不支持时（如 macOS）每个 case 改在独立的 spawn 子进程中运行。
+
+结果写入 `benchmarks/results/<时间戳>-<git sha>.json`，并与上一次结果对比，
+吞吐下降或 p95 上升超过 `--tolerance` 时标记回归并以非零码退出。
+
+$ python -m benchmarks.bench_flow_runner --articles 200 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from common.models import ArticleNLPResult
+from runner.flow_runner import FlowRunner
+from runner.tracing import _percentile
+import processors.cleaner  # noqa: F401  (register)
+import processors.event_extractor  # noqa: F401  (register)
+import processors.event_llm  # noqa: F401  (register)
+import processors.nlp_llm  # noqa: F401  (register)
+import processors.summarizer  # noqa: F401  (register)
+import processors.summarizer_dummy  # noqa: F401  (register)
+
+from .corpus import make_corpus
+from .fake_llm import FakeChatModel
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SCENARIOS = {
+    "dummy": ["cleaner", "event_dummy", "dummy_summary"],
+    "llm": ["cleaner", "summarizer_llm", "event_llm"],
+    "fused": ["cleaner", "nlp_llm"],
+}
+MODES = ("single", "stream", "unbatched")
+
+
+def _git_sha() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _reset_peak_rss() -> bool:
+    """清零本进程的 VmHWM（Linux ≥ 4.0），之后读到的峰值只覆盖当前 case。"""
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as fp:
+            for line in fp:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Linux 下 ru_maxrss 单位为 KB，macOS 为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def article_latency_ms(result: ArticleNLPResult) -> float:
+    """单篇端到端延迟：首个 span 就绪到最后一个 span 结束。"""
+    spans = result.spans or []
+    if not spans:
+        return 0.0
+    return (max(s.end_at for s in spans) - min(s.ready_at for s in spans)) * 1000
+
+
+def _configs(scenario: str, latency: float, jitter: float) -> Dict[str, Dict[str, Any]]:
+    if scenario not in ("llm", "fused"):
+        return {}
+    llm = FakeChatModel(latency=latency, jitter=jitter)
+    if scenario == "fused":
+        return {"nlp_llm": {"llm": llm}}
+    return {"summarizer_llm": {"llm": llm}, "event_llm": {"llm": llm}}
+
+
+def run_case(
+    scenario: str,
+    mode: str,
+    *,
+    articles: int,
+    latency: float,
+    jitter: float = 0.0,
+    max_in_flight: int = 32,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    corpus = make_corpus(articles, seed=seed)
+    batch_size = 0 if mode == "unbatched" else 16
+    configs = _configs(scenario, latency, jitter)
+    with FlowRunner(SCENARIOS[scenario], configs=configs, batch_size=batch_size) as runner:
+        runner.plan  # 预热：实例化 Processor，不计入耗时
+        _reset_peak_rss()
+        t0 = time.perf_counter()
+        if mode == "single":
+            results = [runner.process(a) for a in corpus]
+        else:
+            results = list(runner.process_many(corpus, max_in_flight=max_in_flight))
+        elapsed = time.perf_counter() - t0
+
+    latencies = sorted(article_latency_ms(r) for r in results)
+    return {
+        "scenario": scenario,
+        "mode": mode,
+        "articles": len(results),
+        "errors": sum(1 for r in results if r.errors),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_aps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": round(_percentile(latencies, 0.50), 2),
+        "latency_p95_ms": round(_percentile(latencies, 0.95), 2),
+        "latency_p99_ms": round(_percentile(latencies, 0.99), 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_case_isolated(scenario: str, mode: str, **kwargs: Any) -> Dict[str, Any]:
+    """在新的 spawn 子进程中运行 `run_case`；无法清零峰值内存的平台上用于隔离各 case。"""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_case, scenario, mode, **kwargs).result()
+
+
+def _case_key(case: Dict[str, Any]) -> str:
+    return f"{case['scenario']}/{case['mode']}"
+
+
+def load_previous(results_dir: Path = RESULTS_DIR) -> Optional[Dict[str, Any]]:
+    files = sorted(results_dir.glob("*.json"))
+    if not files:
+        return None
+    return json.loads(files[-1].read_text(encoding="utf-8"))
+
+
+def compare(
+    current: List[Dict[str, Any]], previous: List[Dict[str, Any]], tolerance: float = 0.1
+) -> List[str]:
+    """返回回归描述；吞吐下降或 p95 上升超过 tolerance（比例）即视为回归。"""
+    prev = {_case_key(c): c for c in previous}
+    regressions = []
+    for case in current:
+        old = prev.get(_case_key(case))
+        if old is None:
+            continue
+        if case["throughput_aps"] < old["throughput_aps"] * (1 - tolerance):
+            regressions.append(
+                f"{_case_key(case)} throughput {old['throughput_aps']} -> {case['throughput_aps']} aps"
+            )
+        if old["latency_p95_ms"] and case["latency_p95_ms"] > old["latency_p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{_case_key(case)} p95 {old['latency_p95_ms']} -> {case['latency_p95_ms']} ms"
+            )
+    return regressions
+
+
+def save(cases: List[Dict[str, Any]], params: Dict[str, Any], results_dir: Path = RESULTS_DIR) -> Path:
+    results_dir.mkdir(parents=True, exist_ok=True)
+    sha = _git_sha()
+    path = results_dir / f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{sha}.json"
+    payload = {"git_sha": sha, "created_at": datetime.now().isoformat(), "params": params, "cases": cases}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def _print_table(cases: List[Dict[str, Any]]) -> None:
+    header = f"{'case':<14}{'aps':>10}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'rssMB':>8}{'err':>5}"
+    print(header)
+    print("-" * len(header))
+    for c in cases:
+        print(
+            f"{_case_key(c):<14}{c['throughput_aps']:>10}{c['latency_p50_ms']:>10}"
+            f"{c['latency_p95_ms']:>10}{c['latency_p99_ms']:>10}{c['peak_rss_mb']:>8}{c['errors']:>5}"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="FlowRunner benchmark")
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="假 LLM 单次调用延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--isolate", action="store_true", help="每个 case 在独立子进程中运行")
+    args = parser.parse_args(argv)
+
+    params = {
+        "articles": args.articles, "latency": args.latency,
+        "jitter": args.jitter, "max_in_flight": args.max_in_flight,
+    }
+    previous = load_previous()
+    run = run_case_isolated if args.isolate or not _reset_peak_rss() else run_case
+    cases = [
+        run(s, m, articles=args.articles, latency=args.latency,
+            jitter=args.jitter, max_in_flight=args.max_in_flight)
+        for s in args.scenarios
+        for m in args.modes
+    ]
+    _print_table(cases)
+
+    regressions: List[str] = []
+    if previous and previous.get("params") == params:
+        regressions = compare(cases, previous["cases"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+    if not args.no_save:
+        print(f"saved -> {save(cases, params)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
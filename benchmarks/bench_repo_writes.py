@@ -0,0 +1,114 @@
+"""benchmarks.bench_repo_writes
+
+`SqlNewsRepository` 回写吞吐基准：同一批数据分别走 executemany 与 COPY + 临时表 + `UPDATE ... FROM`
+两条路径，输出每条路径的 rows/s。
+
+在 `--dsn` 指定的库里建独立的基准表（默认 `bench_articles`，结束后删除），不触碰业务表。
+COPY 路径仅 PostgreSQL（psycopg / psycopg2 驱动）可用；SQLite 上只跑 executemany 作为基线。
+
+$ python -m benchmarks.bench_repo_writes --dsn postgresql+psycopg://user:pw@localhost/news --rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from repo import SqlNewsRepository
+
+PATHS = {"executemany": False, "copy": True}
+
+
+def _setup(repo: SqlNewsRepository, rows: int, dim: int) -> None:
+    t0 = datetime(2024, 1, 1)
+    # SQLite 不支持 ADD COLUMN IF NOT EXISTS，embedding 列随表创建；PostgreSQL 由 ensure_embedding_schema 建 vector 列
+    embedding = "" if repo.dialect == "postgresql" else ", embedding TEXT"
+    with repo.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {repo.table_name}"))
+        conn.execute(text(
+            f"CREATE TABLE {repo.table_name} (id BIGINT PRIMARY KEY, created_at TIMESTAMP,"
+            f" title TEXT, text TEXT, summary TEXT, keywords TEXT{embedding})"
+        ))
+        conn.execute(
+            text(f"INSERT INTO {repo.table_name} (id, created_at, title, text) VALUES (:id, :ts, :t, :t)"),
+            [{"id": i, "ts": t0 + timedelta(seconds=i), "t": f"新闻{i}"} for i in range(rows)],
+        )
+    if repo.dialect == "postgresql":
+        repo.ensure_embedding_schema(dim, vector_index=None)  # 只测回写，不维护向量索引
+
+
+def _reset(repo: SqlNewsRepository) -> None:
+    with repo.engine.begin() as conn:
+        conn.execute(text(f"UPDATE {repo.table_name} SET embedding = NULL, summary = NULL, keywords = NULL"))
+
+
+def run_path(repo: SqlNewsRepository, bulk: bool, *, rows: int, dim: int, seed: int = 0) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    embeddings = [(i, [rnd.random() for _ in range(dim)]) for i in range(rows)]
+    abstracts = [(i, f"摘要{i}", ["芯片", f"关键词{i % 50}"] if i % 3 else []) for i in range(rows)]
+    _reset(repo)
+    start = time.perf_counter()
+    repo.update_embeddings(embeddings, bulk=bulk)
+    emb_s = time.perf_counter() - start
+    start = time.perf_counter()
+    repo.update_abstracts(abstracts, bulk=bulk)
+    abs_s = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "embeddings_rows_per_s": round(rows / emb_s, 1),
+        "abstracts_rows_per_s": round(rows / abs_s, 1),
+    }
+
+
+def run(dsn: str, *, rows: int, dim: int, table: str = "bench_articles") -> Dict[str, Dict[str, Any]]:
+    repo = SqlNewsRepository(dsn, table_name=table)
+    try:
+        _setup(repo, rows, dim)
+        results = {}
+        for name, bulk in PATHS.items():
+            if bulk and not repo._use_bulk(rows, True):
+                print(f"skip {name}: {repo.dialect}+{repo.driver} 不支持 COPY", file=sys.stderr)
+                continue
+            results[name] = run_path(repo, bulk, rows=rows, dim=dim)
+        with repo.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        return results
+    finally:
+        repo.dispose()
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Repository write-path benchmark")
+    parser.add_argument("--dsn", default=None, help="默认使用临时 SQLite 文件")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--table", default="bench_articles")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dsn = args.dsn or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        results = run(dsn, rows=args.rows, dim=args.dim, table=args.table)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    header = f"{'path':<14}{'rows':>8}{'emb rows/s':>14}{'abs rows/s':>14}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<14}{r['rows']:>8}{r['embeddings_rows_per_s']:>14}{r['abstracts_rows_per_s']:>14}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""benchmarks.fake_llm
+
+确定性的假 ChatModel，用于在无 GPU / 无网络环境下压测真实的 LLM Processor 链路
+（prompt | llm | parser 全部照常执行，只把网络调用换成可配置的延迟）。
+
+根据 prompt 中的输出格式说明判断任务：
+    * 含 `【新闻 id=` ⇒ 多篇打包摘要，返回 {"items": [...]}；
+    * 同时含 `keywords` 与 `events` ⇒ 融合抽取，返回 NlpResult JSON；
+    * 含 `keywords` ⇒ 返回 SummaryResult JSON；
+    * 含 `trigger`  ⇒ 返回 EventList JSON（按触发词正则抽取）。
+相同输入总是得到相同输出与相同延迟（jitter 由输入哈希决定）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+TRIGGER_PATTERN = re.compile(r"(宣布|发布|推出|签署|完成|收购|融资|任命)")
+TRIGGER_TYPES = {
+    "宣布": "PolicyRelease", "发布": "ProductLaunch", "推出": "ProductLaunch",
+    "签署": "Partnership", "完成": "Financing", "收购": "Acquisition",
+    "融资": "Financing", "任命": "PersonnelChange",
+}
+_PACKED_PATTERN = re.compile(r"【新闻 id=(\w+)】:\n(.*?)(?=\n\n【新闻 id=|\Z)", re.S)
+_BODY_PATTERN = re.compile(r"【(?:新闻正文|句子)】\s*[:：]\s*(.*?)(?:\n\s*仅输出|\Z)", re.S)
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.05  # 秒
+    jitter: float = 0.0  # 在 [-jitter, +jitter] 区间均匀抖动
+    error_rate: float = 0.0  # 按输入哈希确定性地失败
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    # ------------------- 内容生成 ------------------- #
+    @staticmethod
+    def _prompt_text(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+    @staticmethod
+    def _body(prompt: str) -> str:
+        m = _BODY_PATTERN.search(prompt)
+        return (m.group(1) if m else prompt).strip()
+
+    @staticmethod
+    def _summary(body: str) -> dict:
+        words = re.findall(r"[一-龥]{2,4}", body)
+        return {"summary": body[:60], "keywords": list(dict.fromkeys(words))[:5]}
+
+    def respond(self, prompt: str) -> str:
+        packed = _PACKED_PATTERN.findall(prompt)
+        if packed:
+            items = [{"id": key, **self._summary(body.strip())} for key, body in packed]
+            return json.dumps({"items": items}, ensure_ascii=False)
+        body = self._body(prompt)
+        if "keywords" in prompt and '"events"' in prompt:
+            return json.dumps({**self._summary(body), "events": self._events(body)}, ensure_ascii=False)
+        if "keywords" in prompt:
+            return json.dumps(self._summary(body), ensure_ascii=False)
+        return json.dumps({"data": self._events(body)}, ensure_ascii=False)
+
+    @staticmethod
+    def _events(body: str) -> List[dict]:
+        events = []
+        for m in TRIGGER_PATTERN.finditer(body):
+            trigger = m.group(0)
+            subject = body[max(0, m.start() - 4): m.start()] or "未知"
+            events.append({
+                "trigger": trigger,
+                "type": TRIGGER_TYPES[trigger],
+                "arguments": [{"role": "主体", "text": subject}],
+            })
+        return events[:3]
+
+    def _delay_and_result(self, messages: List[BaseMessage]) -> tuple[float, ChatResult]:
+        prompt = self._prompt_text(messages)
+        seed = int(hashlib.md5(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        if self.error_rate and rng.random() < self.error_rate:
+            raise RuntimeError("fake llm: injected failure")
+        content = self.respond(prompt)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": len(prompt),
+                "output_tokens": len(content),
+                "total_tokens": len(prompt) + len(content),
+            },
+            response_metadata={"model_name": "fake-chat"},
+        )
+        return delay, ChatResult(generations=[ChatGeneration(message=message)])
+
+    # ------------------- BaseChatModel ------------------- #
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, result = self._delay_and_result(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, result = self._delay_and_result(messages)
+        await asyncio.sleep(delay)
+        return result
@@ -0,0 +1,333 @@
+"""benchmarks.fake_ollama
+
+Ollama 兼容的本地替身服务（仅标准库），用于在没有 GPU 的机器上端到端压测真实流水线：
+把 `OLLAMA_BASE_URL` 指向它即可，`news_abstract_process.py`、`event_llm`、`backfill_embeddings.py` 无需改动。
+
+实现的接口：
+    * POST /api/chat        ：支持 stream=true（NDJSON）与 false；内容与 `FakeChatModel` 一致，
+                              按 prompt 返回 SummaryResult / EventList / 打包摘要 JSON；
+    * POST /api/generate    ：同上，prompt 字段；
+    * POST /api/embed       ：{"input": str | [str]} -> {"embeddings": [[...]]}；
+    * POST /api/embeddings  ：旧接口，{"prompt": str} -> {"embedding": [...]}；
+    * GET  /api/tags、/api/version：健康检查。
+
+可配置：
+    * 延迟分布：`fixed:0.2`、`uniform:0.1,0.5`、`lognormal:0.2,0.6`（中位数, sigma）；
+    * 错误率：`--error-rate`（HTTP 500）与 `--throttle-rate`（HTTP 429）；
+    * 并发：`--concurrency` 个请求同时处理，其余排队；排队超过 `--max-queue` 直接返回 503。
+
+$ python -m benchmarks.fake_ollama --port 11434 --latency lognormal:0.3,0.5 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .fake_llm import FakeChatModel
+
+DEFAULT_DIM = 1024
+
+
+@dataclass
+class LatencyModel:
+    kind: str = "fixed"
+    params: Tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, rest = spec.partition(":")
+        params = tuple(float(x) for x in rest.split(",") if x) if rest else ()
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"非法延迟分布: {spec}，示例 fixed:0.2 / uniform:0.1,0.5 / lognormal:0.2,0.6")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+@dataclass
+class ServerConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    embed_latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    concurrency: int = 4
+    max_queue: int = 64
+    dim: int = DEFAULT_DIM
+    seed: int = 42
+
+
+def embed_text(text: str, dim: int = DEFAULT_DIM) -> List[float]:
+    """按文本哈希播种的单位向量：相同文本永远得到相同向量。"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class _State:
+    def __init__(self, config: ServerConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(config.concurrency)
+        self.waiting = 0
+        self.wait_lock = threading.Lock()
+        self.llm = FakeChatModel(latency=0.0)
+        self.counters: Dict[str, int] = {"requests": 0, "errors": 0, "throttled": 0, "rejected": 0}
+
+    def roll(self) -> Tuple[float, float]:
+        with self.rng_lock:
+            return self.rng.random(), self.rng.random()
+
+    def sleep_for(self, model: LatencyModel) -> float:
+        with self.rng_lock:
+            delay = max(0.0, model.sample(self.rng))
+        time.sleep(delay)
+        return delay
+
+    def count(self, key: str) -> None:
+        with self.wait_lock:
+            self.counters[key] += 1
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/0.1"
+    protocol_version = "HTTP/1.1"
+    state: _State  # 由 make_server 注入
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    # ------------------- 工具 ------------------- #
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, chunks: List[Dict[str, Any]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            data = (json.dumps(chunk, ensure_ascii=False) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        return json.loads(raw or b"{}")
+
+    # ------------------- 入口 ------------------- #
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "fake:latest", "model": "fake:latest"}]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-fake"})
+        elif self.path == "/":
+            self._send_json(200, {"status": "Ollama is running"})
+        elif self.path == "/stats":
+            self._send_json(200, dict(self.state.counters))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        routes = {
+            "/api/chat": self._chat,
+            "/api/generate": self._generate,
+            "/api/embed": self._embed,
+            "/api/embeddings": self._embeddings,
+        }
+        handler = routes.get(self.path)
+        if handler is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            body = self._read_json()
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid json"})
+            return
+        self._admit(handler, body)
+
+    def _admit(self, handler, body: Dict[str, Any]) -> None:
+        st = self.state
+        st.count("requests")
+        with st.wait_lock:
+            if st.waiting >= st.config.max_queue + st.config.concurrency:
+                st.counters["rejected"] += 1
+                self._send_json(503, {"error": "server busy"})
+                return
+            st.waiting += 1
+        try:
+            with st.slots:
+                err, throttle = st.roll()
+                if throttle < st.config.throttle_rate:
+                    st.count("throttled")
+                    self._send_json(429, {"error": "too many requests"})
+                    return
+                handler(body, fail=err < st.config.error_rate)
+        finally:
+            with st.wait_lock:
+                st.waiting -= 1
+
+    # ------------------- 业务 ------------------- #
+    def _respond_text(self, prompt: str, body: Dict[str, Any], fail: bool) -> Optional[Tuple[str, float]]:
+        delay = self.state.sleep_for(self.state.config.latency)
+        if fail:
+            self.state.count("errors")
+            self._send_json(500, {"error": "fake ollama: injected failure"})
+            return None
+        return self.state.llm.respond(prompt), delay
+
+    def _final(self, body: Dict[str, Any], prompt: str, content: str, delay: float) -> Dict[str, Any]:
+        return {
+            "model": body.get("model", "fake"),
+            "created_at": _now(),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int(delay * 1e9),
+            "prompt_eval_count": len(prompt),
+            "eval_count": len(content),
+        }
+
+    def _chat(self, body: Dict[str, Any], fail: bool) -> None:
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        out = self._respond_text(prompt, body, fail)
+        if out is None:
+            return
+        content, delay = out
+        final = self._final(body, prompt, content, delay)
+        if body.get("stream", True):
+            head = {"model": final["model"], "created_at": final["created_at"],
+                    "message": {"role": "assistant", "content": content}, "done": False}
+            self._send_stream([head, {**final, "message": {"role": "assistant", "content": ""}}])
+        else:
+            self._send_json(200, {**final, "message": {"role": "assistant", "content": content}})
+
+    def _generate(self, body: Dict[str, Any], fail: bool) -> None:
+        prompt = f"{body.get('system', '')}\n{body.get('prompt', '')}"
+        out = self._respond_text(prompt, body, fail)
+        if out is None:
+            return
+        content, delay = out
+        final = self._final(body, prompt, content, delay)
+        if body.get("stream", True):
+            head = {"model": final["model"], "created_at": final["created_at"], "response": content, "done": False}
+            self._send_stream([head, {**final, "response": ""}])
+        else:
+            self._send_json(200, {**final, "response": content})
+
+    def _embed_inputs(self, texts: List[str], fail: bool) -> Optional[List[List[float]]]:
+        self.state.sleep_for(self.state.config.embed_latency)
+        if fail:
+            self.state.count("errors")
+            self._send_json(500, {"error": "fake ollama: injected failure"})
+            return None
+        return [embed_text(t, self.state.config.dim) for t in texts]
+
+    def _embed(self, body: Dict[str, Any], fail: bool) -> None:
+        raw = body.get("input", "")
+        texts = [raw] if isinstance(raw, str) else list(raw)
+        vectors = self._embed_inputs(texts, fail)
+        if vectors is not None:
+            self._send_json(200, {"model": body.get("model", "fake"), "embeddings": vectors})
+
+    def _embeddings(self, body: Dict[str, Any], fail: bool) -> None:
+        vectors = self._embed_inputs([body.get("prompt", "")], fail)
+        if vectors is not None:
+            self._send_json(200, {"embedding": vectors[0]})
+
+
+def make_server(config: ServerConfig | None = None, host: str = "127.0.0.1", port: int = 11434) -> ThreadingHTTPServer:
+    handler = type("FakeOllamaHandler", (_Handler,), {"state": _State(config or ServerConfig())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class FakeOllamaServer:
+    """在后台线程中运行，`with FakeOllamaServer(cfg) as url:` 得到 base_url；port=0 时自动选端口。"""
+
+    def __init__(self, config: ServerConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.server = make_server(config, host, port)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.server.RequestHandlerClass.state.counters)  # type: ignore[attr-defined]
+
+    def __enter__(self) -> str:
+        self._thread.start()
+        return self.base_url
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Ollama 兼容的压测替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", default="fixed:0.2", help="chat/generate 延迟分布")
+    parser.add_argument("--embed-latency", default="fixed:0.02", help="embed 延迟分布")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=4, help="同时处理的请求数（同 OLLAMA_NUM_PARALLEL）")
+    parser.add_argument("--max-queue", type=int, default=64, help="排队上限，超出返回 503")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="embedding 维度")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    config = ServerConfig(
+        latency=LatencyModel.parse(args.latency),
+        embed_latency=LatencyModel.parse(args.embed_latency),
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        concurrency=args.concurrency,
+        max_queue=args.max_queue,
+        dim=args.dim,
+        seed=args.seed,
+    )
+    server = make_server(config, args.host, args.port)
+    print(f"fake ollama listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -43,8 +43,26 @@ class Sentiment(BaseModel):
     score: float
 
 
+class ProcessorSpan(BaseModel):
+    """单个 Processor 在单篇文章上的一次执行记录。时间戳为 epoch 秒。"""
+
+    trace_id: str
+    span_id: str
+    processor: str
+    version: str = "1.0.0"
+    executor: str  # thread / async / process / eventbus / batch / cache
+    ready_at: float  # 依赖就绪、开始排队的时刻
+    start_at: float  # 实际开始执行的时刻
+    end_at: float
+    queue_wait_ms: float
+    exec_ms: float
+    cache_hit: bool = False
+    error: Optional[str] = None
+
+
 class ArticleNLPResult(BaseModel):
     id: str
+    trace_id: Optional[str] = None
 
     summary: Optional[str] = None
     events: Optional[List[Event]] = None
@@ -54,4 +72,5 @@ class ArticleNLPResult(BaseModel):
     topics: Optional[List[str]] = None
     category: Optional[str] = None
 
-    errors: Optional[dict[str, str]] = None  # proc -> err msg 
\ No newline at end of file
+    errors: Optional[dict[str, str]] = None  # proc -> err msg
+    spans: Optional[List[ProcessorSpan]] = None 
\ No newline at end of file
@@ -6,27 +6,65 @@
 from __future__ import annotations
 import logging
 import uuid
-from typing import Any, ClassVar, Dict, Protocol, Set, Type, TypeVar
+from typing import Any, ClassVar, Dict, List, Optional, Protocol, Set, Type, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from common.models import ProcessorSpan
 
 # --------------------- 基础结构 --------------------- #
 class Context(BaseModel):
-    """在流水线中贯穿的上下文对象。"""
+    """在流水线中贯穿的上下文对象。每篇文章一个，trace_id 随实例生成。"""
 
-    trace_id: str = uuid.uuid4().hex
+    trace_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     logger: Any = logging.getLogger("processor")  # 可被替换
     cache: Dict[str, Any] = {}
+    spans: List[ProcessorSpan] = []  # FlowRunner 记录的各 Processor 执行耗时
+    callbacks: List[Any] = []  # 挂到 LLM 调用上的 LangChain 回调（如 runner.usage.UsageTracker）
+    batch_trace_ids: List[str] = []  # 微批调用时各条目所属文章的 trace_id，与 run_batch 入参等长
+
+    def llm_config(self, processor: str, index: int | None = None) -> Dict[str, Any]:
+        """LLM chain 的 RunnableConfig：带上回调，并以 metadata 标明调用方 Processor 与所属文章。
+
+        `index` 为 run_batch 中的条目下标，用于取该条目所属文章的 trace_id。
+        """
+        trace_id = self.trace_id
+        if index is not None and index < len(self.batch_trace_ids):
+            trace_id = self.batch_trace_ids[index]
+        return {
+            "tags": [processor, trace_id],
+            "callbacks": list(self.callbacks),
+            "metadata": {"processor": processor, "trace_ids": [trace_id]},
+        }
 
 
 class Processor(Protocol):
-    """所有 NLP 处理组件需遵循的协议。"""
+    """所有 NLP 处理组件需遵循的协议。
+
+    可选生命周期钩子（FlowRunner 通过 getattr 探测，不强制实现）：
+        * `setup(self) -> None`：实例创建后调用一次，适合建立客户端 / 加载模型；
+        * `teardown(self) -> None`：FlowRunner 关闭时调用一次，释放资源。
+
+    可选原生异步实现 `async def arun(self, data, ctx) -> dict`：存在时 FlowRunner 在事件循环中
+    直接 await，适合 LLM 等 IO 密集步骤，大量请求在途也不占用线程。`run` 仍需实现，
+    供进程池 / EventBus worker 等同步场景使用。
+
+    可选批量实现 `run_batch(self, batch: list[dict], ctx) -> list[dict | Exception]`：
+    FlowRunner 批量模式（process_many / aprocess_stream）下跨文章攒批调用，返回值与输入等长，
+    元素为 Exception 时仅该篇记错；整批抛错则逐条回退到 `run`。类属性 `batch_size` 可指定批大小。
+    """
 
     # --- 类级元数据 ---
     name: ClassVar[str]
     version: ClassVar[str] = "1.0.0"
     requires: ClassVar[Set[str]] = set()
     provides: ClassVar[Set[str]] = set()
+    # None ⇒ 线程安全，全局共享一个实例；N ⇒ 非线程安全，预建 N 个实例轮流使用
+    pool_size: ClassVar[Optional[int]] = None
+    # 所需执行器："thread"（默认）| "async" | "process"，见 runner.executor
+    executor_kind: ClassVar[str] = "thread"
+    # 输出仅由 (version, 配置, requires 字段) 决定时可被 FlowRunner 结果缓存复用
+    cacheable: ClassVar[bool] = True
 
     def __init__(self, **config: Any) -> None: ...
 
@@ -2,13 +2,18 @@
 批量对已有 articles 表的数据进行标题向量化回填（新增字段）。
 
 使用方法：
-$ python backfill_embeddings.py
+$ python backfill_embeddings.py [--use_async]
 
 脚本会：
 1. 确保 pgvector 扩展已安装；
-2. 确保 news 表存在 embedding 向量列；
-3. 分批查询 embedding 为空的新闻标题，调用 OllamaEmbedding
-   生成 1024 维向量后写回数据库。
+2. 确保 news 表存在 embedding 向量列及待处理行的部分索引（此时不建向量索引）；
+3. 按 (时间戳, id) 顺序流式读取 embedding 为空的新闻标题（每块 BATCH_SIZE 条），
+   调用 OllamaEmbedding 生成 1024 维向量后写回数据库。
+   --use_async 时经 asyncpg 读写，下一批的读取、本批的写回与向量化重叠。
+   --claim 时按租约认领待处理行，可在多个进程 / 多台机器上同时运行，互不重复。
+4. 全部写完后再按 VECTOR_INDEX（默认 hnsw）建向量索引：先建索引会让每条 UPDATE 都维护索引，
+   回填完成后一次性构建快得多。--claim 模式下各 worker 不自行建索引，
+   全部 worker 结束后执行 `python pipeline/ensure_indexes.py`。
 
 运行前请先启动本地 Ollama 服务：
 $ ollama serve
@@ -18,15 +23,17 @@ $ ollama pull bge-m3:567m
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 import os
+from contextlib import aclosing, closing
 from dotenv import load_dotenv
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 import sys
 sys.path.append(str(BASE_DIR))
 load_dotenv()
-from datetime import datetime
-from repo import SqlNewsRepository
+from repo import IndexBuild, SqlNewsRepository, WriteBehind, open_async_repository, prefetch
 from langchain_ollama.embeddings import OllamaEmbeddings
 
 # ----------------------------- 配置区域 ----------------------------- #
@@ -48,11 +55,18 @@ TABLE_NAME = "articles"
 ORDER_TS_COLUMN = "created_at"  # 若表字段名不同可自行修改
 # ------------------------------------------------------------------ #
 
-def main() -> None:
+def _report_index_builds(builds: list[IndexBuild]) -> None:
+    for b in builds:
+        if b.created:
+            print(f"已建索引 {b.name}，耗时 {b.seconds:.2f}s")
+
+
+def main(claim: bool = False, worker: str | None = None) -> None:
+    """claim=True 时经租约认领取数，可同时启动多个进程 / 多台机器分摊积压，互不重复。"""
     repo = SqlNewsRepository(CONNECTION_STRING, table_name=TABLE_NAME, time_column=ORDER_TS_COLUMN)
 
-    # 若需要可确保 embedding 列
-    repo.ensure_embedding_schema(vector_size=VECTOR_SIZE)
+    # 确保 embedding 列与部分索引；向量索引待写入完成后再建
+    repo.ensure_embedding_schema(vector_size=VECTOR_SIZE, vector_index=None)
 
     # 初始化 Ollama Embeddings
     embedding_model = OllamaEmbeddings(
@@ -61,27 +75,70 @@ def main() -> None:
     )
 
     total_updated = 0
-    last_seen_ts = datetime.min  # 时间戳游标
-    while True:
-        batch = repo.fetch_without_embedding(after_ts=last_seen_ts, limit=BATCH_SIZE)
-        if not batch:
-            print("Batch length 0, End.")
-            break
-
-        # 解包结果
-        ids = [row[0] for row in batch]
-        titles = [row[2] for row in batch]
+    if claim:
+        batches = repo.iter_claimed("embedding", worker=worker, chunk_size=BATCH_SIZE)
+    else:
+        batches = repo.iter_without_embedding(chunk_size=BATCH_SIZE)
+    with closing(batches):
+        for batch in batches:
+            # 解包结果
+            ids = [row[0] for row in batch]
+            titles = [row[2] for row in batch]
+
+            vectors = embedding_model.embed_documents(list(titles))
+
+            # 写回
+            repo.update_embeddings(list(zip(ids, vectors)))
+            total_updated += len(batch)
+            print(f"已回填 {total_updated} 条新闻向量（游标 {batch[-1][1]}, id={batch[-1][0]}）")
+
+    if claim:
+        print("本 worker 已完成；全部 worker 结束后执行 pipeline/ensure_indexes.py 建向量索引。")
+    else:
+        _report_index_builds(repo.ensure_embedding_schema(vector_size=VECTOR_SIZE))
+    print("全部完成！")
 
-        vectors = embedding_model.embed_documents(list(titles))
 
-        # 写回
-        repo.update_embeddings(list(zip(ids, vectors)))
-        total_updated += len(batch)
-        last_seen_ts = batch[-1][1]  # 更新游标
-        print(f"已回填 {total_updated} 条新闻向量（最新时间戳 {last_seen_ts}）")
+async def main_async() -> None:
+    repo = await open_async_repository(CONNECTION_STRING, table_name=TABLE_NAME, time_column=ORDER_TS_COLUMN)
+    embedding_model = OllamaEmbeddings(
+        model=OLLAMA_MODEL,
+        base_url=OLLAMA_BASE_URL,
+    )
+    writes = WriteBehind()
+    total_updated = 0
+    try:
+        await repo.ensure_embedding_schema(vector_size=VECTOR_SIZE, vector_index=None)
+        async with aclosing(prefetch(repo.iter_without_embedding(chunk_size=BATCH_SIZE))) as batches:
+            async for batch in batches:
+                ids = [row[0] for row in batch]
+                titles = [row[2] for row in batch]
+
+                vectors = await embedding_model.aembed_documents(list(titles))
+
+                await writes.submit(repo.update_embeddings(list(zip(ids, vectors))))
+                total_updated += len(batch)
+                print(f"已回填 {total_updated} 条新闻向量（游标 {batch[-1][1]}, id={batch[-1][0]}）")
+        await writes.flush()
+        _report_index_builds(await repo.ensure_embedding_schema(vector_size=VECTOR_SIZE))
+    finally:
+        try:
+            await writes.flush()
+        finally:
+            await repo.dispose()
 
     print("全部完成！")
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--use_async", action="store_true", help="使用异步pipeline")
+    parser.add_argument("--claim", action="store_true", help="租约认领模式，可多进程并行（仅同步模式）")
+    parser.add_argument("--worker", default=None, help="认领模式下的 worker 标识，默认 主机名:进程号")
+    args = parser.parse_args()
+    if args.claim and args.use_async:
+        parser.error("--claim 仅支持同步模式")
+    if args.use_async:
+        asyncio.run(main_async())
+    else:
+        main(claim=args.claim, worker=args.worker) 
\ No newline at end of file
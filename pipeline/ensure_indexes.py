@@ -0,0 +1,116 @@
+"""
+为回填脚本的分页查询建索引，并输出建索引前后的执行计划与构建耗时。
+
+使用方法：
+$ python pipeline/ensure_indexes.py --vector_index hnsw --index_params m=16,ef_construction=64 \
+      --maintenance_work_mem 2GB --analyze --report index_report.json
+
+脚本会：
+1. 记录 embedding / abstract 两条分页查询当前的执行计划；
+2. 调用 ensure_abstract_schema / ensure_embedding_schema：在待处理行上建部分索引，
+   PostgreSQL 另建 HNSW / IVFFlat 向量索引（CONCURRENTLY，不阻塞写入；已存在则跳过）；
+3. 再次记录执行计划，打印各索引构建耗时与前后计划对比。
+
+`--analyze` 在 PostgreSQL 上使用 EXPLAIN (ANALYZE, BUFFERS)，会真实执行查询（只读，带 LIMIT）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+import sys
+
+from dotenv import load_dotenv
+from sqlalchemy.exc import DBAPIError
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+load_dotenv()
+from repo import SqlNewsRepository
+from repo.news_repository import VECTOR_INDEX, VECTOR_INDEX_BUILD_MEM, VECTOR_INDEX_PARAMS
+
+CONNECTION_STRING = os.getenv("PG_CONN")
+TABLE_NAME = os.getenv("TABLE_NAME", "articles")
+ORDER_TS_COLUMN = os.getenv("ORDER_TS_COLUMN", "created_at")
+VECTOR_SIZE = int(os.getenv("VECTOR_SIZE", "1024"))
+KINDS = ("embedding", "abstract")
+
+
+def _explain(repo: SqlNewsRepository, kind: str, **kwargs) -> list[str]:
+    try:
+        return repo.explain_pending(kind, **kwargs)
+    except DBAPIError as exc:  # 首次运行时待处理列尚未创建
+        return [f"(不可用) {exc.orig}"]
+
+
+def build_indexes(
+    repo: SqlNewsRepository,
+    *,
+    vector_size: int = VECTOR_SIZE,
+    vector_index: str | None = VECTOR_INDEX,
+    index_params: str | None = VECTOR_INDEX_PARAMS,
+    maintenance_work_mem: str | None = VECTOR_INDEX_BUILD_MEM,
+    analyze: bool = False,
+    limit: int = 1000,
+) -> dict:
+    before = {k: _explain(repo, k, limit=limit, analyze=analyze) for k in KINDS}
+    builds = repo.ensure_abstract_schema() + repo.ensure_embedding_schema(
+        vector_size,
+        vector_index=vector_index,
+        index_params=index_params,
+        maintenance_work_mem=maintenance_work_mem,
+    )
+    after = {k: _explain(repo, k, limit=limit, analyze=analyze) for k in KINDS}
+    return {
+        "dialect": repo.dialect,
+        "table": repo.table_name,
+        "indexes": [asdict(b) for b in builds],
+        "plans": {k: {"before": before[k], "after": after[k]} for k in KINDS},
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"[{report['dialect']}] {report['table']}")
+    for b in report["indexes"]:
+        state = f"新建 {b['seconds']:.2f}s" if b["created"] else "已存在，跳过"
+        print(f"  索引 {b['name']}: {state}")
+    for kind, plans in report["plans"].items():
+        for stage in ("before", "after"):
+            print(f"--- {kind} 分页查询计划（{stage}）")
+            for line in plans[stage]:
+                print(f"    {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vector_index", default=VECTOR_INDEX, help="hnsw | ivfflat | none")
+    parser.add_argument("--index_params", default=VECTOR_INDEX_PARAMS, help="如 m=16,ef_construction=64 或 lists=1000")
+    parser.add_argument("--maintenance_work_mem", default=VECTOR_INDEX_BUILD_MEM, help="向量索引构建内存，如 2GB")
+    parser.add_argument("--vector_size", type=int, default=VECTOR_SIZE)
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE（PostgreSQL）")
+    parser.add_argument("--report", default=None, help="JSON 报告输出路径")
+    args = parser.parse_args()
+
+    repo = SqlNewsRepository(CONNECTION_STRING, table_name=TABLE_NAME, time_column=ORDER_TS_COLUMN)
+    try:
+        report = build_indexes(
+            repo,
+            vector_size=args.vector_size,
+            vector_index=args.vector_index,
+            index_params=args.index_params,
+            maintenance_work_mem=args.maintenance_work_mem,
+            analyze=args.analyze,
+        )
+    finally:
+        repo.dispose()
+    print_report(report)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入 {args.report}")
+
+
+if __name__ == "__main__":
+    main()
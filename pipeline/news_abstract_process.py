@@ -12,22 +12,43 @@
    ORDER_TS_COLUMN=created_at
    TEXT_COLUMN=content
    ABSTRACT_COLUMN=abstract
+   # 异步模式（--use_async）的并发控制，可选
+   LLM_INITIAL_CONCURRENCY=4   LLM_MAX_CONCURRENCY=32
+   LLM_RATE_LIMIT=0            # 每秒请求上限，0 表示不限
+   LLM_MAX_ATTEMPTS=3          # 单条含首次在内的最大尝试次数
+   # 近重复去重：命中已有摘要的通稿直接复用，不再调用 LLM（--no_dedup 关闭）
+   DEDUP_METHOD=minhash        # 或 simhash（仅支持高阈值，DEDUP_THRESHOLD 需约 ≥ 0.9）
+   DEDUP_THRESHOLD=0.8         DEDUP_CAPACITY=10000
+   # 打包模式（--packed）：多篇短文按 token 预算合并进同一请求
+   PACK_TOKEN_BUDGET=1500      PACK_MAX_ITEMS=8
+   # 长文：超出输入预算先截断，超出 map-reduce 阈值则分块并发摘要后归约
+   SUMMARY_INPUT_TOKENS=3000   SUMMARY_MAP_REDUCE_TOKENS=8000   SUMMARY_MAP_CONCURRENCY=4
+   # token 记账（--usage_report 输出 JSON 报告，--token_budget 限制本次运行的 token 总量）
+   LLM_PRICES=qwen3-4b=0.0003/0.0006   # 每千 token 输入 / 输出价格，可选
+   USAGE_REPORT_ARTICLES=10000         # 报告中按文章明细最多保留的文章数（LRU）
+   # --usage_calls calls.jsonl 将每次 LLM 调用逐行写入文件，不在内存中保留
 
 执行脚本：
 $ python pipeline/news_abstract_process.py
+多进程 / 多机并行（租约认领，CLAIM_LEASE_SECONDS 控制租约时长，默认 600 秒）：
+$ python pipeline/news_abstract_process.py --claim   # 每个进程各启动一份
 """
 
 from __future__ import annotations
 
 import os
 import tqdm
-from datetime import datetime
 import argparse
 import asyncio
+from contextlib import ExitStack, aclosing, closing
 
 from dotenv import load_dotenv
-from repo import SqlNewsRepository
-from processors.summarizer import summarize
+from repo import SqlNewsRepository, WriteBehind, open_async_repository, prefetch
+from algo.summarizers.llm_summarizer import pack_by_budget
+from processors.summarizer import summarize, summarize_async, summarize_pack_async, summarize_packed
+from algo.dedup import NearDupIndex, plan_batch
+from runner.limiter import AdaptiveCaller, AIMDLimiter, TokenBucket
+from runner.usage import UsageTracker
 
 # 加载 .env 环境变量
 load_dotenv()
@@ -44,71 +65,244 @@ ABSTRACT_COLUMN = os.getenv("ABSTRACT_COLUMN", "summary")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
 MAX_ABSTRACT_CHARS = int(os.getenv("MAX_ABSTRACT_CHARS", "160"))
 
+LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "4"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", "0"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
 
-def process_batch_sync(texts, max_chars, summarize_func):
-    abstracts = []
-    keywords = []
-    for content in tqdm.tqdm(texts):
-        result = summarize_func(content, max_chars=max_chars)
-        abstracts.append(result.summary if result else None)
-        keywords.append(result.keywords if result else [])
-    return abstracts, keywords
+DEDUP_METHOD = os.getenv("DEDUP_METHOD", "minhash")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", "10000"))
+
+USAGE_REPORT_ARTICLES = int(os.getenv("USAGE_REPORT_ARTICLES", "10000"))
+
+
+def build_caller() -> AdaptiveCaller:
+    limiter = AIMDLimiter(
+        initial=min(LLM_INITIAL_CONCURRENCY, LLM_MAX_CONCURRENCY), max_limit=LLM_MAX_CONCURRENCY
+    )
+    bucket = TokenBucket(LLM_RATE_LIMIT, burst=LLM_INITIAL_CONCURRENCY) if LLM_RATE_LIMIT > 0 else None
+    return AdaptiveCaller(limiter, bucket, max_attempts=LLM_MAX_ATTEMPTS)
 
-async def process_batch_async(texts, max_chars, summarize_func):
-    tasks = [summarize_func(content, max_chars=max_chars) for content in texts]
-    results = await asyncio.gather(*tasks)
+
+def build_dedup_index() -> NearDupIndex:
+    return NearDupIndex(threshold=DEDUP_THRESHOLD, method=DEDUP_METHOD, capacity=DEDUP_CAPACITY)
+
+
+def _split(results):
     abstracts = [r.summary if r else None for r in results]
     keywords = [r.keywords if r else [] for r in results]
     return abstracts, keywords
 
-def main_sync():
-    repo = SqlNewsRepository(CONNECTION_STRING, table_name=TABLE_NAME, time_column=ORDER_TS_COLUMN)
-    cursor_ts = datetime.min
-    total = 0
-    while True:
-        batch = repo.fetch_without_abstract(after_ts=cursor_ts, limit=BATCH_SIZE)
-        if not batch:
-            print("处理完成，无更多数据。")
-            break
 
-        ids = [row[0] for row in batch]
-        texts = [row[2] for row in batch]
+def _dedup_results(index, ids, plan, leader_results):
+    """leader 成功则把结果登记进索引供后续复用，失败则移出索引，避免近重复挂靠到空结果。"""
+    for i in plan.leaders:
+        if leader_results.get(i):
+            index.update(ids[i], leader_results[i])
+        else:
+            index.discard(ids[i])
+    return plan.resolve(leader_results)
+
+
+def _usage_kwargs(usage, ids, positions):
+    """usage 为 UsageTracker 时返回传给摘要函数的 config 关键字参数，用量按新闻 id 归属。"""
+    if usage is None:
+        return {}
+    if isinstance(positions, int):
+        positions = [positions]
+    trace_ids = [str(ids[i]) for i in positions] if ids is not None else []
+    return {"config": usage.config("summarizer_llm", trace_ids)}
+
+
+def process_batch_sync(texts, max_chars, summarize_func, ids=None, index=None, packed_func=None, usage=None):
+    """packed_func 形如 `summarize_packed(texts, max_chars)`，给定时整批交由其打包处理。"""
+    plan = plan_batch(index, ids, texts) if index is not None else None
+    positions = plan.leaders if plan is not None else list(range(len(texts)))
+    if packed_func is not None:
+        kwargs = {"config": [_usage_kwargs(usage, ids, i)["config"] for i in positions]} if usage is not None else {}
+        outs = packed_func([texts[i] for i in positions], max_chars=max_chars, **kwargs)
+    else:
+        outs = [
+            summarize_func(texts[i], max_chars=max_chars, **_usage_kwargs(usage, ids, i))
+            for i in tqdm.tqdm(positions)
+        ]
+    leader_results = dict(zip(positions, outs))
+    if plan is None:
+        return _split(outs)
+    return _split(_dedup_results(index, ids, plan, leader_results))
+
 
-        # 生成摘要
-        abstracts, keywords = process_batch_sync(texts, MAX_ABSTRACT_CHARS, summarize)
-        repo.update_abstracts(list(zip(ids, abstracts, keywords)))
-        total += len(batch)
-        cursor_ts = batch[-1][1]
-        print(f"已生成摘要 {total} 条，最新时间戳 {cursor_ts}")
+async def _call_or_none(caller, func, *args, **kwargs):
+    try:
+        return await caller.call(func, *args, **kwargs)
+    except Exception:  # noqa: BLE001  重试已耗尽
+        return None
 
 
-async def main_async():
+async def _summarize_positions(texts, positions, max_chars, summarize_func, caller, pack_func, ids=None, usage=None):
+    results = {}
+    if pack_func is not None:
+        live = [i for i in positions if texts[i]]
+        groups = pack_by_budget([texts[i] for i in live])
+        groups = [[live[j] for j in g] for g in groups if len(g) > 1]
+        outs = await asyncio.gather(
+            *(
+                _call_or_none(
+                    caller, pack_func, [texts[i] for i in g], max_chars=max_chars, **_usage_kwargs(usage, ids, g)
+                )
+                for g in groups
+            )
+        )
+        for group, out in zip(groups, outs):
+            for i, r in zip(group, out or []):
+                results[i] = r
+    missing = [i for i in positions if results.get(i) is None]  # 未打包或打包未取回的逐篇补齐
+    outs = await asyncio.gather(
+        *(
+            _call_or_none(caller, summarize_func, texts[i], max_chars=max_chars, **_usage_kwargs(usage, ids, i))
+            for i in missing
+        )
+    )
+    results.update(zip(missing, outs))
+    return results
+
+
+async def process_batch_async(
+    texts, max_chars, summarize_func, caller=None, ids=None, index=None, pack_func=None, usage=None
+):
+    """经 AdaptiveCaller 控制并发 / 速率并重试；重试耗尽的条目记为 None，不影响整批。
+    pack_func 形如 `summarize_pack_async(texts, max_chars)`，给定时短文先按 token 预算打包请求。"""
+    caller = caller or build_caller()
+    plan = plan_batch(index, ids, texts) if index is not None else None
+    positions = plan.leaders if plan is not None else list(range(len(texts)))
+    leader_results = await _summarize_positions(
+        texts, positions, max_chars, summarize_func, caller, pack_func, ids, usage
+    )
+    if plan is None:
+        return _split([leader_results[i] for i in range(len(texts))])
+    return _split(_dedup_results(index, ids, plan, leader_results))
+
+def _report_dedup(index):
+    if index is not None:
+        st = index.stats
+        print(f"近重复去重：处理 {st.seen} 条，复用 {st.duplicates} 条（{st.ratio:.1%}），节省 LLM 调用 {st.saved_calls} 次")
+
+
+def build_usage(token_budget=None, per_article=False, calls_sink=None):
+    """默认只累计总量 / 按 Processor / 按模型；per_article 时按文章明细最多保留 USAGE_REPORT_ARTICLES 篇。"""
+    return UsageTracker(
+        budget_tokens=token_budget or None,
+        keep_articles=USAGE_REPORT_ARTICLES if per_article else 0,
+        calls_sink=calls_sink,
+    )
+
+
+def _report_usage(usage, path=None):
+    total = usage.report(per_article=False)["total"]
+    print(f"LLM 用量：调用 {total['calls']} 次，输入 {total['input_tokens']:.0f} / 输出 {total['output_tokens']:.0f} tokens，"
+          f"费用 {total['cost']:.4f}")
+    if path:
+        usage.write_report(path)
+        print(f"用量报告已写入 {path}")
+
+
+def _batch_usage_line(usage, before):
+    used = usage.total.total_tokens
+    return f"本批 {used - before:.0f} tokens，累计 {used:.0f}"
+
+
+def main_sync(dedup=True, packed=False, usage=None, usage_report=None, claim=False, worker=None):
+    """claim=True 时经租约认领取数，可同时启动多个进程 / 多台机器分摊积压，互不重复。"""
+    usage = usage or build_usage()
     repo = SqlNewsRepository(CONNECTION_STRING, table_name=TABLE_NAME, time_column=ORDER_TS_COLUMN)
-    cursor_ts = datetime.min
+    index = build_dedup_index() if dedup else None
     total = 0
-    while True:
-        batch = repo.fetch_without_abstract(after_ts=cursor_ts, limit=BATCH_SIZE)
-        if not batch:
+    if claim:
+        source = repo.iter_claimed("abstract", worker=worker, chunk_size=BATCH_SIZE)
+    else:
+        source = repo.iter_without_abstract(chunk_size=BATCH_SIZE)
+    with closing(source) as batches:
+        for batch in batches:
+            if usage.exhausted:
+                print("token 预算已用尽，提前结束。")
+                break
+            ids = [row[0] for row in batch]
+            texts = [row[2] for row in batch]
+            used = usage.total.total_tokens
+
+            # 生成摘要
+            abstracts, keywords = process_batch_sync(
+                texts, MAX_ABSTRACT_CHARS, summarize, ids, index, summarize_packed if packed else None, usage
+            )
+            repo.update_abstracts(list(zip(ids, abstracts, keywords)))
+            total += len(batch)
+            print(f"已生成摘要 {total} 条，游标 ({batch[-1][1]}, {ids[-1]})，{_batch_usage_line(usage, used)}")
+        else:
             print("处理完成，无更多数据。")
-            break
+    _report_dedup(index)
+    _report_usage(usage, usage_report)
+
 
-        ids = [row[0] for row in batch]
-        texts = [row[2] for row in batch]
+async def main_async(dedup=True, packed=False, usage=None, usage_report=None):
+    """PostgreSQL 上经 asyncpg 读写；下一批的读取、本批的写回都与 LLM 处理重叠。"""
+    usage = usage or build_usage()
+    repo = await open_async_repository(CONNECTION_STRING, table_name=TABLE_NAME, time_column=ORDER_TS_COLUMN)
+    index = build_dedup_index() if dedup else None
+    caller = build_caller()  # 跨批次复用，并发上限持续逼近后端容量
+    writes = WriteBehind()
+    total = 0
+    try:
+        async with aclosing(prefetch(repo.iter_without_abstract(chunk_size=BATCH_SIZE))) as batches:
+            async for batch in batches:
+                if usage.exhausted:
+                    print("token 预算已用尽，提前结束。")
+                    break
+                ids = [row[0] for row in batch]
+                texts = [row[2] for row in batch]
+                used = usage.total.total_tokens
 
-        # 生成摘要
-        abstracts, keywords = await process_batch_async(texts, MAX_ABSTRACT_CHARS, summarize)
-        repo.update_abstracts(list(zip(ids, abstracts, keywords)))
-        total += len(batch)
-        cursor_ts = batch[-1][1]
-        print(f"已生成摘要 {total} 条，最新时间戳 {cursor_ts}")
+                # 生成摘要
+                abstracts, keywords = await process_batch_async(
+                    texts, MAX_ABSTRACT_CHARS, summarize_async, caller, ids, index,
+                    summarize_pack_async if packed else None, usage,
+                )
+                await writes.submit(repo.update_abstracts(list(zip(ids, abstracts, keywords))))
+                total += len(batch)
+                print(f"已生成摘要 {total} 条，游标 ({batch[-1][1]}, {ids[-1]})，并发上限 {caller.limiter.limit}，"
+                      f"{caller.stats.as_dict()}，{_batch_usage_line(usage, used)}")
+            else:
+                print("处理完成，无更多数据。")
+    finally:
+        try:
+            await writes.flush()  # 已生成的摘要即使后续出错也落库
+        finally:
+            await repo.dispose()
+    _report_dedup(index)
+    _report_usage(usage, usage_report)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--use_async", action="store_true", help="使用异步pipeline")
+    parser.add_argument("--no_dedup", action="store_true", help="关闭近重复摘要复用")
+    parser.add_argument("--packed", action="store_true", help="多篇短文打包进同一请求")
+    parser.add_argument("--usage_report", default=None, help="LLM token 用量报告（JSON）输出路径")
+    parser.add_argument("--usage_calls", default=None, help="逐次 LLM 调用明细（JSONL）输出路径")
+    parser.add_argument("--token_budget", type=int, default=0, help="本次运行的 token 上限，0 表示不限")
+    parser.add_argument("--claim", action="store_true", help="租约认领模式，可多进程并行（仅同步模式）")
+    parser.add_argument("--worker", default=None, help="认领模式下的 worker 标识，默认 主机名:进程号")
     args = parser.parse_args()
+    if args.claim and args.use_async:
+        parser.error("--claim 仅支持同步模式")
 
-    if args.use_async:
-        asyncio.run(main_async())
-    else:
-        main_sync()
+    with ExitStack() as stack:
+        sink = stack.enter_context(open(args.usage_calls, "a", encoding="utf-8")) if args.usage_calls else None
+        usage = build_usage(args.token_budget, per_article=bool(args.usage_report), calls_sink=sink)
+        if args.use_async:
+            asyncio.run(main_async(dedup=not args.no_dedup, packed=args.packed, usage=usage, usage_report=args.usage_report))
+        else:
+            main_sync(
+                dedup=not args.no_dedup, packed=args.packed, usage=usage, usage_report=args.usage_report,
+                claim=args.claim, worker=args.worker,
+            )
@@ -5,6 +5,7 @@ from typing import Dict, List
 
 from common.protocol import register, Processor, Context
 from common.models import Event, EventArg
+from algo.event_gate import BASE_TRIGGERS
 
 @register
 class DummyEventExtractor(Processor):
@@ -17,7 +18,7 @@ class DummyEventExtractor(Processor):
 
     def __init__(self, **cfg):
         # 可接收 regex 列表、关键词等配置
-        self.pattern = re.compile(r"(宣布|发布|推出|签署|完成|收购)")
+        self.pattern = re.compile("(" + "|".join(BASE_TRIGGERS) + ")")
 
     def run(self, data: Dict[str, str], ctx: Context):  # type: ignore[override]
         text = data["clean_text"]
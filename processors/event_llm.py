@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 from typing import Dict, List
 
@@ -12,6 +13,8 @@ from pydantic import Field, ValidationError, BaseModel
 
 from common.protocol import register, Processor, Context
 from common.models import Event
+from algo.event_gate import TriggerGate
+from algo.llm_router import get_default_router
 
 load_dotenv()
 
@@ -50,11 +53,14 @@ class LLMEvtExtractor(Processor):
     requires = {"clean_text"}
     provides = {"events"}
 
-    def __init__(self, max_events: int = 3, **cfg):
+    def __init__(self, max_events: int = 3, llm=None, cascade: bool = False, context_window: int = 0, **cfg):
         super().__init__(**cfg)
         self.max_events = max_events
-        # format="json"避免推理模型输出think标签
-        self.llm = ChatOllama(model=OLLAMA_MODEL,
+        # cascade=True 时先经触发词门控：无候选触发词的文章不调用 LLM，其余只送含触发词的句子
+        self.gate = TriggerGate(context_window=context_window) if cascade else None
+        # format="json"避免推理模型输出think标签；llm 可注入其它 ChatModel，
+        # 配置了 LLM_BACKENDS 时默认使用与摘要共享的多后端路由
+        self.llm = llm or get_default_router() or ChatOllama(model=OLLAMA_MODEL,
                       base_url=OLLAMA_BASE_URL,
                       temperature=0,
                      format="json"
@@ -82,23 +88,69 @@ class LLMEvtExtractor(Processor):
         # 将组件串成 chain
         self.chain = self.prompt | self.llm | self.parser
 
-    
+    def _gated_text(self, data: Dict[str, str]) -> str:
+        text = data["clean_text"]
+        return self.gate.select(text) if self.gate is not None else text
+
+    def _chain_input(self, text: str) -> Dict[str, object]:
+        return {
+            "sentence": text,
+            "max_events": self.max_events,
+            "types": ", ".join(EVENT_TYPES),
+        }
+
+    def _to_output(self, llm_result: EventList | None) -> Dict[str, List[Event]]:
+        if llm_result:
+            events = llm_result.data[:self.max_events]                    # truncate if too many
+        else:
+            events = []
+        return {"events": events}
+
     def run(self, data: Dict[str, str], ctx: Context):  # type: ignore[override]
-        sentence = data["clean_text"]
+        text = self._gated_text(data)
+        if not text:
+            return {"events": []}
         try:
             llm_result = self.chain.invoke(
-                    {
-                        "sentence": sentence,
-                        "max_events": self.max_events,
-                        "types": ", ".join(EVENT_TYPES),
-                    },
-                    config={"tags": ["event_llm", ctx.trace_id]},
+                    self._chain_input(text),
+                    config=ctx.llm_config(self.name),
+                )
+        except ValidationError as e:                           # JSON 字段不合法
+            ctx.logger.error("event_parse_fail", exc_info=e)
+            raise
+        return self._to_output(llm_result)
+
+    def run_batch(self, batch: List[Dict[str, str]], ctx: Context):
+        texts = [self._gated_text(d) for d in batch]
+        results: List[object] = [{"events": []} for _ in batch]
+        positions = [i for i, t in enumerate(texts) if t]
+        if positions:
+            outs = self.chain.batch(
+                [self._chain_input(texts[i]) for i in positions],
+                config=[ctx.llm_config(self.name, i) for i in positions],
+                return_exceptions=True,
+            )
+            for i, o in zip(positions, outs):
+                results[i] = o if isinstance(o, Exception) else self._to_output(o)
+        return results
+
+    async def arun(self, data: Dict[str, str], ctx: Context):
+        text = self._gated_text(data)
+        if not text:
+            return {"events": []}
+        try:
+            llm_result = await self.chain.ainvoke(
+                    self._chain_input(text),
+                    config=ctx.llm_config(self.name),
                 )
-            if llm_result:
-                events = llm_result.data[:self.max_events]                    # truncate if too many
-            else:
-                events = []
         except ValidationError as e:                           # JSON 字段不合法
             ctx.logger.error("event_parse_fail", exc_info=e)
             raise
-        return {"events": events} 
\ No newline at end of file
+        return self._to_output(llm_result) 
+
+    def gate_stats(self) -> Dict[str, object] | None:
+        return self.gate.stats.as_dict() if self.gate is not None else None
+
+    def teardown(self) -> None:
+        if self.gate is not None:
+            logging.getLogger("processor").info("event_llm gate stats: %s", self.gate_stats())
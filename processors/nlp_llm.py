@@ -0,0 +1,141 @@
+"""processors.nlp_llm
+
+摘要、关键词、事件一次抽取的融合 Processor。
+
+`summarizer_llm` 与 `event_llm` 各自把全文发给 LLM 一次；本 Processor 用一个结构化输出请求同时
+产出 `summary` / `keywords` / `events`，每篇文章的 LLM 调用数与输入 token 约减半。
+通过 `provides` 接入 FlowRunner，替代上述两个步骤（三者不可同时选用，否则字段冲突）：
+
+    FlowRunner(steps=["cleaner", "nlp_llm"])
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_community.chat_models import ChatOllama
+from langchain_core.prompts import ChatPromptTemplate
+from langchain.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field, ValidationError
+
+from common.protocol import register, Processor, Context
+from common.models import Event
+from algo.keywords import KeywordFilter, get_keyword_filter
+from algo.llm_router import get_default_router
+from algo.summarizers.llm_summarizer import DEFAULT_MAX_CHARS, INPUT_TOKEN_BUDGET
+from algo.text import clip_summary, truncate_to_budget
+from processors.event_llm import EVENT_TYPES, OLLAMA_BASE_URL, OLLAMA_MODEL
+
+load_dotenv()
+
+
+class NlpResult(BaseModel):
+    summary: str = Field(description="一句话摘要")
+    keywords: List[str] = Field(description="新闻主题关键词列表", default_factory=list)
+    events: List[Event] = Field(description="真实发生的事件列表，无事件为 []", default_factory=list)
+
+
+PROMPT_TMPL = """
+你是一名资深中文新闻编辑兼事件抽取系统，请阅读【新闻正文】，一次完成以下三项任务：
+1. 用 **一句话** 写出精炼摘要，**长度 ≤ {max_chars} 个汉字**（标点也计入长度，英文/数字按 1 字），
+   避免使用“本文”“文章”等空洞前缀。
+2. 提取新闻的主题关键词，需规避常见的广告、营销等干扰信息。
+3. 识别正文中 *真实发生* 的事件，**最多 {max_events} 条**，若无事件 events 为 []。
+   允许的事件类型: {types}
+
+【注意】不得编造信息，必须严格依据原文，不要加正文里没有的内容。
+【输出格式】仅输出 JSON，无需输出推理过程：
+{format_instructions}
+"""
+
+
+def build_nlp_chain(llm):
+    """prompt | llm | parser；llm 可为任意 LangChain ChatModel（或兼容的 Runnable）。"""
+    parser = PydanticOutputParser(pydantic_object=NlpResult)
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", PROMPT_TMPL),
+        ("human", "【新闻正文】:{article}"),
+    ])
+    return prompt.partial(
+        format_instructions=parser.get_format_instructions(),
+        types=", ".join(EVENT_TYPES),
+    ) | llm | parser
+
+
+@register
+class LLMNlpExtractor(Processor):
+    name = "nlp_llm"
+    version = "1.0.0"
+    requires = {"clean_text"}
+    provides = {"summary", "keywords", "events"}
+
+    def __init__(
+        self,
+        max_chars: int = DEFAULT_MAX_CHARS,
+        max_events: int = 3,
+        input_token_budget: int = INPUT_TOKEN_BUDGET,
+        llm=None,
+        keyword_filter: KeywordFilter | None = None,
+        **cfg,
+    ):
+        super().__init__(**cfg)
+        self.max_chars = max_chars
+        self.max_events = max_events
+        self.input_token_budget = input_token_budget
+        self.keyword_filter = keyword_filter or get_keyword_filter()
+        # 与 event_llm 相同：配置了 LLM_BACKENDS 时默认走共享路由，否则使用本地 Ollama
+        self.llm = llm or get_default_router() or ChatOllama(
+            model=OLLAMA_MODEL, base_url=OLLAMA_BASE_URL, temperature=0, format="json"
+        )
+        self.chain = build_nlp_chain(self.llm)
+
+    def _chain_input(self, data: Dict[str, str]) -> Dict[str, object]:
+        # 超长正文按导语 + 显著性截断；融合请求不做 map-reduce，超长文章请改用 summarizer_llm
+        return {
+            "article": truncate_to_budget(data["clean_text"], self.input_token_budget),
+            "max_chars": self.max_chars,
+            "max_events": self.max_events,
+        }
+
+    def _to_output(self, result: Optional[NlpResult]) -> Dict[str, object]:
+        if result is None:
+            return {"summary": None, "keywords": None, "events": []}
+        return {
+            "summary": clip_summary(result.summary, self.max_chars),
+            "keywords": self.keyword_filter.clean(result.keywords),
+            "events": result.events[:self.max_events],
+        }
+
+    def run(self, data: Dict[str, str], ctx: Context):  # type: ignore[override]
+        if not data["clean_text"]:
+            return self._to_output(None)
+        try:
+            result = self.chain.invoke(self._chain_input(data), config=ctx.llm_config(self.name))
+        except ValidationError as e:                           # JSON 字段不合法
+            ctx.logger.error("nlp_parse_fail", exc_info=e)
+            raise
+        return self._to_output(result)
+
+    def run_batch(self, batch: List[Dict[str, str]], ctx: Context):
+        results: List[object] = [self._to_output(None) for _ in batch]
+        positions = [i for i, d in enumerate(batch) if d["clean_text"]]
+        if positions:
+            outs = self.chain.batch(
+                [self._chain_input(batch[i]) for i in positions],
+                config=[ctx.llm_config(self.name, i) for i in positions],
+                return_exceptions=True,
+            )
+            for i, o in zip(positions, outs):
+                results[i] = o if isinstance(o, Exception) else self._to_output(o)
+        return results
+
+    async def arun(self, data: Dict[str, str], ctx: Context):
+        if not data["clean_text"]:
+            return self._to_output(None)
+        try:
+            result = await self.chain.ainvoke(self._chain_input(data), config=ctx.llm_config(self.name))
+        except ValidationError as e:                           # JSON 字段不合法
+            ctx.logger.error("nlp_parse_fail", exc_info=e)
+            raise
+        return self._to_output(result)
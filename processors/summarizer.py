@@ -8,42 +8,107 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 from common.protocol import Processor, Context, register
-from algo.summarizers.llm_summarizer import  AbstractSummarizer, LLMSummarizerImpl, SummaryResult, build_tongyi_chain
+from algo.summarizers.llm_summarizer import (
+    PACK_MAX_ITEMS,
+    PACK_TOKEN_BUDGET,
+    AbstractSummarizer,
+    LLMSummarizerImpl,
+    SummaryResult,
+    build_packed_chain,
+    build_tongyi_chain,
+    build_tongyi_llm,
+)
+from algo.llm_router import get_default_router
 
 load_dotenv()
 
 DEFAULT_MAX_CHARS = int(os.getenv("MAX_ABSTRACT_CHARS", "160"))
 
-# 单例 summarizer 实例
+# 单例 summarizer 实例；配置了 LLM_BACKENDS 时经共享的多后端路由调用，否则使用通义
 @lru_cache(maxsize=1)
 def _get_llm_summarizer():
-    return LLMSummarizerImpl(max_chars=DEFAULT_MAX_CHARS, chain=build_tongyi_chain())
+    router = get_default_router()
+    if router is not None:
+        return LLMSummarizerImpl(max_chars=DEFAULT_MAX_CHARS, llm=router)
+    return LLMSummarizerImpl(
+        max_chars=DEFAULT_MAX_CHARS,
+        chain=build_tongyi_chain(),
+        packed_chain=build_packed_chain(build_tongyi_llm()),
+    )
 
 @register
 class LLMSummarizer(Processor, AbstractSummarizer):
     name = "summarizer_llm"
     version = "1.0.0"
     requires = {"clean_text"}
-    provides = {"summary"}
+    provides = {"summary", "keywords"}
 
-    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS, **cfg):
+    def __init__(
+        self,
+        max_chars: int = DEFAULT_MAX_CHARS,
+        llm=None,
+        packed: bool = False,
+        token_budget: int = PACK_TOKEN_BUDGET,
+        max_items: int = PACK_MAX_ITEMS,
+        **cfg,
+    ):
         super().__init__(**cfg)
         self.max_chars = max_chars
-        # cfg 可用于覆盖模型参数
-        self.summarizer = _get_llm_summarizer()
+        # packed=True 时 run_batch / arun_batch 把短文按 token 预算打包进同一请求
+        self.packed = packed
+        self.pack_kwargs = {"token_budget": token_budget, "max_items": max_items}
+        # 只有打包能减少请求数时才让 FlowRunner 攒批；否则逐篇 arun 并发，互不拖累
+        self.arun_batch = self._arun_packed if packed else None
+        # cfg 可用于覆盖模型参数；传入 llm 时使用独立的 summarizer，否则复用全局单例
+        if llm is not None:
+            self.summarizer = LLMSummarizerImpl(max_chars=max_chars, llm=llm)
+        else:
+            self.summarizer = _get_llm_summarizer()
+
+    @staticmethod
+    def _to_output(result: Optional[SummaryResult]) -> Dict[str, object]:
+        if result is None:
+            return {"summary": None, "keywords": None}
+        return {"summary": result.summary, "keywords": result.keywords}
 
     def run(self, data: Dict[str, str], ctx: Context):  # type: ignore[override]
         article = data["clean_text"]
         try:
-            result = self.summarizer.summarize(article, max_chars=self.max_chars)
+            result = self.summarizer.summarize(article, max_chars=self.max_chars, config=ctx.llm_config(self.name))
         except Exception as e:  # noqa: BLE001
             ctx.logger.error("LLM summarizer error", exc_info=e)
             result = None
-        return {"summary": result}
+        return self._to_output(result)
+
+    def run_batch(self, batch: List[Dict[str, str]], ctx: Context):
+        texts = [d["clean_text"] for d in batch]
+        configs = [ctx.llm_config(self.name, i) for i in range(len(batch))]
+        if self.packed:
+            results = self.summarizer.summarize_packed(texts, self.max_chars, configs, **self.pack_kwargs)
+        else:
+            results = self.summarizer.summarize_batch(texts, max_chars=self.max_chars, config=configs)
+        return [r if isinstance(r, Exception) else self._to_output(r) for r in results]
+
+    async def _arun_packed(self, batch: List[Dict[str, str]], ctx: Context):
+        texts = [d["clean_text"] for d in batch]
+        configs = [ctx.llm_config(self.name, i) for i in range(len(batch))]
+        results = await self.summarizer.asummarize_packed(texts, self.max_chars, configs, **self.pack_kwargs)
+        return [r if isinstance(r, Exception) else self._to_output(r) for r in results]
+
+    async def arun(self, data: Dict[str, str], ctx: Context):
+        article = data["clean_text"]
+        try:
+            result = await self.summarizer.summarize_async(
+                article, max_chars=self.max_chars, config=ctx.llm_config(self.name)
+            )
+        except Exception as e:  # noqa: BLE001
+            ctx.logger.error("LLM summarizer error", exc_info=e)
+            result = None
+        return self._to_output(result)
 
     def summarize(self, text: str, max_chars: int) -> SummaryResult:  # type: ignore[override]
         return self.summarizer.summarize(text, max_chars)
@@ -53,12 +118,31 @@ class LLMSummarizer(Processor, AbstractSummarizer):
 
 # 辅助函数：独立调用
 
-def summarize(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> Optional[SummaryResult]:
+# config 为透传给 chain 的 RunnableConfig，如 `runner.usage.UsageTracker.config("summarizer_llm")`
+
+def summarize(text: str, max_chars: int = DEFAULT_MAX_CHARS, config=None) -> Optional[SummaryResult]:
     try:
-        return _get_llm_summarizer().summarize(text, max_chars)
+        return _get_llm_summarizer().summarize(text, max_chars, config)
     except Exception as e:
         return None
 
+async def summarize_async(text: str, max_chars: int = DEFAULT_MAX_CHARS, config=None) -> SummaryResult:
+    """异步版本；异常不吞掉，交由调用方（如 runner.limiter.AdaptiveCaller）重试与降速。"""
+    return await _get_llm_summarizer().summarize_async(text, max_chars, config)
+
+def summarize_packed(
+    texts: List[str], max_chars: int = DEFAULT_MAX_CHARS, config=None
+) -> List[Optional[SummaryResult]]:
+    """多篇打包摘要；打包未取回的逐篇补齐，仍失败的记为 None。"""
+    results = _get_llm_summarizer().summarize_packed(texts, max_chars, config)
+    return [None if isinstance(r, Exception) else r for r in results]
+
+async def summarize_pack_async(
+    texts: List[str], max_chars: int = DEFAULT_MAX_CHARS, config=None
+) -> List[Optional[SummaryResult]]:
+    """单次打包请求；缺失条目为 None，请求失败则抛出，交由调用方重试。"""
+    return await _get_llm_summarizer().asummarize_pack(texts, max_chars, config)
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
@@ -15,4 +15,7 @@ class DummySummarizer:
     def run(self, data: dict, ctx: Context):  # type: ignore[override]
         ct = data["clean_text"]
         summary = ct[: self.max_len]
-        return {"summary": summary} 
\ No newline at end of file
+        return {"summary": summary}
+
+    def run_batch(self, batch: list, ctx: Context):
+        return [{"summary": d["clean_text"][: self.max_len]} for d in batch] 
\ No newline at end of file
@@ -1,3 +1,23 @@
-from .news_repository import INewsRepository, SqlNewsRepository
+from .news_repository import IndexBuild, INewsRepository, KeysetCursor, LeaseHeartbeat, SqlNewsRepository
+from .async_news_repository import (
+    AsyncSqlNewsRepository,
+    IAsyncNewsRepository,
+    ThreadedNewsRepository,
+    WriteBehind,
+    open_async_repository,
+    prefetch,
+)
 
-__all__ = ["INewsRepository", "SqlNewsRepository"] 
\ No newline at end of file
+__all__ = [
+    "AsyncSqlNewsRepository",
+    "IAsyncNewsRepository",
+    "IndexBuild",
+    "INewsRepository",
+    "KeysetCursor",
+    "LeaseHeartbeat",
+    "SqlNewsRepository",
+    "ThreadedNewsRepository",
+    "WriteBehind",
+    "open_async_repository",
+    "prefetch",
+]
@@ -0,0 +1,462 @@
+"""repo.async_news_repository
+
+`INewsRepository` 的异步版本，供 asyncio 流水线使用，数据库 I/O 不再阻塞事件循环。
+
+实现：
+    class AsyncSqlNewsRepository   -> asyncpg 连接池（PostgreSQL）
+    class ThreadedNewsRepository   -> 同步仓储的异步外观，调用放入线程池（SQLite 等其它方言）
+
+`open_async_repository(conn_str)` 按连接串方言自动选择。
+
+AsyncSqlNewsRepository 与 SqlNewsRepository 语义一致（keyset 分页、服务端游标流式读取、
+达到 `bulk_min_rows` 时 COPY + 临时表回写）；查询走 prepared statement，executemany 由 asyncpg
+流水线发送；pgvector 的 `vector` 类型注册二进制编解码，向量以 float 列表直接收发，不经文本序列化。
+
+`prefetch` / `WriteBehind` 用于流水线重叠 I/O：处理当前批时后台预取下一批，
+当前批的写回与下一批的处理并行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import struct
+import time
+from contextlib import suppress
+from typing import (
+    Any, AsyncIterator, Awaitable, Iterable, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple,
+    TypeVar,
+)
+
+from sqlalchemy.engine import make_url
+
+from .news_repository import (
+    _INDEX_VALID_SQL,
+    _MEM_RE,
+    BULK_MIN_ROWS,
+    DEFAULT_CONN_STR,
+    VECTOR_INDEX,
+    VECTOR_INDEX_BUILD_MEM,
+    VECTOR_INDEX_OPS,
+    VECTOR_INDEX_PARAMS,
+    IndexBuild,
+    INewsRepository,
+    KeysetCursor,
+    SqlNewsRepository,
+    parse_index_params,
+    pending_index_ddl,
+    vector_index_ddl,
+)
+
+T = TypeVar("T")
+PendingRow = Tuple[Any, Any, str]  # (id, 时间戳, 文本)
+
+_VECTOR_HEADER = struct.Struct(">HH")  # 维度, 保留位
+
+
+# ----------------------- 仓储接口 ----------------------- #
+class IAsyncNewsRepository(Protocol):
+    """异步新闻仓储协议，方法与 INewsRepository 一一对应。"""
+
+    async def ensure_embedding_schema(
+        self, vector_size: int = 1024, *, vector_index: str | None = ...
+    ) -> List[IndexBuild]: ...
+    async def ensure_abstract_schema(self) -> List[IndexBuild]: ...
+
+    async def fetch_without_embedding(
+        self, *, after_ts: Any, limit: int, after_id: int | None = None
+    ) -> Sequence[PendingRow]: ...
+
+    def iter_without_embedding(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> AsyncIterator[List[PendingRow]]: ...
+
+    async def update_embeddings(
+        self, rows: Iterable[Tuple[int, List[float]]], *, bulk: bool | None = None
+    ) -> None: ...
+
+    async def fetch_without_abstract(
+        self, *, after_ts: Any, limit: int, after_id: int | None = None
+    ) -> Sequence[PendingRow]: ...
+
+    def iter_without_abstract(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> AsyncIterator[List[PendingRow]]: ...
+
+    async def update_abstracts(
+        self, rows: Iterable[Tuple[int, str, list]], *, bulk: bool | None = None
+    ) -> None: ...
+
+    async def dispose(self) -> None: ...
+
+
+# -------------------- pgvector 编解码 -------------------- #
+def encode_vector(values: Sequence[float]) -> bytes:
+    """pgvector 二进制格式：uint16 维度 + uint16 保留位 + 大端 float4 × 维度。"""
+    n = len(values)
+    return _VECTOR_HEADER.pack(n, 0) + struct.pack(f">{n}f", *values)
+
+
+def decode_vector(data: bytes) -> List[float]:
+    n, _ = _VECTOR_HEADER.unpack_from(data)
+    return list(struct.unpack_from(f">{n}f", data, _VECTOR_HEADER.size))
+
+
+async def _init_connection(conn) -> None:
+    """连接池新建连接时注册 vector 编解码；扩展尚未安装时跳过。"""
+    schema = await conn.fetchval(
+        "SELECT n.nspname FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace"
+        " WHERE t.typname = 'vector'"
+    )
+    if schema:
+        await conn.set_type_codec(
+            "vector", schema=schema, encoder=encode_vector, decoder=decode_vector, format="binary"
+        )
+
+
+def asyncpg_dsn(conn_str: str) -> str:
+    """SQLAlchemy 连接串去掉驱动后缀：postgresql+psycopg://... -> postgresql://..."""
+    return re.sub(r"^(postgres(?:ql)?)\+\w+://", r"\1://", conn_str)
+
+
+# -------------------- asyncpg 实现 ------------------------- #
+class AsyncSqlNewsRepository:
+    """用法：`repo = await AsyncSqlNewsRepository.create(dsn)` 或 `async with AsyncSqlNewsRepository(dsn) as repo`。"""
+
+    def __init__(
+        self,
+        conn_str: str | None = None,
+        *,
+        table_name: str = "articles",
+        time_column: str = "created_at",
+        bulk_min_rows: int = BULK_MIN_ROWS,
+        min_size: int = 1,
+        max_size: int = 10,
+    ) -> None:
+        conn_str = conn_str or DEFAULT_CONN_STR
+        if not conn_str:
+            raise ValueError(
+                "必须提供数据库连接字符串 (PG_CONN / DB_CONN) 或构造函数参数 conn_str"
+            )
+        self.dsn = asyncpg_dsn(conn_str)
+        self.table_name = table_name
+        self.time_column = time_column
+        self.bulk_min_rows = bulk_min_rows
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+
+    @classmethod
+    async def create(cls, conn_str: str | None = None, **kwargs) -> "AsyncSqlNewsRepository":
+        return await cls(conn_str, **kwargs).connect()
+
+    async def connect(self) -> "AsyncSqlNewsRepository":
+        try:
+            import asyncpg  # type: ignore[import-not-found]
+        except ImportError as exc:  # pragma: no cover
+            raise ImportError("AsyncSqlNewsRepository 需要安装 asyncpg: pip install asyncpg") from exc
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                self.dsn, min_size=self.min_size, max_size=self.max_size, init=_init_connection
+            )
+        return self
+
+    async def __aenter__(self) -> "AsyncSqlNewsRepository":
+        return await self.connect()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.dispose()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            raise RuntimeError("连接池未初始化，请先 await connect()")
+        return self._pool
+
+    # --------- Schema ---------
+    async def _add_column_if_not_exists(self, column_def_sql: str) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"ALTER TABLE {self.table_name} ADD COLUMN IF NOT EXISTS {column_def_sql}")
+
+    async def _create_index(self, name: str, ddl: str, *, maintenance_work_mem: str | None = None) -> IndexBuild:
+        """语义同 SqlNewsRepository._create_index；asyncpg 在事务外执行即为自动提交。"""
+        async with self.pool.acquire() as conn:
+            valid = await conn.fetchval(_INDEX_VALID_SQL.format(name="$1"), name)
+            if valid:
+                return IndexBuild(name, created=False)
+            if valid is False:
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            if maintenance_work_mem:
+                if not _MEM_RE.match(maintenance_work_mem):
+                    raise ValueError(f"非法 maintenance_work_mem: {maintenance_work_mem}")
+                await conn.execute(f"SET maintenance_work_mem = '{maintenance_work_mem}'")
+            try:
+                start = time.perf_counter()
+                await conn.execute(ddl)
+                return IndexBuild(name, created=True, seconds=time.perf_counter() - start)
+            finally:
+                if maintenance_work_mem:
+                    await conn.execute("RESET maintenance_work_mem")
+
+    async def _ensure_pending_index(self, null_column: str) -> IndexBuild:
+        name, ddl = pending_index_ddl(self.table_name, self.time_column, null_column, concurrently=True)
+        return await self._create_index(name, ddl)
+
+    async def ensure_embedding_schema(
+        self,
+        vector_size: int = 1024,
+        *,
+        vector_index: str | None = VECTOR_INDEX,
+        index_params: str | Mapping[str, int] | None = VECTOR_INDEX_PARAMS,
+        opclass: str = VECTOR_INDEX_OPS,
+        maintenance_work_mem: str | None = VECTOR_INDEX_BUILD_MEM,
+    ) -> List[IndexBuild]:
+        async with self.pool.acquire() as conn:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        # 已建立的连接在扩展安装前初始化，未注册 vector 编解码，让连接池重建
+        self.pool.expire_connections()
+        await self._add_column_if_not_exists(f"embedding vector({vector_size})")
+        builds = [await self._ensure_pending_index("embedding")]
+        if vector_index and vector_index != "none":
+            params = parse_index_params(index_params, vector_index)
+            name, ddl = vector_index_ddl(self.table_name, vector_index, opclass, params)
+            builds.append(await self._create_index(name, ddl, maintenance_work_mem=maintenance_work_mem))
+        return builds
+
+    async def ensure_abstract_schema(self) -> List[IndexBuild]:
+        await self._add_column_if_not_exists("summary TEXT")
+        return [await self._ensure_pending_index("summary")]
+
+    # --------- 分页 ---------
+    def _pending_query(
+        self, column: str, null_column: str, keyset: bool, limit: bool
+    ) -> str:
+        """`null_column IS NULL` 的行按 (time_column, id) 升序；keyset 时参数为 $1 时间戳、$2 id。"""
+        where = [f"{null_column} IS NULL"]
+        if keyset:
+            where.append(f"({self.time_column}, id) > ($1, $2)")
+        sql = (
+            f"SELECT id, {self.time_column}, {column} FROM {self.table_name}"
+            f" WHERE {' AND '.join(where)} ORDER BY {self.time_column}, id"
+        )
+        if limit:
+            sql += f" LIMIT ${3 if keyset else 1}"
+        return sql
+
+    async def _fetch_pending(
+        self, column: str, null_column: str, after_ts: Any, limit: int, after_id: int | None
+    ) -> List[PendingRow]:
+        if after_id is None:  # 兼容旧调用：只给时间戳时从该时间戳之后开始
+            sql = (
+                f"SELECT id, {self.time_column}, {column} FROM {self.table_name}"
+                f" WHERE {null_column} IS NULL AND {self.time_column} > $1"
+                f" ORDER BY {self.time_column}, id LIMIT $2"
+            )
+            args: Tuple[Any, ...] = (after_ts, limit)
+        else:
+            sql = self._pending_query(column, null_column, True, True)
+            args = (after_ts, after_id, limit)
+        async with self.pool.acquire() as conn:
+            stmt = await conn.prepare(sql)
+            return [tuple(r) for r in await stmt.fetch(*args)]
+
+    async def _iter_pending(
+        self, column: str, null_column: str, chunk_size: int, after: KeysetCursor | None
+    ) -> AsyncIterator[List[PendingRow]]:
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须 ≥ 1")
+        sql = self._pending_query(column, null_column, after is not None, False)
+        args = tuple(after) if after is not None else ()
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():  # 服务端游标须在事务内
+                stmt = await conn.prepare(sql)
+                cursor = await stmt.cursor(*args)
+                while chunk := await cursor.fetch(chunk_size):
+                    yield [tuple(r) for r in chunk]
+
+    # --------- 批量回写 ---------
+    def _use_bulk(self, n_rows: int, bulk: bool | None) -> bool:
+        return n_rows >= self.bulk_min_rows if bulk is None else bulk
+
+    async def _bulk_update(
+        self, stage: str, columns: Sequence[str], assignments: str, records: Iterable[Tuple[Any, ...]]
+    ) -> None:
+        """临时表（列类型取自业务表）+ 二进制 COPY + 一条 UPDATE ... FROM。"""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS"
+                    f" SELECT {', '.join(columns)} FROM {self.table_name} WITH NO DATA"
+                )
+                await conn.copy_records_to_table(stage, records=records, columns=list(columns))
+                await conn.execute(
+                    f"UPDATE {self.table_name} AS t SET {assignments} FROM {stage} AS s WHERE t.id = s.id"
+                )
+
+    # --------- Embedding ---------
+    async def fetch_without_embedding(
+        self, *, after_ts: Any, limit: int, after_id: int | None = None
+    ) -> Sequence[PendingRow]:
+        return await self._fetch_pending("title", "embedding", after_ts, limit, after_id)
+
+    def iter_without_embedding(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> AsyncIterator[List[PendingRow]]:
+        """按块流式产出 embedding 为空的 (id, 时间戳, title)；中途退出时 aclose() 即释放游标与连接。"""
+        return self._iter_pending("title", "embedding", chunk_size, after)
+
+    async def update_embeddings(
+        self, rows: Iterable[Tuple[int, List[float]]], *, bulk: bool | None = None
+    ) -> None:
+        latest = {r[0]: list(r[1]) for r in rows}  # 同一 id 以最后一次为准
+        if not latest:
+            return
+        if self._use_bulk(len(latest), bulk):
+            await self._bulk_update(
+                "news_stage_embedding", ("id", "embedding"), "embedding = s.embedding", latest.items()
+            )
+            return
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                f"UPDATE {self.table_name} SET embedding = $2 WHERE id = $1", list(latest.items())
+            )
+
+    # --------- Abstract ---------
+    async def fetch_without_abstract(
+        self, *, after_ts: Any, limit: int, after_id: int | None = None
+    ) -> Sequence[PendingRow]:
+        return await self._fetch_pending("text", "summary", after_ts, limit, after_id)
+
+    def iter_without_abstract(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> AsyncIterator[List[PendingRow]]:
+        """按块流式产出 summary 为空的 (id, 时间戳, text)。"""
+        return self._iter_pending("text", "summary", chunk_size, after)
+
+    async def update_abstracts(
+        self, rows: Iterable[Tuple[int, str, list]], *, bulk: bool | None = None
+    ) -> None:
+        # keywords 为空的行保留原值，与 SqlNewsRepository 语义一致
+        latest = {
+            r[0]: (r[0], r[1], json.dumps(r[2], ensure_ascii=False) if r[2] else None) for r in rows
+        }
+        if not latest:
+            return
+        if self._use_bulk(len(latest), bulk):
+            await self._bulk_update(
+                "news_stage_abstract",
+                ("id", "summary", "keywords"),
+                "summary = s.summary, keywords = COALESCE(s.keywords, t.keywords)",
+                latest.values(),
+            )
+            return
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                f"UPDATE {self.table_name} SET summary = $2, keywords = COALESCE($3, keywords) WHERE id = $1",
+                list(latest.values()),
+            )
+
+    # --------- Dispose ---------
+    async def dispose(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+# -------------------- 线程池外观 ------------------------- #
+async def _iter_in_thread(it: Iterator[T]) -> AsyncIterator[T]:
+    try:
+        while (item := await asyncio.to_thread(next, it, None)) is not None:
+            yield item
+    finally:
+        await asyncio.to_thread(getattr(it, "close", lambda: None))
+
+
+class ThreadedNewsRepository:
+    """把同步 INewsRepository 包装成 IAsyncNewsRepository：每次调用在线程池执行，不阻塞事件循环。"""
+
+    def __init__(self, repo: INewsRepository) -> None:
+        self.repo = repo
+
+    async def ensure_embedding_schema(self, vector_size: int = 1024, **kwargs) -> List[IndexBuild]:
+        return await asyncio.to_thread(lambda: self.repo.ensure_embedding_schema(vector_size, **kwargs))
+
+    async def ensure_abstract_schema(self) -> List[IndexBuild]:
+        return await asyncio.to_thread(self.repo.ensure_abstract_schema)
+
+    async def fetch_without_embedding(self, **kwargs) -> Sequence[PendingRow]:
+        return await asyncio.to_thread(lambda: self.repo.fetch_without_embedding(**kwargs))
+
+    def iter_without_embedding(self, **kwargs) -> AsyncIterator[List[PendingRow]]:
+        return _iter_in_thread(self.repo.iter_without_embedding(**kwargs))
+
+    async def update_embeddings(self, rows, *, bulk: bool | None = None) -> None:
+        await asyncio.to_thread(lambda: self.repo.update_embeddings(list(rows), bulk=bulk))
+
+    async def fetch_without_abstract(self, **kwargs) -> Sequence[PendingRow]:
+        return await asyncio.to_thread(lambda: self.repo.fetch_without_abstract(**kwargs))
+
+    def iter_without_abstract(self, **kwargs) -> AsyncIterator[List[PendingRow]]:
+        return _iter_in_thread(self.repo.iter_without_abstract(**kwargs))
+
+    async def update_abstracts(self, rows, *, bulk: bool | None = None) -> None:
+        await asyncio.to_thread(lambda: self.repo.update_abstracts(list(rows), bulk=bulk))
+
+    async def dispose(self) -> None:
+        await asyncio.to_thread(self.repo.dispose)
+
+
+async def open_async_repository(conn_str: str | None = None, **kwargs) -> IAsyncNewsRepository:
+    """PostgreSQL 用 asyncpg 连接池，其余方言用线程池包装 SqlNewsRepository。"""
+    conn_str = conn_str or DEFAULT_CONN_STR
+    if conn_str and make_url(conn_str).get_backend_name() == "postgresql":
+        return await AsyncSqlNewsRepository.create(conn_str, **kwargs)
+    return ThreadedNewsRepository(SqlNewsRepository(conn_str, **kwargs))
+
+
+# -------------------- I/O 重叠 ------------------------- #
+async def prefetch(batches: AsyncIterator[T]) -> AsyncIterator[T]:
+    """始终在后台预取下一块，读取与调用方处理当前块重叠；需配合 `contextlib.aclosing` 使用。"""
+    nxt: Optional[asyncio.Future] = asyncio.ensure_future(anext(batches, None))
+    try:
+        while (item := await nxt) is not None:
+            nxt = asyncio.ensure_future(anext(batches, None))
+            yield item
+        nxt = None
+    finally:
+        if nxt is not None and not nxt.done():
+            nxt.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await nxt
+        await batches.aclose()
+
+
+class WriteBehind:
+    """至多一个在途写入：提交新写入前先等待上一个完成，写回与下一批处理重叠且按提交顺序落库。"""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Future] = None
+
+    async def submit(self, write: Awaitable[Any]) -> None:
+        await self.flush()
+        self._task = asyncio.ensure_future(write)
+
+    async def flush(self) -> None:
+        """等待在途写入完成；写入异常在此抛出。"""
+        task, self._task = self._task, None
+        if task is not None:
+            await task
+
+
+__all__ = [
+    "AsyncSqlNewsRepository",
+    "IAsyncNewsRepository",
+    "ThreadedNewsRepository",
+    "WriteBehind",
+    "asyncpg_dsn",
+    "decode_vector",
+    "encode_vector",
+    "open_async_repository",
+    "prefetch",
+]
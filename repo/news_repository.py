@@ -7,40 +7,109 @@
 
 默认实现：
     class SqlNewsRepository -> 复用 dao.NewsDAO 逻辑
+
+分页：按 `(time_column, id)` 复合键做 keyset 翻页，游标为上一页最后一行的 `(时间戳, id)`，
+同一时间戳的多行跨页也不会遗漏。`iter_without_*` 按块流式产出全部待处理行：
+PostgreSQL 使用服务端游标（单条查询、内存占用与总量无关）；SQLite 无服务端游标，
+且长时间的读游标会阻塞回写，因此退化为逐页 keyset 查询。
+
+批量回写：PostgreSQL 上行数达到 `bulk_min_rows` 时，先用 COPY 把结果流式写入事务级临时表
+（psycopg 3 的 embedding 走二进制 COPY，其余走文本 / CSV COPY），再以一条 `UPDATE ... FROM`
+连接回写，代替逐行 executemany；SQLite 等其它方言仍用 executemany。
+
+索引：`ensure_*_schema` 在待处理行上建部分索引 `(time_column, id) WHERE <列> IS NULL`，
+供分页查询走索引而非顺序扫描；PostgreSQL 另在 embedding 列上建 HNSW / IVFFlat 向量索引
+（`VECTOR_INDEX` / `VECTOR_INDEX_OPS` / `VECTOR_INDEX_PARAMS` 配置）。PostgreSQL 上均以
+`CREATE INDEX CONCURRENTLY` 构建不锁写，已存在且有效时跳过，上次中断遗留的 INVALID 索引先删除再重建。
+返回 `IndexBuild` 列表记录各索引是否新建与耗时；`explain_pending` 输出分页查询的执行计划。
+
+多 worker 认领：`claim` 把待处理行登记到旁路表 `<table>_claims`（task, article_id, worker, lease_until），
+租约期内其它 worker 不会再领到同一行。PostgreSQL 用 `FOR UPDATE SKIP LOCKED` 避免认领时互相等待，
+SQLite 靠库级写锁串行；两者都由 `ON CONFLICT ... WHERE lease_until <= now` 保证同一行只有一个持有者。
+worker 崩溃后租约到期，行自动回到可认领状态。`iter_claimed` 按块认领并在后台线程续租（心跳），
+取下一块前释放已完成的行；失败未写回的行保留租约，到期后再被重试。
 """
 
 from __future__ import annotations
 
+import csv
+import io
 import json
 import os
+import logging
+import re
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, List, Protocol, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Protocol, Sequence, Tuple
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import ProgrammingError
 
+KeysetCursor = Tuple[Any, int]  # (时间戳, id)：上一页最后一行，下一页从其后开始
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexBuild:
+    name: str
+    created: bool  # False 表示已存在且有效，本次跳过
+    seconds: float = 0.0
+
+
 # ----------------------- 仓储接口 ----------------------- #
 class INewsRepository(Protocol):
     """新闻仓储协议，屏蔽存储细节。"""
 
     # --- Schema 管理 ---
-    def ensure_embedding_schema(self, vector_size: int = 1024) -> None: ...
-    def ensure_abstract_schema(self) -> None: ...
+    def ensure_embedding_schema(
+        self, vector_size: int = 1024, *, vector_index: str | None = ...
+    ) -> List[IndexBuild]: ...
+    def ensure_abstract_schema(self) -> List[IndexBuild]: ...
 
     # --- Embedding ---
     def fetch_without_embedding(
-        self, *, after_ts: datetime, limit: int
+        self, *, after_ts: datetime, limit: int, after_id: int | None = None
     ) -> Sequence[Tuple[int, datetime, str]]: ...
 
-    def update_embeddings(self, rows: Iterable[Tuple[int, List[float]]]) -> None: ...
+    def iter_without_embedding(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> Iterator[List[Tuple[int, datetime, str]]]: ...
+
+    def update_embeddings(
+        self, rows: Iterable[Tuple[int, List[float]]], *, bulk: bool | None = None
+    ) -> None: ...
 
     # --- Abstract ---
     def fetch_without_abstract(
-        self, *, after_ts: datetime, limit: int
+        self, *, after_ts: datetime, limit: int, after_id: int | None = None
+    ) -> Sequence[Tuple[int, datetime, str]]: ...
+
+    def iter_without_abstract(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> Iterator[List[Tuple[int, datetime, str]]]: ...
+
+    def update_abstracts(
+        self, rows: Iterable[Tuple[int, str, list]], *, bulk: bool | None = None
+    ) -> None: ...
+
+    # --- 多 worker 认领 ---
+    def claim(
+        self, task: str, *, worker: str, limit: int, lease_seconds: float = ...
     ) -> Sequence[Tuple[int, datetime, str]]: ...
 
-    def update_abstracts(self, rows: Iterable[Tuple[int, str]]) -> None: ...
+    def renew_claims(self, task: str, worker: str, ids: Sequence[int], lease_seconds: float = ...) -> int: ...
+
+    def release_claims(self, task: str, worker: str, ids: Sequence[int], *, only_done: bool = False) -> int: ...
+
+    def iter_claimed(
+        self, task: str, *, worker: str | None = None, chunk_size: int = 1000, lease_seconds: float = ...
+    ) -> Iterator[List[Tuple[int, datetime, str]]]: ...
 
     # --- 资源释放 ---
     def dispose(self) -> None: ...
@@ -48,6 +117,71 @@ class INewsRepository(Protocol):
 
 # -------------------- SQL 实现 ------------------------- #
 DEFAULT_CONN_STR = os.getenv("PG_CONN") or os.getenv("DB_CONN")
+BULK_MIN_ROWS = int(os.getenv("BULK_MIN_ROWS", "200"))
+_COPY_DRIVERS = ("psycopg", "psycopg2")
+CLAIM_LEASE_SECONDS = float(os.getenv("CLAIM_LEASE_SECONDS", "600"))
+# 认领任务 -> (返回的文本列, 判定待处理的空列)
+_TASKS = {"embedding": ("title", "embedding"), "abstract": ("text", "summary")}
+
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "hnsw")  # hnsw | ivfflat | none
+VECTOR_INDEX_OPS = os.getenv("VECTOR_INDEX_OPS", "vector_cosine_ops")
+VECTOR_INDEX_PARAMS = os.getenv("VECTOR_INDEX_PARAMS", "")  # 如 m=16,ef_construction=64 或 lists=1000
+VECTOR_INDEX_BUILD_MEM = os.getenv("VECTOR_INDEX_BUILD_MEM") or None  # 构建时的 maintenance_work_mem，如 2GB
+_VECTOR_INDEX_KEYS = {"hnsw": {"m", "ef_construction"}, "ivfflat": {"lists"}}
+_MEM_RE = re.compile(r"^\d+\s*(kB|MB|GB)?$")
+
+# 索引是否存在及是否有效：NULL 不存在，false 为并发构建中断遗留的 INVALID 索引
+_INDEX_VALID_SQL = """
+    SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+    WHERE c.relname = {name} AND pg_table_is_visible(c.oid)
+"""
+
+
+def parse_index_params(spec: str | Mapping[str, int] | None, method: str) -> Dict[str, int]:
+    """`m=16,ef_construction=64` / `lists=1000` -> dict；仅接受该索引方法支持的整数参数。"""
+    if method not in _VECTOR_INDEX_KEYS:
+        raise ValueError(f"未知向量索引类型: {method}，可选 {sorted(_VECTOR_INDEX_KEYS)}")
+    if isinstance(spec, Mapping):
+        items = list(spec.items())
+    else:
+        items = [item.split("=", 1) for item in filter(None, (x.strip() for x in (spec or "").split(",")))]
+    params: Dict[str, int] = {}
+    for key, value in items:
+        key = str(key).strip()
+        if key not in _VECTOR_INDEX_KEYS[method]:
+            raise ValueError(f"{method} 不支持参数 {key}，可选 {sorted(_VECTOR_INDEX_KEYS[method])}")
+        params[key] = int(value)
+    return params
+
+
+def _index_name(table: str, suffix: str) -> str:
+    return f"{table.rsplit('.', 1)[-1]}_{suffix}"
+
+
+def pending_index_ddl(
+    table: str, time_column: str, null_column: str, *, concurrently: bool
+) -> Tuple[str, str]:
+    """(索引名, DDL)：待处理行 `(time_column, id) WHERE null_column IS NULL` 上的部分索引。"""
+    name = _index_name(table, f"{null_column}_pending_idx")
+    cc = "CONCURRENTLY " if concurrently else ""
+    return name, (
+        f"CREATE INDEX {cc}IF NOT EXISTS {name} ON {table} ({time_column}, id)"
+        f" WHERE {null_column} IS NULL"
+    )
+
+
+def vector_index_ddl(
+    table: str, method: str, opclass: str, params: Mapping[str, int], *, column: str = "embedding"
+) -> Tuple[str, str]:
+    """(索引名, DDL)：pgvector HNSW / IVFFlat 索引，总是 CONCURRENTLY 构建。"""
+    if not re.fullmatch(r"\w+", opclass):
+        raise ValueError(f"非法 operator class: {opclass}")
+    name = _index_name(table, f"{column}_{method}_idx")
+    with_ = f" WITH ({', '.join(f'{k} = {v}' for k, v in params.items())})" if params else ""
+    return name, (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}"
+        f" USING {method} ({column} {opclass}){with_}"
+    )
 
 
 class SqlNewsRepository:  # noqa: D101  (docstring above)
@@ -57,6 +191,7 @@ class SqlNewsRepository:  # noqa: D101  (docstring above)
         *,
         table_name: str = "articles",
         time_column: str = "created_at",
+        bulk_min_rows: int = BULK_MIN_ROWS,
     ) -> None:
         self.conn_str = conn_str or DEFAULT_CONN_STR
         if not self.conn_str:
@@ -66,12 +201,23 @@ class SqlNewsRepository:  # noqa: D101  (docstring above)
 
         self.table_name = table_name
         self.time_column = time_column
+        self.bulk_min_rows = bulk_min_rows
+        self.claims_table = f"{table_name}_claims"
+        self._claims_ready = False
 
         self.engine: Engine = create_engine(self.conn_str, future=True, echo=False)
         self.dialect = self.engine.dialect.name
+        self.driver = self.engine.dialect.driver
 
     # --------- Schema ---------
     def _add_column_if_not_exists(self, column_def_sql: str) -> None:
+        if self.dialect == "sqlite":  # SQLite 不支持 ADD COLUMN IF NOT EXISTS，先查列再加
+            name = column_def_sql.split()[0]
+            with self.engine.begin() as conn:
+                columns = {r[1] for r in conn.execute(text(f"PRAGMA table_info({self.table_name})"))}
+                if name not in columns:
+                    conn.execute(text(f"ALTER TABLE {self.table_name} ADD COLUMN {column_def_sql}"))
+            return
         stmt = f"ALTER TABLE {self.table_name} ADD COLUMN IF NOT EXISTS {column_def_sql};"
         with self.engine.begin() as conn:
             try:
@@ -80,7 +226,53 @@ class SqlNewsRepository:  # noqa: D101  (docstring above)
                 if "exists" not in str(exc).lower():
                     raise
 
-    def ensure_embedding_schema(self, vector_size: int = 1024) -> None:
+    def _create_index(self, name: str, ddl: str, *, maintenance_work_mem: str | None = None) -> IndexBuild:
+        if self.dialect != "postgresql":
+            with self.engine.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {"name": name}
+                ).first() if self.dialect == "sqlite" else None
+                if exists:
+                    return IndexBuild(name, created=False)
+                start = time.perf_counter()
+                conn.execute(text(ddl))
+            return IndexBuild(name, created=True, seconds=time.perf_counter() - start)
+
+        # CONCURRENTLY 不能在事务块内执行
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            valid = conn.execute(text(_INDEX_VALID_SQL.format(name=":name")), {"name": name}).scalar()
+            if valid:
+                return IndexBuild(name, created=False)
+            if valid is False:  # 上次并发构建中断，IF NOT EXISTS 会误以为已建好
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            if maintenance_work_mem:
+                if not _MEM_RE.match(maintenance_work_mem):
+                    raise ValueError(f"非法 maintenance_work_mem: {maintenance_work_mem}")
+                conn.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+            try:
+                start = time.perf_counter()
+                conn.execute(text(ddl))
+                return IndexBuild(name, created=True, seconds=time.perf_counter() - start)
+            finally:
+                if maintenance_work_mem:
+                    conn.execute(text("RESET maintenance_work_mem"))
+
+    def _ensure_pending_index(self, null_column: str) -> IndexBuild:
+        name, ddl = pending_index_ddl(
+            self.table_name, self.time_column, null_column, concurrently=self.dialect == "postgresql"
+        )
+        return self._create_index(name, ddl)
+
+    def ensure_embedding_schema(
+        self,
+        vector_size: int = 1024,
+        *,
+        vector_index: str | None = VECTOR_INDEX,
+        index_params: str | Mapping[str, int] | None = VECTOR_INDEX_PARAMS,
+        opclass: str = VECTOR_INDEX_OPS,
+        maintenance_work_mem: str | None = VECTOR_INDEX_BUILD_MEM,
+    ) -> List[IndexBuild]:
+        """vector_index 为 None / "none" 时不建向量索引（如大批量回填前，回填完再建更快）。"""
         if self.dialect == "postgresql":
             with self.engine.begin() as conn:
                 conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
@@ -88,37 +280,173 @@ class SqlNewsRepository:  # noqa: D101  (docstring above)
         else:
             self._add_column_if_not_exists("embedding TEXT")
 
-        # SQLite 对部分索引或向量列不支持，直接跳过
-        if self.dialect == "sqlite":
-            return
+        builds = [self._ensure_pending_index("embedding")]
+        # SQLite 等无 pgvector，只建部分索引
+        if self.dialect == "postgresql" and vector_index and vector_index != "none":
+            params = parse_index_params(index_params, vector_index)
+            name, ddl = vector_index_ddl(self.table_name, vector_index, opclass, params)
+            builds.append(self._create_index(name, ddl, maintenance_work_mem=maintenance_work_mem))
+        return builds
 
-
-    def ensure_abstract_schema(self) -> None:
+    def ensure_abstract_schema(self) -> List[IndexBuild]:
         self._add_column_if_not_exists("summary TEXT")
-        if self.dialect == "sqlite":
-            return
+        return [self._ensure_pending_index("summary")]
 
+    def explain_pending(self, kind: str, *, limit: int = 1000, analyze: bool = False) -> List[str]:
+        """kind 为 "embedding" / "abstract"：分页查询（首页）的执行计划，逐行返回。"""
+        column, null_column = _TASKS[kind]
+        sql, params = self._pending_query(column, null_column, None, limit)
+        if self.dialect == "postgresql":
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        elif self.dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            prefix = "EXPLAIN "
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(prefix + sql), params).fetchall()
+        return [str(r[-1]) for r in rows]
+
+    # --------- 分页 ---------
+    def _pending_query(
+        self, column: str, null_column: str, after: KeysetCursor | None, limit: int | None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """`null_column IS NULL` 的行按 (time_column, id) 升序，从游标之后开始。"""
+        where = [f"{null_column} IS NULL"]
+        params: Dict[str, Any] = {}
+        if after is not None:
+            where.append(f"({self.time_column}, id) > (:after_ts, :after_id)")
+            params.update(after_ts=after[0], after_id=after[1])
+        sql = f"""
+            SELECT id, {self.time_column}, {column}
+            FROM {self.table_name}
+            WHERE {" AND ".join(where)}
+            ORDER BY {self.time_column}, id
+        """
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = limit
+        return sql, params
+
+    def _fetch_pending(
+        self, column: str, null_column: str, after_ts: datetime, limit: int, after_id: int | None
+    ) -> Sequence[Tuple[int, datetime, str]]:
+        if after_id is None:  # 兼容旧调用：只给时间戳时从该时间戳之后开始
+            sql = f"""
+                SELECT id, {self.time_column}, {column}
+                FROM {self.table_name}
+                WHERE {null_column} IS NULL AND {self.time_column} > :after_ts
+                ORDER BY {self.time_column}, id
+                LIMIT :limit
+            """
+            params: Dict[str, Any] = {"after_ts": after_ts, "limit": limit}
+        else:
+            sql, params = self._pending_query(column, null_column, (after_ts, after_id), limit)
+        with self.engine.connect() as conn:
+            return conn.execute(text(sql), params).fetchall()
+
+    def _iter_pending(
+        self, column: str, null_column: str, chunk_size: int, after: KeysetCursor | None
+    ) -> Iterator[List[Tuple[int, datetime, str]]]:
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须 ≥ 1")
+        if self.dialect == "postgresql":
+            sql, params = self._pending_query(column, null_column, after, None)
+            with self.engine.connect() as conn:
+                result = conn.execution_options(yield_per=chunk_size).execute(
+                    text(sql), params
+                )
+                for chunk in result.partitions(chunk_size):
+                    yield list(chunk)
+            return
+        while True:
+            sql, params = self._pending_query(column, null_column, after, chunk_size)
+            with self.engine.connect() as conn:
+                chunk = conn.execute(text(sql), params).fetchall()
+            if not chunk:
+                return
+            yield list(chunk)
+            after = (chunk[-1][1], chunk[-1][0])
+
+    # --------- 批量回写 ---------
+    def _use_bulk(self, n_rows: int, bulk: bool | None) -> bool:
+        """bulk=None 按行数自动选择；不支持 COPY 的方言 / 驱动上 bulk=True 也退化为 executemany。"""
+        if self.dialect != "postgresql" or self.driver not in _COPY_DRIVERS:
+            return False
+        return n_rows >= self.bulk_min_rows if bulk is None else bulk
+
+    def _copy_rows(
+        self, conn, stage: str, columns: Sequence[str], rows: Iterable[Tuple[Any, ...]], *, binary: bool
+    ) -> None:
+        """把 rows 以 COPY FROM STDIN 流式写入临时表 stage（与 conn 同一事务）。"""
+        raw = conn.connection.driver_connection
+        cols = ", ".join(columns)
+        with raw.cursor() as cur:
+            if self.driver == "psycopg":
+                types = None
+                if binary:  # 二进制 COPY 需逐列声明类型，直接取临时表的列类型 oid
+                    cur.execute(
+                        "SELECT atttypid FROM pg_attribute"
+                        " WHERE attrelid = %s::regclass AND attnum > 0 ORDER BY attnum",
+                        (stage,),
+                    )
+                    types = [r[0] for r in cur.fetchall()]
+                fmt = " (FORMAT BINARY)" if binary else ""
+                with cur.copy(f"COPY {stage} ({cols}) FROM STDIN{fmt}") as copy:
+                    if types:
+                        copy.set_types(types)
+                    for row in rows:
+                        copy.write_row(row)
+            else:  # psycopg2 只有 copy_expert：CSV 文本，None 不加引号即为 NULL
+                buf = io.StringIO()
+                csv.writer(buf, quoting=csv.QUOTE_NOTNULL).writerows(rows)
+                buf.seek(0)
+                cur.copy_expert(f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+
+    def _bulk_update(
+        self, stage: str, select: str, columns: Sequence[str], assignments: str,
+        rows: Iterable[Tuple[Any, ...]], *, binary: bool,
+    ) -> None:
+        """临时表（ON COMMIT DROP，列类型取自 select）+ COPY + 一条 UPDATE ... FROM。"""
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS"
+                f" SELECT {select} FROM {self.table_name} WITH NO DATA"
+            ))
+            self._copy_rows(conn, stage, columns, rows, binary=binary)
+            conn.execute(text(
+                f"UPDATE {self.table_name} AS t SET {assignments} FROM {stage} AS s WHERE t.id = s.id"
+            ))
 
     # --------- Embedding ---------
     def fetch_without_embedding(
-        self, *, after_ts: datetime, limit: int
+        self, *, after_ts: datetime, limit: int, after_id: int | None = None
     ) -> Sequence[Tuple[int, datetime, str]]:
-        with self.engine.connect() as conn:
-            res = conn.execute(
-                text(
-                    f"""
-                    SELECT id, {self.time_column}, title
-                    FROM {self.table_name}
-                    WHERE embedding IS NULL AND {self.time_column} > :after_ts
-                    ORDER BY {self.time_column}
-                    LIMIT :limit
-                    """
-                ),
-                {"after_ts": after_ts, "limit": limit},
-            )
-            return res.fetchall()
+        """单页查询；传入上一页末行的 `after_id` 时按 (时间戳, id) 复合游标翻页。"""
+        return self._fetch_pending("title", "embedding", after_ts, limit, after_id)
 
-    def update_embeddings(self, rows: Iterable[Tuple[int, List[float]]]) -> None:
+    def iter_without_embedding(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> Iterator[List[Tuple[int, datetime, str]]]:
+        """按块流式产出 embedding 为空的 (id, 时间戳, title)；中途退出时关闭生成器即释放游标。"""
+        return self._iter_pending("title", "embedding", chunk_size, after)
+
+    def update_embeddings(
+        self, rows: Iterable[Tuple[int, List[float]]], *, bulk: bool | None = None
+    ) -> None:
+        latest = {r[0]: r[1] for r in rows}  # 同一 id 多次出现时以最后一次为准，与逐行 UPDATE 一致
+        if self._use_bulk(len(latest), bulk):
+            binary = self.driver == "psycopg"
+            self._bulk_update(
+                "news_stage_embedding",
+                # 二进制 COPY 写 real[]（无需 pgvector 客户端适配），回写时转 vector
+                "id, embedding::real[] AS embedding" if binary else "id, embedding",
+                ("id", "embedding"),
+                "embedding = s.embedding::vector",
+                ((i, [float(x) for x in e] if binary else json.dumps(e)) for i, e in latest.items()),
+                binary=binary,
+            )
+            return
+        rows = latest.items()
         if self.dialect == "postgresql":
             payload = [{"id": r[0], "embedding": r[1]} for r in rows]
         else:
@@ -134,24 +462,31 @@ class SqlNewsRepository:  # noqa: D101  (docstring above)
 
     # --------- Abstract ---------
     def fetch_without_abstract(
-        self, *, after_ts: datetime, limit: int
+        self, *, after_ts: datetime, limit: int, after_id: int | None = None
     ) -> Sequence[Tuple[int, datetime, str]]:
-        with self.engine.connect() as conn:
-            res = conn.execute(
-                text(
-                    f"""
-                    SELECT id, {self.time_column}, text
-                    FROM {self.table_name}
-                    WHERE summary IS NULL AND {self.time_column} > :after_ts
-                    ORDER BY {self.time_column}
-                    LIMIT :limit
-                    """
-                ),
-                {"after_ts": after_ts, "limit": limit},
+        """单页查询；传入上一页末行的 `after_id` 时按 (时间戳, id) 复合游标翻页。"""
+        return self._fetch_pending("text", "summary", after_ts, limit, after_id)
+
+    def iter_without_abstract(
+        self, *, chunk_size: int = 1000, after: KeysetCursor | None = None
+    ) -> Iterator[List[Tuple[int, datetime, str]]]:
+        """按块流式产出 summary 为空的 (id, 时间戳, text)。"""
+        return self._iter_pending("text", "summary", chunk_size, after)
+
+    def update_abstracts(self, rows: Iterable[Tuple[int, str, list]], *, bulk: bool | None = None) -> None:
+        latest = {r[0]: r for r in rows}
+        if self._use_bulk(len(latest), bulk):
+            # keywords 为空的行保留原值，与下方 executemany 分支语义一致
+            self._bulk_update(
+                "news_stage_abstract",
+                "id, summary, keywords",
+                ("id", "summary", "keywords"),
+                "summary = s.summary, keywords = COALESCE(s.keywords, t.keywords)",
+                ((r[0], r[1], json.dumps(r[2], ensure_ascii=False) if r[2] else None) for r in latest.values()),
+                binary=False,
             )
-            return res.fetchall()
-
-    def update_abstracts(self, rows: Iterable[Tuple[int, str, list]]) -> None:
+            return
+        rows = latest.values()
         rows_with_keywords = []
         rows_without_keywords = []
         for r in rows:
@@ -176,9 +511,194 @@ class SqlNewsRepository:  # noqa: D101  (docstring above)
                     rows_without_keywords,
                 )
 
+    # --------- 租约认领 ---------
+    def _now_sql(self) -> str:
+        """租约时间为 epoch 秒；PostgreSQL 取数据库时钟，避免多节点时钟偏差，其它方言取本机时钟。"""
+        return "EXTRACT(EPOCH FROM now())::double precision" if self.dialect == "postgresql" else ":now"
+
+    def ensure_claim_schema(self) -> None:
+        if self._claims_ready:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.claims_table} ("
+                " task VARCHAR(32) NOT NULL, article_id BIGINT NOT NULL, worker VARCHAR(128) NOT NULL,"
+                " lease_until DOUBLE PRECISION NOT NULL, PRIMARY KEY (task, article_id))"
+            ))
+        self._claims_ready = True
+
+    def claim(
+        self, task: str, *, worker: str, limit: int, lease_seconds: float = CLAIM_LEASE_SECONDS
+    ) -> Sequence[Tuple[int, datetime, str]]:
+        """认领至多 limit 条待处理行（按 (时间戳, id) 升序），返回 (id, 时间戳, 文本)；无可认领行时返回空。"""
+        column, null_column = _TASKS[task]
+        self.ensure_claim_schema()
+        now = self._now_sql()
+        candidates = f"""
+            SELECT a.id FROM {self.table_name} a
+            WHERE a.{null_column} IS NULL AND NOT EXISTS (
+                SELECT 1 FROM {self.claims_table} c
+                WHERE c.task = :task AND c.article_id = a.id AND c.lease_until > {now}
+            )
+            ORDER BY a.{self.time_column}, a.id
+            LIMIT :limit
+        """
+        if self.dialect == "postgresql":
+            head = f"WITH picked AS ({candidates} FOR UPDATE OF a SKIP LOCKED) "
+            source = "picked"
+        else:
+            head = ""
+            source = f"({candidates}) AS picked"
+        # 候选集基于语句快照，可能包含刚被他人认领的行；ON CONFLICT 按最新提交版本判定，只接管已过期的租约
+        sql = f"""
+            {head}INSERT INTO {self.claims_table} AS cl (task, article_id, worker, lease_until)
+            SELECT :task, id, :worker, {now} + :lease FROM {source} WHERE true
+            ON CONFLICT (task, article_id) DO UPDATE
+                SET worker = excluded.worker, lease_until = excluded.lease_until
+                WHERE cl.lease_until <= {now}
+            RETURNING article_id
+        """
+        params = {"task": task, "worker": worker, "limit": limit, "lease": lease_seconds, "now": time.time()}
+        with self.engine.begin() as conn:
+            ids = [r[0] for r in conn.execute(text(sql), params)]
+            if not ids:
+                return []
+            rows = conn.execute(
+                text(
+                    f"SELECT id, {self.time_column}, {column} FROM {self.table_name}"
+                    f" WHERE id IN :ids ORDER BY {self.time_column}, id"
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": ids},
+            ).fetchall()
+        return rows
+
+    def renew_claims(
+        self, task: str, worker: str, ids: Sequence[int], lease_seconds: float = CLAIM_LEASE_SECONDS
+    ) -> int:
+        """续租本 worker 仍持有的行，返回续租成功的行数（少于 ids 说明租约已过期被他人接管）。"""
+        if not ids:
+            return 0
+        stmt = text(
+            f"UPDATE {self.claims_table} SET lease_until = {self._now_sql()} + :lease"
+            " WHERE task = :task AND worker = :worker AND article_id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True))
+        params = {"task": task, "worker": worker, "ids": list(ids), "lease": lease_seconds, "now": time.time()}
+        with self.engine.begin() as conn:
+            return conn.execute(stmt, params).rowcount
+
+    def release_claims(self, task: str, worker: str, ids: Sequence[int], *, only_done: bool = False) -> int:
+        """删除本 worker 的认领；only_done 时只释放已写回（待处理列非空）的行。"""
+        if not ids:
+            return 0
+        _, null_column = _TASKS[task]
+        sql = (
+            f"DELETE FROM {self.claims_table}"
+            " WHERE task = :task AND worker = :worker AND article_id IN :ids"
+        )
+        if only_done:
+            sql += f" AND article_id IN (SELECT id FROM {self.table_name} WHERE {null_column} IS NOT NULL)"
+        stmt = text(sql).bindparams(bindparam("ids", expanding=True))
+        with self.engine.begin() as conn:
+            return conn.execute(stmt, {"task": task, "worker": worker, "ids": list(ids)}).rowcount
+
+    def iter_claimed(
+        self,
+        task: str,
+        *,
+        worker: str | None = None,
+        chunk_size: int = 1000,
+        lease_seconds: float = CLAIM_LEASE_SECONDS,
+    ) -> Iterator[List[Tuple[int, datetime, str]]]:
+        """逐块认领并产出；调用方持有一块期间后台心跳续租，取下一块时释放上一块已完成的行。
+        中途退出（break / 异常）时关闭生成器，当前块立即全部释放，供其它 worker 接手。"""
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须 ≥ 1")
+        worker = worker or default_worker_id()
+        current: List[int] = []
+        beat: LeaseHeartbeat | None = None
+        try:
+            while True:
+                if current:
+                    beat.stop()
+                    self.release_claims(task, worker, current, only_done=True)
+                    current, beat = [], None
+                batch = self.claim(task, worker=worker, limit=chunk_size, lease_seconds=lease_seconds)
+                if not batch:
+                    return
+                current = [r[0] for r in batch]
+                beat = LeaseHeartbeat(self, task, worker, current, lease_seconds).start()
+                yield list(batch)
+        finally:
+            if beat is not None:
+                beat.stop()
+            if current:
+                self.release_claims(task, worker, current)
+
     # --------- Dispose ---------
     def dispose(self) -> None:
         self.engine.dispose()
 
 
-__all__ = ["INewsRepository", "SqlNewsRepository"] 
\ No newline at end of file
+def default_worker_id() -> str:
+    """主机名:进程号:随机后缀，同一进程内多次运行也互不混淆。"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaseHeartbeat:
+    """后台线程每 lease_seconds / 3 续租一次；`stop()` 后线程退出。"""
+
+    def __init__(
+        self,
+        repo: SqlNewsRepository,
+        task: str,
+        worker: str,
+        ids: Sequence[int],
+        lease_seconds: float = CLAIM_LEASE_SECONDS,
+        *,
+        interval: float | None = None,
+    ) -> None:
+        self.repo = repo
+        self.task = task
+        self.worker = worker
+        self.ids = list(ids)
+        self.lease_seconds = lease_seconds
+        self.interval = interval if interval is not None else max(lease_seconds / 3, 0.05)
+        self.renewals = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{task}", daemon=True)
+
+    def start(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                renewed = self.repo.renew_claims(self.task, self.worker, self.ids, self.lease_seconds)
+            except Exception:  # noqa: BLE001  心跳失败不打断处理，租约到期前还会重试
+                logger.warning("lease renew failed: task=%s worker=%s", self.task, self.worker, exc_info=True)
+                continue
+            self.renewals += 1
+            if renewed < len(self.ids):
+                logger.warning(
+                    "lease lost for %d/%d rows: task=%s worker=%s",
+                    len(self.ids) - renewed, len(self.ids), self.task, self.worker,
+                )
+
+
+__all__ = [
+    "INewsRepository",
+    "IndexBuild",
+    "KeysetCursor",
+    "LeaseHeartbeat",
+    "SqlNewsRepository",
+    "default_worker_id",
+    "parse_index_params",
+    "pending_index_ddl",
+    "vector_index_ddl",
+] 
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""runner.batching
+
+微批聚合：把多篇文章对同一 Processor 的调用攒成一批，再调用其 `run_batch`。
+
+满足任一条件即下发：攒够 `max_size` 条，或首条到达后等待超过 `max_wait` 秒。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Tuple
+
+BatchCall = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """`call` 接收一批条目，返回等长列表；列表元素为 Exception 时仅该条目失败。"""
+
+    def __init__(self, call: BatchCall, *, max_size: int = 16, max_wait: float = 0.01):
+        if max_size < 1:
+            raise ValueError("max_size 必须 ≥ 1")
+        self.call = call
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            outs = await self.call([item for item, _ in batch])
+            if len(outs) != len(batch):
+                raise ValueError(f"批结果数量 {len(outs)} 与输入 {len(batch)} 不一致")
+        except BaseException as e:  # noqa: BLE001
+            outs = [e] * len(batch)
+        for (_, fut), out in zip(batch, outs):
+            if fut.done():
+                continue
+            if isinstance(out, BaseException):
+                fut.set_exception(out)
+            else:
+                fut.set_result(out)
+
+    async def aclose(self) -> None:
+        """下发剩余条目并等待在途批次完成。"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
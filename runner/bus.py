@@ -0,0 +1,362 @@
+"""runner.bus
+
+EventBusExecutor 使用的消息总线抽象与实现。
+
+语义（与 SQS / Redis Streams 消费组一致）：
+    * `publish` 投递消息到指定队列；
+    * `consume` 取出一条消息并对其它消费者隐藏 `visibility_timeout` 秒，超时未 `ack` 则自动重投；
+    * `ack` 确认删除；`nack` 立即重新可见；
+    * 结果通过 `put_result` / `pop_result` 按 task_id 回传给提交方；
+    * 无人认领的结果不会常驻：结果超过 `result_ttl` 秒即被清理；已取走（`pop_result`）或提交方放弃
+      （`abandon`，如等待超时）的 task_id 留下同样带 TTL 的墓碑，重投后迟到的重复结果直接丢弃。
+
+实现：
+    * MemoryBus   ：进程内，线程安全，适合测试与单机；
+    * SqliteBus   ：基于 SQLite 文件，可跨进程，无需外部 broker；
+    * RedisBus    ：Redis Streams 适配器（需安装 `redis`）。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Protocol, Tuple
+
+from pydantic import BaseModel
+
+
+# --------------------- 序列化 --------------------- #
+def json_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"无法序列化类型 {type(obj).__name__}")
+
+
+def encode(body: Dict[str, Any]) -> str:
+    return json.dumps(body, ensure_ascii=False, default=json_default)
+
+
+def decode(raw: str | bytes) -> Dict[str, Any]:
+    return json.loads(raw)
+
+
+# --------------------- 接口 --------------------- #
+@dataclass
+class Delivery:
+    msg_id: str
+    body: Dict[str, Any]
+    attempts: int  # 含本次在内的投递次数
+
+
+class Bus(Protocol):
+    def publish(self, queue: str, body: Dict[str, Any]) -> str: ...
+
+    def consume(self, queue: str, *, visibility_timeout: float) -> Delivery | None: ...
+
+    def ack(self, queue: str, msg_id: str) -> None: ...
+
+    def nack(self, queue: str, msg_id: str) -> None: ...
+
+    def put_result(self, key: str, body: Dict[str, Any]) -> None: ...
+
+    def pop_result(self, key: str) -> Dict[str, Any] | None: ...
+
+    def abandon(self, key: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+DEFAULT_RESULT_TTL = 3600.0
+
+
+# --------------------- 进程内实现 --------------------- #
+class MemoryBus:
+    def __init__(self, *, result_ttl: float = DEFAULT_RESULT_TTL) -> None:
+        self._lock = threading.Lock()
+        self.result_ttl = result_ttl
+        # queue -> msg_id -> [body, attempts, visible_at]
+        self._queues: Dict[str, Dict[str, List[Any]]] = {}
+        self._results: Dict[str, Tuple[str, float]] = {}  # key -> (body, expires_at)
+        self._tombstones: Dict[str, float] = {}  # key -> expires_at
+        self._next_purge = 0.0
+
+    def publish(self, queue: str, body: Dict[str, Any]) -> str:
+        msg_id = uuid.uuid4().hex
+        with self._lock:
+            self._queues.setdefault(queue, {})[msg_id] = [encode(body), 0, 0.0]
+        return msg_id
+
+    def consume(self, queue: str, *, visibility_timeout: float) -> Delivery | None:
+        now = time.monotonic()
+        with self._lock:
+            for msg_id, entry in self._queues.get(queue, {}).items():
+                if entry[2] <= now:
+                    entry[1] += 1
+                    entry[2] = now + visibility_timeout
+                    return Delivery(msg_id, decode(entry[0]), entry[1])
+        return None
+
+    def ack(self, queue: str, msg_id: str) -> None:
+        with self._lock:
+            self._queues.get(queue, {}).pop(msg_id, None)
+
+    def nack(self, queue: str, msg_id: str) -> None:
+        with self._lock:
+            entry = self._queues.get(queue, {}).get(msg_id)
+            if entry is not None:
+                entry[2] = 0.0
+
+    def _purge(self, now: float) -> None:
+        """按 TTL 清理无人认领的结果与过期墓碑；至多每 result_ttl / 10 秒全量扫描一次。"""
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.result_ttl / 10
+        for key in [k for k, (_, exp) in self._results.items() if exp <= now]:
+            del self._results[key]
+        for key in [k for k, exp in self._tombstones.items() if exp <= now]:
+            del self._tombstones[key]
+
+    def put_result(self, key: str, body: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            if self._tombstones.get(key, 0.0) > now:
+                return
+            self._results[key] = (encode(body), now + self.result_ttl)
+
+    def pop_result(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            entry = self._results.pop(key, None)
+            if entry is not None:
+                self._tombstones[key] = time.monotonic() + self.result_ttl
+        return None if entry is None else decode(entry[0])
+
+    def abandon(self, key: str) -> None:
+        with self._lock:
+            self._results.pop(key, None)
+            self._tombstones[key] = time.monotonic() + self.result_ttl
+
+    def close(self) -> None:
+        return None
+
+
+# --------------------- SQLite 实现 --------------------- #
+class SqliteBus:
+    """以 SQLite 表充当队列，多个进程可共享同一数据库文件。"""
+
+    def __init__(self, path: str, *, result_ttl: float = DEFAULT_RESULT_TTL) -> None:
+        self.path = path
+        self.result_ttl = result_ttl
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bus_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                queue TEXT NOT NULL,
+                body TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                visible_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_bus_messages_queue ON bus_messages (queue, visible_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bus_results ("
+            "key TEXT PRIMARY KEY, body TEXT NOT NULL, expires_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(bus_results)")}
+        if "expires_at" not in columns:  # 旧版本建的表
+            self._conn.execute("ALTER TABLE bus_results ADD COLUMN expires_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bus_tombstones (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+
+    def publish(self, queue: str, body: Dict[str, Any]) -> str:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO bus_messages (queue, body, visible_at) VALUES (?, ?, 0)",
+                (queue, encode(body)),
+            )
+        return str(cur.lastrowid)
+
+    def consume(self, queue: str, *, visibility_timeout: float) -> Delivery | None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """
+                    SELECT id, body, attempts FROM bus_messages
+                    WHERE queue = ? AND visible_at <= ?
+                    ORDER BY id LIMIT 1
+                    """,
+                    (queue, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE bus_messages SET attempts = attempts + 1, visible_at = ? WHERE id = ?",
+                        (now + visibility_timeout, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return Delivery(str(row[0]), decode(row[1]), row[2] + 1)
+
+    def ack(self, queue: str, msg_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM bus_messages WHERE id = ?", (int(msg_id),))
+
+    def nack(self, queue: str, msg_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE bus_messages SET visible_at = 0 WHERE id = ?", (int(msg_id),)
+            )
+
+    def _purge(self, now: float) -> None:
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.result_ttl / 10
+        self._conn.execute("DELETE FROM bus_results WHERE expires_at <= ?", (now,))
+        self._conn.execute("DELETE FROM bus_tombstones WHERE expires_at <= ?", (now,))
+
+    def _tombstone(self, key: str, now: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO bus_tombstones (key, expires_at) VALUES (?, ?)",
+            (key, now + self.result_ttl),
+        )
+
+    def put_result(self, key: str, body: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO bus_results (key, body, expires_at)
+                SELECT ?, ?, ? WHERE NOT EXISTS (
+                    SELECT 1 FROM bus_tombstones WHERE key = ? AND expires_at > ?
+                )
+                """,
+                (key, encode(body), now + self.result_ttl, key, now),
+            )
+
+    def pop_result(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "DELETE FROM bus_results WHERE key = ? RETURNING body", (key,)
+            ).fetchone()
+            if row is not None:
+                self._tombstone(key, time.time())
+        return None if row is None else decode(row[0])
+
+    def abandon(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM bus_results WHERE key = ?", (key,))
+            self._tombstone(key, time.time())
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# --------------------- Redis 适配器 --------------------- #
+class RedisBus:
+    """Redis Streams 适配器：每个队列一个 stream + 消费组，结果存为带 TTL 的 key。
+
+    可见性超时通过 XAUTOCLAIM 回收空闲超时的 pending 消息实现。
+    """
+
+    GROUP = "processors"
+
+    def __init__(self, url: str, *, result_ttl: int = 3600, consumer: str | None = None) -> None:
+        try:
+            import redis  # type: ignore[import-not-found]
+        except ImportError as exc:  # pragma: no cover - 可选依赖
+            raise ImportError("RedisBus 需要安装 redis: pip install redis") from exc
+        self._redis = redis.Redis.from_url(url)
+        self.result_ttl = result_ttl
+        self.consumer = consumer or uuid.uuid4().hex
+        self._groups: set[str] = set()
+
+    def _ensure_group(self, queue: str) -> None:
+        if queue in self._groups:
+            return
+        try:
+            self._redis.xgroup_create(queue, self.GROUP, id="0", mkstream=True)
+        except Exception as exc:  # noqa: BLE001
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._groups.add(queue)
+
+    def publish(self, queue: str, body: Dict[str, Any]) -> str:
+        self._ensure_group(queue)
+        msg_id = self._redis.xadd(queue, {"body": encode(body)})
+        return msg_id.decode() if isinstance(msg_id, bytes) else msg_id
+
+    def consume(self, queue: str, *, visibility_timeout: float) -> Delivery | None:
+        self._ensure_group(queue)
+        _, claimed, *_ = self._redis.xautoclaim(
+            queue, self.GROUP, self.consumer, int(visibility_timeout * 1000), "0-0", count=1
+        )
+        entries = claimed
+        if not entries:
+            resp = self._redis.xreadgroup(self.GROUP, self.consumer, {queue: ">"}, count=1)
+            entries = resp[0][1] if resp else []
+        if not entries:
+            return None
+        msg_id, fields = entries[0]
+        msg_id = msg_id.decode() if isinstance(msg_id, bytes) else msg_id
+        pending = self._redis.xpending_range(queue, self.GROUP, msg_id, msg_id, 1)
+        attempts = pending[0]["times_delivered"] if pending else 1
+        return Delivery(msg_id, decode(fields[b"body"]), attempts)
+
+    def ack(self, queue: str, msg_id: str) -> None:
+        self._redis.xack(queue, self.GROUP, msg_id)
+        self._redis.xdel(queue, msg_id)
+
+    def nack(self, queue: str, msg_id: str) -> None:
+        # 置为可被其它消费者立即认领：把空闲时间视为已超时
+        self._redis.xclaim(
+            queue, self.GROUP, self.consumer, 0, [msg_id], idle=2**31
+        )
+
+    def put_result(self, key: str, body: Dict[str, Any]) -> None:
+        self._redis.set(f"result:{key}", encode(body), ex=self.result_ttl)
+
+    def pop_result(self, key: str) -> Dict[str, Any] | None:
+        raw = self._redis.getdel(f"result:{key}")
+        return None if raw is None else decode(raw)
+
+    def abandon(self, key: str) -> None:
+        self._redis.delete(f"result:{key}")  # 迟到的结果仍按 result_ttl 过期
+
+    def close(self) -> None:
+        self._redis.close()
+
+
+def bus_from_url(url: str) -> Bus:
+    """`memory://` | `sqlite:///path/to/bus.db` | `redis://host:6379/0`"""
+    if url.startswith("memory://"):
+        return MemoryBus()
+    if url.startswith("sqlite:///"):
+        return SqliteBus(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBus(url)
+    raise ValueError(f"不支持的 bus url: {url}")
@@ -0,0 +1,212 @@
+"""runner.cache
+
+内容寻址的 Processor 结果缓存。
+
+缓存键 = sha256(processor 名称, `version`, 构造配置, `requires` 字段的取值)，
+任一项变化即视为新键，无需显式失效。两级存储：
+    * MemoryLRU   ：进程内 LRU；
+    * SqliteCache ：磁盘持久化，按总字节数淘汰最久未访问的条目。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping
+
+from common.protocol import Processor
+from .bus import json_default
+
+
+def _key_default(obj: Any) -> Any:
+    try:
+        return json_default(obj)
+    except Exception:  # noqa: BLE001  如注入的 LLM 客户端，退化为按类型区分
+        return f"{type(obj).__module__}.{type(obj).__qualname__}"
+
+
+def cache_key(proc: Processor, config: Mapping[str, Any], data: Mapping[str, Any]) -> str:
+    payload = {
+        "name": proc.name,
+        "version": getattr(proc, "version", "1.0.0"),
+        "config": dict(config),
+        "inputs": {k: data.get(k) for k in sorted(proc.requires)},
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_key_default)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# --------------------- 存储层 --------------------- #
+class MemoryLRU:
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCache:
+    """SQLite 持久化缓存；写入后若总大小超过 `max_bytes`，按 LRU 淘汰。"""
+
+    def __init__(self, path: str, *, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS result_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_result_cache_accessed ON result_cache (accessed_at)"
+        )
+        self._total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM result_cache"
+        ).fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE result_cache SET accessed_at = ? WHERE key = ? RETURNING value",
+                (time.time(), key),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self._total += len(value) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 淘汰到上限的 90%，避免每次写入都触发淘汰
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, size FROM result_cache ORDER BY accessed_at"
+        )
+        victims = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            victims.append((key,))
+            self._total -= size
+        rows.close()
+        self._conn.executemany("DELETE FROM result_cache WHERE key = ?", victims)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# --------------------- 对外接口 --------------------- #
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    per_processor: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def record(self, proc_name: str, outcome: str) -> None:
+        counter = self.per_processor.setdefault(proc_name, {"hits": 0, "misses": 0})
+        counter["misses" if outcome == "miss" else "hits"] += 1
+        if outcome == "memory":
+            self.memory_hits += 1
+        elif outcome == "disk":
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "per_processor": self.per_processor,
+        }
+
+
+class ResultCache:
+    """内存 LRU + 可选磁盘层；值以 pickle 存储（Processor 输出可含 Pydantic 模型）。"""
+
+    def __init__(
+        self,
+        *,
+        memory_size: int = 4096,
+        path: str | None = None,
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.memory = MemoryLRU(memory_size)
+        self.disk = SqliteCache(path, max_bytes=max_bytes) if path else None
+        self.stats = CacheStats()
+
+    def get(self, proc_name: str, key: str) -> Dict[str, Any] | None:
+        raw = self.memory.get(key)
+        outcome = "memory"
+        if raw is None and self.disk is not None:
+            raw = self.disk.get(key)
+            outcome = "disk"
+            if raw is not None:
+                self.memory.put(key, raw)
+        if raw is None:
+            self.stats.record(proc_name, "miss")
+            return None
+        self.stats.record(proc_name, outcome)
+        return pickle.loads(raw)
+
+    def put(self, key: str, output: Dict[str, Any]) -> None:
+        raw = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        self.memory.put(key, raw)
+        if self.disk is not None:
+            self.disk.put(key, raw)
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,94 @@
+"""runner.dag
+
+根据 Processor 的 `requires` / `provides` 构建依赖图，并做拓扑排序。
+
+规则：
+    * 若 B.requires 与 A.provides 有交集，则 A → B；
+    * 同一字段只能由一个 Processor 提供，否则视为冲突；
+      未指定步骤的全量模式先经 `select_registered` 按"后注册者优先"剔除冲突方；
+    * 不由任何 Processor 提供的字段视为来自输入文章（title / text …）。
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Set, Tuple, Type
+
+from common.protocol import Processor
+
+
+class DagError(ValueError):
+    """依赖图构建失败的基类。"""
+
+
+class ProviderConflictError(DagError):
+    """多个 Processor 声明提供同一字段。"""
+
+
+class CycleError(DagError):
+    """Processor 之间存在循环依赖。"""
+
+
+def build_dependencies(procs: Sequence[Processor]) -> Dict[str, Set[str]]:
+    """返回 `{proc_name: {上游 proc_name, ...}}`。"""
+    providers: Dict[str, str] = {}
+    for proc in procs:
+        for field in proc.provides:
+            owner = providers.get(field)
+            if owner is not None and owner != proc.name:
+                raise ProviderConflictError(
+                    f"字段 '{field}' 同时由 {owner} 与 {proc.name} 提供"
+                )
+            providers[field] = proc.name
+
+    deps: Dict[str, Set[str]] = {}
+    for proc in procs:
+        deps[proc.name] = {
+            providers[field]
+            for field in proc.requires
+            if field in providers and providers[field] != proc.name
+        }
+    return deps
+
+
+def select_registered(classes: Sequence[Type[Processor]]) -> Tuple[List[str], Dict[str, str]]:
+    """从注册表中选出互不冲突的 Processor：提供相同字段时后注册者优先。
+
+    返回 (入选名称（保持注册顺序）, {落选名称: 覆盖它的 Processor 名称})。
+    """
+    owners: Dict[str, str] = {}
+    kept: List[str] = []
+    shadowed: Dict[str, str] = {}
+    for cls in reversed(classes):
+        winner = next((owners[f] for f in sorted(cls.provides) if f in owners), None)
+        if winner is not None:
+            shadowed[cls.name] = winner
+            continue
+        for field in cls.provides:
+            owners[field] = cls.name
+        kept.append(cls.name)
+    kept.reverse()
+    return kept, shadowed
+
+
+def topo_sort(names: Sequence[str], deps: Dict[str, Set[str]]) -> List[str]:
+    """Kahn 拓扑排序；同层按 `names` 原顺序输出，保证结果稳定。"""
+    indegree = {name: len(deps[name]) for name in names}
+    downstream: Dict[str, List[str]] = {name: [] for name in names}
+    for name in names:
+        for up in deps[name]:
+            downstream[up].append(name)
+
+    order: List[str] = []
+    ready = [name for name in names if indegree[name] == 0]
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for down in downstream[name]:
+            indegree[down] -= 1
+            if indegree[down] == 0:
+                ready.append(down)
+
+    if len(order) != len(names):
+        cyclic = sorted(name for name in names if indegree[name] > 0)
+        raise CycleError(f"检测到循环依赖: {cyclic}")
+    return order
@@ -1,18 +1,35 @@
 """runner.executor
 
-定义统一的 Executor 接口、InProcExecutor 与 (简化) EventBusExecutor。
+定义统一的 Executor 接口、InProcExecutor / AsyncExecutor / ProcessExecutor 与 EventBusExecutor。
+
+Processor 通过类属性 `executor_kind` 声明所需执行器：
+    * "thread"  ：默认，放入线程池执行（适合阻塞 IO）；若实现了 `arun` 则直接在事件循环中 await；
+    * "async"   ：直接在事件循环中执行（适合极轻量步骤，省去线程切换）；
+    * "process" ：放入进程池执行（适合受 GIL 限制的 CPU 密集步骤）。
 """
 from __future__ import annotations
 
 import asyncio
+import importlib
 import json
-from typing import Any, Dict, List
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Mapping
+
+from common.protocol import Context, Processor, REGISTRY
+from .worker import queue_name
 
-from common.protocol import Context, Processor
+EXECUTOR_KINDS = ("thread", "async", "process")
 
 
 class Task(dict):
-    """简单任务封装：包含 processor 实例、数据、context。"""
+    """简单任务封装：包含 processor 实例、数据、context。
+
+    执行器在 Processor 实际开始执行时写入 `started_at`（epoch 秒），供 FlowRunner 计算排队耗时。
+    """
 
     processor: Processor  # type: ignore[override]
     context: Context
@@ -32,24 +49,204 @@ class InProcExecutor(Executor):
         proc: Processor = task["processor"]
         ctx: Context = task["context"]
         data = task["data"]
-        # 直接同步执行，包一层 asyncio 兼容
+        # 原生协程直接在事件循环中等待，不占线程
+        arun = getattr(proc, "arun", None)
+        if arun is not None:
+            task["started_at"] = time.time()
+            return await arun(data, ctx)
+
+        # 同步实现放入线程池，包一层 asyncio 兼容
+        def _call():
+            task["started_at"] = time.time()
+            return proc.run(data, ctx)
+
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, proc.run, data, ctx)
+        return await loop.run_in_executor(None, _call)
 
     async def shutdown(self):
         return None
 
 
-# -------------- EventBus 执行（简化） --------------- #
-class EventBusExecutor(Executor):
-    """示例 stub：真正实现需接入 Redis/Kafka，这里仅接口。"""
+class AsyncExecutor(Executor):
+    """在当前事件循环内直接执行：优先 `arun`，否则内联调用 `run`，不占用线程。"""
+
+    async def submit(self, task: Task):  # type: ignore[override]
+        proc: Processor = task["processor"]
+        task["started_at"] = time.time()
+        arun = getattr(proc, "arun", None)
+        if arun is not None:
+            return await arun(task["data"], task["context"])
+        return proc.run(task["data"], task["context"])
+
+    async def shutdown(self):
+        return None
+
+
+# ----------------- 进程池执行 ----------------- #
+# 以下状态只存在于 worker 进程中：配置在初始化时传入，Processor 实例按名称惰性创建一次。
+_WORKER_CONFIGS: Dict[str, Dict[str, Any]] = {}
+_WORKER_PROCS: Dict[str, Processor] = {}
+
+
+def _worker_init(modules: List[str], configs: Dict[str, Dict[str, Any]]) -> None:
+    for module in modules:
+        importlib.import_module(module)
+    _WORKER_CONFIGS.update(configs)
+
+
+def _worker_warmup() -> int:
+    return os.getpid()
+
+
+def _worker_run(
+    module: str, name: str, data: Dict[str, Any], trace_id: str
+) -> tuple[float, Dict[str, Any]]:
+    """返回 (开始执行时刻, 输出)。"""
+    proc = _WORKER_PROCS.get(name)
+    if proc is None:
+        if name not in REGISTRY:
+            importlib.import_module(module)
+        proc = REGISTRY[name](**_WORKER_CONFIGS.get(name, {}))  # type: ignore[arg-type]
+        setup = getattr(proc, "setup", None)
+        if callable(setup):
+            setup()
+        _WORKER_PROCS[name] = proc
+    started_at = time.time()
+    return started_at, proc.run(data, Context(trace_id=trace_id))
+
+
+class ProcessExecutor(Executor):
+    """基于 ProcessPoolExecutor 的执行器。
+
+    worker 进程启动时导入注册模块，每个 worker 对每种 Processor 只实例化一次。
+    跨进程只传输 Processor 名称、`requires` 声明的字段与 trace_id，
+    返回值为 `run` 的输出字典，二者都需可 pickle。
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        *,
+        modules: List[str] | None = None,
+        configs: Mapping[str, Mapping[str, Any]] | None = None,
+        mp_context: multiprocessing.context.BaseContext | None = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp_context,
+            initializer=_worker_init,
+            initargs=(
+                list(modules or []),
+                {name: dict(cfg) for name, cfg in (configs or {}).items()},
+            ),
+        )
+
+    def warmup(self) -> None:
+        """预先拉起全部 worker 进程，避免首批任务承担启动开销。"""
+        futures = [self._pool.submit(_worker_warmup) for _ in range(self.max_workers)]
+        for fut in futures:
+            fut.result()
 
-    def __init__(self, bus_client):
+    async def submit(self, task: Task):  # type: ignore[override]
+        proc: Processor = task["processor"]
+        ctx: Context = task["context"]
+        data = task["data"]
+        payload = {k: data[k] for k in proc.requires if k in data}
+        loop = asyncio.get_running_loop()
+        task["started_at"], out = await loop.run_in_executor(
+            self._pool,
+            _worker_run,
+            type(proc).__module__,
+            proc.name,
+            payload,
+            ctx.trace_id,
+        )
+        return out
+
+    async def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+# -------------- EventBus 执行 --------------- #
+class RemoteProcessorError(RuntimeError):
+    """worker 端执行失败（已超过最大重试次数）。"""
+
+
+class EventBusExecutor(Executor):
+    """将任务序列化后投递到消息总线，由 `runner.worker.BusWorker` 执行并回传结果。
+
+    结果以 `<trace_id>:<processor>:<随机后缀>` 作为 task_id 关联回提交方；
+    `queue_limits` 限制每个队列（即每种 Processor）在途任务数。
+    """
+
+    def __init__(
+        self,
+        bus_client,
+        *,
+        queue_limits: Mapping[str, int] | None = None,
+        timeout: float = 300.0,
+        poll_interval: float = 0.02,
+    ):
         self.bus = bus_client
+        self.queue_limits = dict(queue_limits or {})
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore | None:
+        limit = self.queue_limits.get(name)
+        if limit is None:
+            return None
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:  # Semaphore 绑定事件循环，换循环时重建
+            self._loop, self._semaphores = loop, {}
+        sem = self._semaphores.get(name)
+        if sem is None:
+            sem = self._semaphores[name] = asyncio.Semaphore(limit)
+        return sem
+
+    async def _roundtrip(self, proc: Processor, ctx: Context, data: Dict[str, Any]):
+        task_id = f"{ctx.trace_id}:{proc.name}:{uuid.uuid4().hex[:12]}"
+        body = {
+            "task_id": task_id,
+            "trace_id": ctx.trace_id,
+            "processor": proc.name,
+            "version": getattr(proc, "version", "1.0.0"),
+            "data": {k: data[k] for k in proc.requires if k in data},
+        }
+        await asyncio.to_thread(self.bus.publish, queue_name(proc.name), body)
+
+        deadline = time.monotonic() + self.timeout
+        delay = self.poll_interval
+        try:
+            while True:
+                result = await asyncio.to_thread(self.bus.pop_result, task_id)
+                if result is not None:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"等待 {task_id} 结果超时 ({self.timeout}s)")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+        except BaseException:
+            self.bus.abandon(task_id)  # 超时 / 取消：丢弃已到或迟到的结果，不留在总线上
+            raise
+        if "error" in result:
+            raise RemoteProcessorError(result["error"])
+        return result["output"], result.get("started_at")
 
     async def submit(self, task: Task):  # type: ignore[override]
-        # 将任务序列化后推送消息队列；等待结果；这里简化为 NotImplemented
-        raise NotImplementedError("EventBusExecutor 需要结合消息队列实现")
+        proc: Processor = task["processor"]
+        sem = self._semaphore(proc.name)
+        if sem is None:
+            out, started_at = await self._roundtrip(proc, task["context"], task["data"])
+        else:
+            async with sem:
+                out, started_at = await self._roundtrip(proc, task["context"], task["data"])
+        if started_at is not None:
+            task["started_at"] = started_at
+        return out
 
     async def shutdown(self):
-        pass 
\ No newline at end of file
+        pass
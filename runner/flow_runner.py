@@ -1,58 +1,448 @@
 """runner.flow_runner
 
-简化版 FlowRunner，实现 inprocess 调度与依赖解析。完整 DAG/AB 等高级功能可进一步扩展。
+简化版 FlowRunner，实现 inprocess 调度与依赖解析。
+
+根据各 Processor 的 `requires` / `provides` 构建 DAG：互不依赖的 Processor 并发执行，
+单篇文章的耗时取决于关键路径而非全部步骤之和。AB 等高级功能可进一步扩展。
+
+批量场景使用 `aprocess_stream` / `process_many`：复用同一事件循环，多篇文章并发处理，
+同时在途数量受 `max_in_flight` 限制，输入按需拉取（背压），内存占用与总量无关。
+批量模式下实现了 `run_batch` 的同步 Processor 会跨文章攒成微批调用；已有原生 `arun` 的 Processor
+直接在事件循环上并发，只有同时提供 `arun_batch`（如打包摘要）时才攒批，且在事件循环内 await，不占线程。
+
+传入 `usage`（`runner.usage.UsageTracker`）时，各 Processor 的 LLM 调用按文章 / Processor 记账，
+预算耗尽后流式模式不再拉取新文章。
 """
 
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, List, Set
+import functools
+import logging
+import time
+import uuid
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+from common.models import ArticleInput, ArticleNLPResult, ProcessorSpan
+from common.protocol import Context, REGISTRY
+from .batching import MicroBatcher
+from .dag import select_registered
+from .cache import ResultCache, cache_key
+from .executor import (
+    EXECUTOR_KINDS,
+    AsyncExecutor,
+    EventBusExecutor,
+    Executor,
+    InProcExecutor,
+    ProcessExecutor,
+    Task,
+)
+from .plan import ExecutionPlan, ProcessorPool
+from .usage import UsageTracker
+
+DEFAULT_MAX_IN_FLIGHT = 32
 
-from common.models import ArticleInput, ArticleNLPResult
-from common.protocol import Context, REGISTRY, Processor
-from .executor import InProcExecutor, Task
+logger = logging.getLogger("runner.flow_runner")
+
+ArticleSource = Iterable[ArticleInput] | AsyncIterable[ArticleInput]
+
+
+async def _aiter_articles(articles: ArticleSource) -> AsyncIterator[ArticleInput]:
+    """统一同步 / 异步输入为异步迭代器。"""
+    if hasattr(articles, "__aiter__"):
+        async for article in articles:  # type: ignore[union-attr]
+            yield article
+    else:
+        for article in articles:  # type: ignore[union-attr]
+            yield article
 
 
 class FlowRunner:
-    """简化版，仅 inprocess 执行。"""
+    """mode="inprocess" 时按 `executor_kind` 在本机执行；mode="eventbus" 时全部步骤经消息总线分发给 worker。"""
 
-    def __init__(self, steps: List[str] | None = None):
-        self.steps = steps  # None ⇒ 自动全量
+    def __init__(
+        self,
+        steps: List[str] | None = None,
+        *,
+        configs: Mapping[str, Mapping[str, Any]] | None = None,
+        pool_sizes: Mapping[str, int] | None = None,
+        executor_kinds: Mapping[str, str] | None = None,
+        process_workers: int | None = None,
+        mode: str = "inprocess",
+        bus: Any = None,
+        queue_limits: Mapping[str, int] | None = None,
+        cache: ResultCache | None = None,
+        batch_size: int = 16,
+        batch_max_wait: float = 0.01,
+        batch_config: Mapping[str, Mapping[str, float]] | None = None,
+        usage: UsageTracker | None = None,
+    ):
+        self.steps = steps  # None ⇒ 自动全量（提供相同字段时后注册者优先）
+        self.configs = configs or {}  # proc name -> 构造参数
+        self.pool_sizes = pool_sizes or {}  # proc name -> 实例池大小（覆盖类属性）
+        self.executor_kinds = executor_kinds or {}  # proc name -> 执行器类型（覆盖类属性）
+        self.process_workers = process_workers  # None ⇒ CPU 核数
+        if mode not in ("inprocess", "eventbus"):
+            raise ValueError(f"不支持的 mode: {mode!r}")
+        if mode == "eventbus" and bus is None:
+            raise ValueError("mode='eventbus' 需要提供 bus")
+        self.mode = mode
         self.executor = InProcExecutor()
+        self._executors: Dict[str, Executor] = {"thread": self.executor}
+        if mode == "eventbus":
+            self._executors["eventbus"] = EventBusExecutor(bus, queue_limits=queue_limits)
+        self.cache = cache  # 命中时跳过 Processor，统计见 cache.stats
+        # 批量模式下实现了 run_batch 的 Processor 按 (size, max_wait) 攒批，batch_size=0 关闭微批；
+        # batch_config 按名称覆盖，如 {"summarizer_llm": {"size": 8, "max_wait": 0.05}}
+        self.batch_size = batch_size
+        self.batch_max_wait = batch_max_wait
+        self.batch_config = batch_config or {}
+        self.usage = usage  # LLM token 记账与预算，经 Context.callbacks 传给各 Processor
+        self._plan: ExecutionPlan | None = None
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        """首次使用时解析并实例化全部 Processor，之后复用。"""
+        if self._plan is None:
+            if self.steps is None:
+                selected, shadowed = select_registered(list(REGISTRY.values()))
+                for name, winner in shadowed.items():
+                    logger.warning("全量模式：%s 与后注册的 %s 提供相同字段，已跳过", name, winner)
+            else:
+                selected = self.steps
+            self._plan = ExecutionPlan.build(
+                selected, configs=self.configs, pool_sizes=self.pool_sizes
+            )
+        return self._plan
+
+    def _kind_for(self, name: str) -> str:
+        if self.mode == "eventbus":
+            return "eventbus"
+        meta = self.plan.pools[name].meta
+        return self.executor_kinds.get(name, getattr(meta, "executor_kind", "thread"))
+
+    def _executor_for(self, name: str) -> Executor:
+        kind = self._kind_for(name)
+        if kind == "eventbus":
+            return self._executors["eventbus"]
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"{name} 的 executor_kind 无效: {kind!r}")
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind == "async":
+                executor = AsyncExecutor()
+            else:
+                modules = sorted(
+                    {type(pool.meta).__module__ for pool in self.plan.pools.values()}
+                )
+                executor = ProcessExecutor(
+                    self.process_workers, modules=modules, configs=self.configs
+                )
+                executor.warmup()
+            self._executors[kind] = executor
+        return executor
+
+    async def aclose(self) -> None:
+        """关闭执行器并释放 Processor 实例（调用 teardown）；之后再次使用会重新构建。"""
+        executors = self._executors
+        self._executors = {k: v for k, v in executors.items() if k in ("thread", "eventbus")}
+        for kind, executor in executors.items():
+            if kind not in self._executors:
+                await executor.shutdown()
+        if self._plan is not None:
+            self._plan.close()
+            self._plan = None
+
+    def close(self) -> None:
+        """`aclose` 的同步版本，不可在运行中的事件循环内调用。"""
+        asyncio.run(self.aclose())
+
+    def __enter__(self) -> "FlowRunner":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def _run_step(
+        self,
+        pool: ProcessorPool,
+        upstream: Sequence[asyncio.Task],
+        data: Dict[str, Any],
+        ctx: Context,
+        result_errors: Dict[str, str],
+        batchers: Dict[str, MicroBatcher] | None = None,
+    ) -> None:
+        if upstream:
+            await asyncio.wait(upstream)
+        meta = pool.meta
+        missing = meta.requires - data.keys()
+        if missing:
+            result_errors[meta.name] = f"missing deps: {missing}"
+            return
+        snapshot = dict(data)  # 快照，避免与并发步骤的写入交错
+        timing: Dict[str, Any] = {"ready_at": time.time(), "executor": "cache"}
+        error: str | None = None
+        cache_hit = False
+        try:
+            key = None
+            if self.cache is not None and getattr(meta, "cacheable", True):
+                key = cache_key(meta, self.configs.get(meta.name, {}), snapshot)
+                cached = self.cache.get(meta.name, key)
+                if cached is not None:
+                    cache_hit = True
+                    data.update(cached)
+                    return
+            batcher = batchers.get(meta.name) if batchers else None
+            if batcher is not None:
+                out = await batcher.submit((snapshot, ctx, timing))
+            else:
+                out = await self._submit_one(pool, snapshot, ctx, timing)
+            data.update(out)
+            # 某个产出字段为 None 视为降级结果（如 LLM 调用失败），不写入缓存
+            if key is not None and all(out.get(f) is not None for f in meta.provides):
+                self.cache.put(key, out)
+        except Exception as e:  # noqa: BLE001
+            ctx.logger.exception("processor %s failed: %s", meta.name, str(e))
+            error = result_errors[meta.name] = str(e)
+        finally:
+            ctx.spans.append(self._make_span(meta, ctx, timing, cache_hit, error))
+
+    @staticmethod
+    def _make_span(
+        meta: Any, ctx: Context, timing: Dict[str, Any], cache_hit: bool, error: str | None
+    ) -> ProcessorSpan:
+        end_at = time.time()
+        ready_at = timing["ready_at"]
+        start_at = timing.get("started_at") or ready_at
+        return ProcessorSpan(
+            trace_id=ctx.trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            processor=meta.name,
+            version=getattr(meta, "version", "1.0.0"),
+            executor=timing["executor"],
+            ready_at=ready_at,
+            start_at=start_at,
+            end_at=end_at,
+            queue_wait_ms=max(start_at - ready_at, 0.0) * 1000,
+            exec_ms=max(end_at - start_at, 0.0) * 1000,
+            cache_hit=cache_hit,
+            error=error,
+        )
+
+    async def _submit_one(
+        self,
+        pool: ProcessorPool,
+        data: Dict[str, Any],
+        ctx: Context,
+        timing: Dict[str, Any] | None = None,
+    ) -> Dict[str, Any]:
+        timing = {} if timing is None else timing
+        timing["executor"] = self._kind_for(pool.meta.name)
+        proc = await pool.acquire()
+        task: Task = {"processor": proc, "data": data, "context": ctx}
+        try:
+            return await self._executor_for(pool.meta.name).submit(task)
+        finally:
+            pool.release(proc)
+            timing["started_at"] = task.get("started_at")
 
-    def _resolve_processors(self) -> List[Processor]:
-        if self.steps is None:
-            selected = list(REGISTRY.keys())
-        else:
-            selected = self.steps
-        procs = [REGISTRY[name](**{}) for name in selected]  # type: ignore[arg-type]
-        # TODO: 拓扑排序；这里按列表顺序
-        return procs
+    # ----------------------- 微批 ----------------------- #
+    @staticmethod
+    def _batch_kind(meta: Any) -> str | None:
+        """"async"：await `arun_batch`；"thread"：线程池中调用 `run_batch`；None：不攒批。
+
+        有 `arun` 而无 `arun_batch` 的 Processor 不攒批：其 `run_batch` 多为线程内扇出，
+        受默认线程池大小限制，反而不如逐篇 `arun` 并发。
+        """
+        if callable(getattr(meta, "arun_batch", None)):
+            return "async"
+        if callable(getattr(meta, "arun", None)):
+            return None
+        return "thread" if callable(getattr(meta, "run_batch", None)) else None
+
+    def _make_batchers(self) -> Dict[str, MicroBatcher]:
+        """为可攒批且在本机线程 / 事件循环中执行的 Processor 建立微批聚合器。"""
+        if self.mode != "inprocess" or self.batch_size < 1:
+            return {}
+        batchers: Dict[str, MicroBatcher] = {}
+        for name, pool in self.plan.pools.items():
+            meta = pool.meta
+            if self._batch_kind(meta) is None or self._kind_for(name) == "process":
+                continue
+            cfg = self.batch_config.get(name, {})
+            batchers[name] = MicroBatcher(
+                functools.partial(self._run_batch, pool),
+                max_size=int(cfg.get("size", getattr(meta, "batch_size", self.batch_size))),
+                max_wait=float(cfg.get("max_wait", self.batch_max_wait)),
+            )
+        return batchers
+
+    async def _run_batch(
+        self,
+        pool: ProcessorPool,
+        items: List[Tuple[Dict[str, Any], Context, Dict[str, Any]]],
+    ) -> List[Any]:
+        proc = await pool.acquire()
+        batch_ctx = self._new_context(batch_trace_ids=[ctx.trace_id for _, ctx, _ in items])
+        started: Dict[str, float] = {}
+
+        batch = [data for data, _, _ in items]
+
+        def _call():
+            started["at"] = time.time()
+            return proc.run_batch(batch, batch_ctx)
+
+        try:
+            if self._batch_kind(proc) == "async":
+                started["at"] = time.time()
+                outs = await proc.arun_batch(batch, batch_ctx)
+            else:
+                outs = await asyncio.get_running_loop().run_in_executor(None, _call)
+            if len(outs) != len(items):
+                raise ValueError(f"run_batch 返回 {len(outs)} 条，期望 {len(items)} 条")
+            for _, _, timing in items:
+                timing["executor"] = "batch"
+                timing["started_at"] = started["at"]
+            return list(outs)
+        except Exception as e:  # noqa: BLE001
+            batch_ctx.logger.warning(
+                "processor %s batch call failed, fallback to run: %s", pool.meta.name, e
+            )
+        finally:
+            pool.release(proc)
+        # 整批失败时逐条回退到 run，错误仍按条目记录
+        return await asyncio.gather(
+            *(self._submit_one(pool, data, ctx, timing) for data, ctx, timing in items),
+            return_exceptions=True,
+        )
+
+    def _new_context(self, **kwargs: Any) -> Context:
+        return Context(callbacks=[self.usage] if self.usage is not None else [], **kwargs)
 
     async def process_async(self, article: ArticleInput) -> ArticleNLPResult:
-        ctx = Context()
+        return await self._process(article)
+
+    async def _process(
+        self, article: ArticleInput, batchers: Dict[str, MicroBatcher] | None = None
+    ) -> ArticleNLPResult:
+        ctx = self._new_context()
         article_id = article.id or ""
         data: Dict[str, Any] = article.model_dump(exclude={"id"})
         result_errors: Dict[str, str] = {}
-        for proc in self._resolve_processors():
-            missing = proc.requires - data.keys()
-            if missing:
-                result_errors[proc.name] = f"missing deps: {missing}"
-                continue
-            task: Task = {
-                "processor": proc,
-                "data": data,
-                "context": ctx,
-            }
-            try:
-                out = await self.executor.submit(task)
-                data.update(out)
-            except Exception as e:  # noqa: BLE001
-                ctx.logger.exception(
-                    "processor %s failed: %s", proc.name, str(e)
+        running: Dict[str, asyncio.Task] = {}
+        plan = self.plan
+        for name in plan.order:
+            upstream = [running[up] for up in plan.deps[name]]
+            running[name] = asyncio.create_task(
+                self._run_step(
+                    plan.pools[name], upstream, data, ctx, result_errors, batchers
                 )
-                result_errors[proc.name] = str(e)
-        return ArticleNLPResult(id=article_id, **data, errors=result_errors or None)
+            )
+        if running:
+            await asyncio.gather(*running.values())
+        return ArticleNLPResult(
+            id=article_id,
+            trace_id=ctx.trace_id,
+            **data,
+            errors=result_errors or None,
+            spans=ctx.spans,
+        )
 
     def process(self, article: ArticleInput) -> ArticleNLPResult:
-        return asyncio.run(self.process_async(article)) 
\ No newline at end of file
+        return asyncio.run(self.process_async(article))
+
+    # ----------------------- 批量 / 流式 ----------------------- #
+    async def aprocess_stream(
+        self,
+        articles: ArticleSource,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        ordered: bool = False,
+    ) -> AsyncIterator[ArticleNLPResult]:
+        """并发处理文章流，按完成顺序（或 `ordered=True` 时按输入顺序）产出结果。
+
+        在途文章数（含 ordered 模式下等待前序结果的缓冲）不超过 `max_in_flight`，
+        未达上限前不会从 `articles` 拉取下一篇；`usage` 预算耗尽后停止拉取，仅等待在途文章完成。
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight 必须 ≥ 1")
+
+        source = _aiter_articles(articles)
+        batchers = self._make_batchers()
+        pending: Dict[asyncio.Task, int] = {}
+        finished: Dict[int, ArticleNLPResult] = {}  # ordered 模式的重排缓冲
+        next_seq = 0
+        next_yield = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) + len(finished) < max_in_flight:
+                    if self.usage is not None and self.usage.exhausted:
+                        exhausted = True
+                        break
+                    try:
+                        article = await anext(source)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.create_task(self._process(article, batchers))
+                    pending[task] = next_seq
+                    next_seq += 1
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    seq = pending.pop(task)
+                    if ordered:
+                        finished[seq] = task.result()
+                    else:
+                        yield task.result()
+                while next_yield in finished:
+                    yield finished.pop(next_yield)
+                    next_yield += 1
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for batcher in batchers.values():
+                await batcher.aclose()
+            await source.aclose()
+
+    def process_many(
+        self,
+        articles: ArticleSource,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        ordered: bool = False,
+    ) -> Iterator[ArticleNLPResult]:
+        """`aprocess_stream` 的同步封装：整个批次共用一个事件循环。"""
+        stream = self.aprocess_stream(
+            articles, max_in_flight=max_in_flight, ordered=ordered
+        )
+
+        async def _next() -> ArticleNLPResult:
+            return await anext(stream)
+
+        with asyncio.Runner() as loop_runner:
+            try:
+                while True:
+                    try:
+                        yield loop_runner.run(_next())
+                    except StopAsyncIteration:
+                        break
+            finally:
+                loop_runner.run(stream.aclose())
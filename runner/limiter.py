@@ -0,0 +1,219 @@
+"""runner.limiter
+
+异步 LLM 调用的自适应并发控制，使吞吐贴近后端真实容量而不把它压垮。
+
+    * `AIMDLimiter`  ：在途请求上限按 AIMD 调整——成功且延迟正常时加性增（约每轮 +1），
+                       遇到 429 / 超时 / 连接错误或延迟明显高于基线时乘性减（每个延迟窗口至多一次）；
+    * `TokenBucket`  ：每秒请求数硬上限，允许 `burst` 的突发；
+    * `AdaptiveCaller`：组合二者，并对单条请求做带全抖动（full jitter）的指数退避重试。
+
+所有原语只使用 Future，不绑定事件循环，可跨 `asyncio.run` 复用。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+_THROTTLE_MARKERS = ("429", "too many requests", "rate limit", "ratelimit", "throttl", "quota")
+_OVERLOAD_MARKERS = ("timeout", "timed out", "connect", "503", "502", "504", "overload", "unavailable")
+
+
+def classify_error(exc: BaseException) -> str:
+    """返回 "throttle"（限流）、"overload"（超时 / 连接 / 5xx）或 "other"（如输出解析失败）。"""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return "throttle"
+    if isinstance(status, int) and status >= 500:
+        return "overload"
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return "overload"
+    text = f"{type(exc).__name__} {exc}".lower()
+    if any(m in text for m in _THROTTLE_MARKERS):
+        return "throttle"
+    if any(m in text for m in _OVERLOAD_MARKERS):
+        return "overload"
+    return "other"
+
+
+class AIMDLimiter:
+    def __init__(
+        self,
+        *,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("须满足 1 ≤ min_limit ≤ initial ≤ max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.ewma_alpha = ewma_alpha
+        self._limit = float(initial)
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baseline: Optional[float] = None  # 近期最小延迟，缓慢上漂以跟随后端变化
+        self._ewma: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    async def acquire(self) -> None:
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._inflight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._inflight += 1
+                waiter.set_result(None)
+
+    def on_success(self, latency: float) -> None:
+        self._ewma = latency if self._ewma is None else (
+            self.ewma_alpha * latency + (1 - self.ewma_alpha) * self._ewma
+        )
+        self._baseline = latency if self._baseline is None else min(self._baseline * 1.01, latency)
+        if self._ewma > self._baseline * self.latency_tolerance:
+            self._decrease()
+            return
+        # 每完成约 limit 个请求 +1，即每个“往返轮次”加一
+        self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+        self._wake()
+
+    def on_failure(self, kind: str) -> None:
+        if kind in ("throttle", "overload"):
+            self._decrease()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        # 同一批在途请求同时失败只算一次拥塞信号
+        if now - self._last_decrease < (self._ewma or 0.0):
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+
+
+class TokenBucket:
+    """`rate` 次/秒，容量 `burst`；令牌可透支，调用方按欠额睡眠，从而按到达顺序公平放行。"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate 必须 > 0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+def backoff_delay(attempt: int, *, base: float, cap: float, rng: random.Random) -> float:
+    """第 attempt 次重试（从 0 计）前的等待：uniform(0, min(cap, base·2^attempt))。"""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+@dataclass
+class CallerStats:
+    calls: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    throttled: int = 0
+    overloaded: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class AdaptiveCaller:
+    """`await caller.call(fn, *args)`：限速 → 占用并发槽 → 调用；失败按抖动退避重试，耗尽后抛出最后一次异常。"""
+
+    def __init__(
+        self,
+        limiter: AIMDLimiter | None = None,
+        bucket: TokenBucket | None = None,
+        *,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 10.0,
+        seed: int | None = None,
+    ) -> None:
+        self.limiter = limiter or AIMDLimiter()
+        self.bucket = bucket
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stats = CallerStats()
+        self._rng = random.Random(seed)
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        self.stats.calls += 1
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            await self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:  # noqa: BLE001
+                retry_after = getattr(e, "retry_after", None)
+                kind = classify_error(e)
+                self.limiter.on_failure(kind)
+                if kind == "throttle":
+                    self.stats.throttled += 1
+                elif kind == "overload":
+                    self.stats.overloaded += 1
+                if attempt == self.max_attempts - 1:
+                    self.stats.failed += 1
+                    raise
+            else:
+                self.limiter.on_success(time.monotonic() - start)
+                self.stats.succeeded += 1
+                return result
+            finally:
+                self.limiter.release()
+
+            self.stats.retries += 1
+            delay = backoff_delay(attempt, base=self.backoff_base, cap=self.backoff_cap, rng=self._rng)
+            if isinstance(retry_after, (int, float)):
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,111 @@
+"""runner.plan
+
+FlowRunner 的执行计划：一次性解析步骤、实例化 Processor 并按拓扑序排好。
+
+Processor 实例在 FlowRunner 生命周期内复用：
+    * 默认（`pool_size` 为 None）视为线程安全，所有文章共享同一实例；
+    * 声明 `pool_size = N` 的 Processor 预建 N 个实例，每个实例同一时刻只处理一篇文章；
+    * 可选的 `setup()` / `teardown()` 分别在实例创建后、计划关闭时各调用一次。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Mapping, Sequence, Set
+
+from common.protocol import REGISTRY, Processor
+from .dag import build_dependencies, topo_sort
+
+
+class ProcessorPool:
+    """同一 Processor 的实例池；`acquire` / `release` 与事件循环无关，可跨 `asyncio.run` 复用。"""
+
+    def __init__(self, instances: Sequence[Processor], *, shared: bool):
+        if not instances:
+            raise ValueError("ProcessorPool 至少需要一个实例")
+        self.instances = list(instances)
+        self.shared = shared
+        self._free: Deque[Processor] = deque(self.instances)
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def meta(self) -> Processor:
+        """用于读取 name / requires / provides 等类级元数据。"""
+        return self.instances[0]
+
+    async def acquire(self) -> Processor:
+        if self.shared:
+            return self.instances[0]
+        if self._free:
+            return self._free.popleft()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(waiter.result())
+            raise
+
+    def release(self, proc: Processor) -> None:
+        if self.shared:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(proc)
+                return
+        self._free.append(proc)
+
+
+@dataclass
+class ExecutionPlan:
+    order: List[str]
+    deps: Dict[str, Set[str]]
+    pools: Dict[str, ProcessorPool] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        steps: Sequence[str],
+        *,
+        configs: Mapping[str, Mapping[str, Any]] | None = None,
+        pool_sizes: Mapping[str, int] | None = None,
+    ) -> "ExecutionPlan":
+        configs = configs or {}
+        pool_sizes = pool_sizes or {}
+        pools: Dict[str, ProcessorPool] = {}
+        try:
+            for name in dict.fromkeys(steps):
+                proc_cls = REGISTRY[name]
+                size = pool_sizes.get(name, getattr(proc_cls, "pool_size", None))
+                count = 1 if size is None else size
+                if count < 1:
+                    raise ValueError(f"{name} 的 pool_size 必须 ≥ 1")
+                instances = []
+                for _ in range(count):
+                    proc = proc_cls(**dict(configs.get(name, {})))  # type: ignore[arg-type]
+                    setup = getattr(proc, "setup", None)
+                    if callable(setup):
+                        setup()
+                    instances.append(proc)
+                pools[name] = ProcessorPool(instances, shared=size is None)
+
+            metas = [pool.meta for pool in pools.values()]
+            deps = build_dependencies(metas)
+            order = topo_sort(list(pools), deps)
+        except BaseException:
+            cls(order=list(pools), deps={}, pools=pools).close()
+            raise
+        return cls(order=order, deps=deps, pools=pools)
+
+    def close(self) -> None:
+        """对所有实例调用 `teardown()`（若有）。"""
+        for pool in self.pools.values():
+            for proc in pool.instances:
+                teardown = getattr(proc, "teardown", None)
+                if callable(teardown):
+                    teardown()
+        self.pools = {}
@@ -0,0 +1,107 @@
+"""runner.tracing
+
+导出 / 汇总 FlowRunner 记录在 `ArticleNLPResult.spans` 上的 Processor 执行记录。
+
+    * `write_jsonl`        ：每行一个 span，便于 jq / pandas 分析；
+    * `to_otlp`            ：OpenTelemetry OTLP/JSON 结构（resourceSpans），可直接 POST 到 collector 的 /v1/traces；
+    * `summarize_spans`    ：按 Processor 汇总次数、耗时分位数、错误数与缓存命中，定位热点。
+"""
+
+from __future__ import annotations
+
+import json
+from typing import IO, Any, Dict, Iterable, List
+
+from common.models import ArticleNLPResult, ProcessorSpan
+
+
+def iter_spans(results: Iterable[ArticleNLPResult]) -> Iterable[ProcessorSpan]:
+    for result in results:
+        yield from result.spans or []
+
+
+def write_jsonl(spans: Iterable[ProcessorSpan], fp: IO[str]) -> int:
+    """写出 JSONL，返回写入条数。"""
+    n = 0
+    for span in spans:
+        fp.write(span.model_dump_json())
+        fp.write("\n")
+        n += 1
+    return n
+
+
+def _attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"key": key, "value": {"doubleValue": float(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp(spans: Iterable[ProcessorSpan], service_name: str = "news-nlp") -> Dict[str, Any]:
+    otel_spans: List[Dict[str, Any]] = []
+    for span in spans:
+        attrs = [
+            _attr("processor.name", span.processor),
+            _attr("processor.version", span.version),
+            _attr("processor.executor", span.executor),
+            _attr("processor.queue_wait_ms", span.queue_wait_ms),
+            _attr("processor.cache_hit", span.cache_hit),
+        ]
+        item: Dict[str, Any] = {
+            "traceId": span.trace_id.rjust(32, "0")[:32],
+            "spanId": span.span_id.rjust(16, "0")[:16],
+            "name": span.processor,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(int(span.start_at * 1e9)),
+            "endTimeUnixNano": str(int(span.end_at * 1e9)),
+            "attributes": attrs,
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        otel_spans.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_attr("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": "runner.flow_runner"}, "spans": otel_spans}],
+            }
+        ]
+    }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarize_spans(spans: Iterable[ProcessorSpan]) -> List[Dict[str, Any]]:
+    """按总执行耗时降序返回各 Processor 的统计。"""
+    groups: Dict[str, List[ProcessorSpan]] = {}
+    for span in spans:
+        groups.setdefault(span.processor, []).append(span)
+
+    report = []
+    for name, items in groups.items():
+        exec_ms = sorted(s.exec_ms for s in items)
+        wait_ms = sorted(s.queue_wait_ms for s in items)
+        report.append(
+            {
+                "processor": name,
+                "count": len(items),
+                "total_exec_ms": sum(exec_ms),
+                "exec_p50_ms": _percentile(exec_ms, 0.50),
+                "exec_p95_ms": _percentile(exec_ms, 0.95),
+                "exec_p99_ms": _percentile(exec_ms, 0.99),
+                "queue_wait_p95_ms": _percentile(wait_ms, 0.95),
+                "errors": sum(1 for s in items if s.error),
+                "cache_hits": sum(1 for s in items if s.cache_hit),
+            }
+        )
+    report.sort(key=lambda r: r["total_exec_ms"], reverse=True)
+    return report
+
+
+def dump_otlp(spans: Iterable[ProcessorSpan], fp: IO[str], service_name: str = "news-nlp") -> None:
+    json.dump(to_otlp(spans, service_name), fp, ensure_ascii=False)
@@ -0,0 +1,327 @@
+"""runner.usage
+
+LLM 调用的 token / 成本记账：`UsageTracker` 是一个 LangChain 回调，挂在 chain 的 config 上，
+记录每次 LLM 调用的输入 / 输出 token、模型名与墙钟耗时，并按文章、Processor、模型与整次运行汇总。
+
+归属依据 config 中的 metadata（由 `Context.llm_config` 生成）：
+    * `processor`：发起调用的 Processor 名；
+    * `trace_ids`：调用所属文章的 trace_id 列表，打包请求含多篇时按篇均摊。
+
+token 优先取模型返回的 `usage_metadata`，其次 Ollama 的 `prompt_eval_count` / `eval_count`
+与 `llm_output.token_usage`，都没有时按 `algo.text.estimate_tokens` 粗估并标记 `estimated`。
+
+设置 `budget_tokens` 后，累计用量达到预算即拒绝新的 LLM 调用（抛出 `TokenBudgetExceeded`），
+FlowRunner 同时停止拉取新文章；已在途的调用照常完成，因此实际用量可能略超预算。
+
+默认只保留整次运行、按 Processor 与按模型的累计值，内存占用与处理的文章数无关。
+逐次调用与按文章明细需显式开启且有上限：
+    * `keep_calls`：保留最近 N 次调用（环形缓冲）；
+    * `keep_articles`：保留最近活跃的 N 篇文章的汇总（LRU）；
+    * `calls_sink`：每次调用结束即以一行 JSON 写入该文件对象，不在内存中保留。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from algo.text import estimate_tokens
+
+Prices = Mapping[str, Tuple[float, float]]  # model -> (每千输入 token 价格, 每千输出 token 价格)
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """本次运行的 token 预算已用尽。"""
+
+
+def parse_prices(spec: str | None = None) -> Dict[str, Tuple[float, float]]:
+    """LLM_PRICES=`qwen3-4b=0.0003/0.0006,qwen3:4b=0/0`，单位为每千 token。"""
+    spec = spec if spec is not None else os.getenv("LLM_PRICES", "")
+    prices: Dict[str, Tuple[float, float]] = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        model, _, rest = item.rpartition("=")
+        price_in, _, price_out = rest.partition("/")
+        if not model or not price_out:
+            raise ValueError(f"非法价格配置: {item}，示例 qwen3-4b=0.0003/0.0006")
+        prices[model] = (float(price_in), float(price_out))
+    return prices
+
+
+@dataclass
+class LLMCall:
+    processor: str
+    model: str
+    trace_ids: List[str]
+    input_tokens: int
+    output_tokens: int
+    wall_ms: float
+    cost: float = 0.0
+    estimated: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    errors: int = 0
+    input_tokens: float = 0.0
+    output_tokens: float = 0.0
+    wall_ms: float = 0.0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> float:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, call: LLMCall, share: float = 1.0) -> None:
+        self.calls += 1
+        self.errors += 1 if call.error else 0
+        self.input_tokens += call.input_tokens * share
+        self.output_tokens += call.output_tokens * share
+        self.wall_ms += call.wall_ms * share
+        self.cost += call.cost * share
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": round(self.input_tokens, 2),
+            "output_tokens": round(self.output_tokens, 2),
+            "total_tokens": round(self.total_tokens, 2),
+            "wall_ms": round(self.wall_ms, 2),
+            "cost": round(self.cost, 6),
+        }
+
+
+@dataclass
+class _Pending:
+    processor: str
+    model: str
+    trace_ids: List[str]
+    started: float
+    prompt_tokens: int
+
+
+def _model_name(serialized: Dict[str, Any] | None, kwargs: Dict[str, Any]) -> str:
+    params = kwargs.get("invocation_params") or {}
+    for key in ("model", "model_name"):
+        if params.get(key):
+            return str(params[key])
+    ser_kwargs = (serialized or {}).get("kwargs") or {}
+    for key in ("model", "model_name"):
+        if ser_kwargs.get(key):
+            return str(ser_kwargs[key])
+    return params.get("_type") or "unknown"
+
+
+def _reported_usage(response: LLMResult) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """(输入 token, 输出 token, 模型名)；模型未报告用量时 token 为 None。"""
+    inp = out = 0
+    found = False
+    model = None
+    for gens in response.generations:
+        for gen in gens:
+            message = getattr(gen, "message", None)
+            meta = getattr(message, "response_metadata", None) or {}
+            model = model or meta.get("model_name") or meta.get("model")
+            usage = getattr(message, "usage_metadata", None)
+            info = {**(gen.generation_info or {}), **meta}
+            if usage:
+                inp += usage.get("input_tokens", 0)
+                out += usage.get("output_tokens", 0)
+                found = True
+            elif "eval_count" in info:  # Ollama 原生字段
+                inp += info.get("prompt_eval_count") or 0
+                out += info.get("eval_count") or 0
+                found = True
+    if not found:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            inp = usage.get("prompt_tokens", usage.get("input_tokens", 0))
+            out = usage.get("completion_tokens", usage.get("output_tokens", 0))
+            found = True
+    return (inp, out, model) if found else (None, None, model)
+
+
+class UsageTracker(BaseCallbackHandler):
+    """线程安全；同一实例可挂在任意多个 chain / 线程 / 事件循环上。"""
+
+    raise_error = True  # 预算耗尽时的异常需传给调用方
+    run_inline = True  # 异步调用时不切线程，保证 start / end 顺序
+
+    def __init__(
+        self,
+        *,
+        budget_tokens: int | None = None,
+        prices: Prices | None = None,
+        keep_calls: int = 0,
+        keep_articles: int = 0,
+        calls_sink: IO[str] | None = None,
+    ) -> None:
+        self.budget_tokens = budget_tokens
+        self.prices = dict(prices if prices is not None else parse_prices())
+        self.keep_articles = keep_articles
+        self.calls_sink = calls_sink
+        self.calls: Deque[LLMCall] = deque(maxlen=keep_calls)
+        self.total = UsageTotals()
+        self.by_processor: Dict[str, UsageTotals] = {}
+        self.by_model: Dict[str, UsageTotals] = {}
+        self.by_article: "OrderedDict[str, UsageTotals]" = OrderedDict()
+        self.evicted_articles = 0
+        self.rejected = 0
+        self._pending: Dict[UUID, _Pending] = {}
+        self._lock = threading.Lock()
+
+    # ------------------- 预算 ------------------- #
+    @property
+    def exhausted(self) -> bool:
+        return self.budget_tokens is not None and self.total.total_tokens >= self.budget_tokens
+
+    def config(self, processor: str, trace_ids: Sequence[str] = ()) -> Dict[str, Any]:
+        """供不经 FlowRunner 的脚本直接调用 chain 时使用的 RunnableConfig。"""
+        return {
+            "callbacks": [self],
+            "metadata": {"processor": processor, "trace_ids": list(trace_ids)},
+        }
+
+    # ------------------- 回调 ------------------- #
+    def _start(
+        self,
+        run_id: UUID,
+        serialized: Dict[str, Any] | None,
+        texts: Iterable[str],
+        tags: List[str] | None,
+        metadata: Dict[str, Any] | None,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        metadata = metadata or {}
+        with self._lock:
+            if self.exhausted:
+                self.rejected += 1
+                raise TokenBudgetExceeded(
+                    f"token 预算已用尽: {self.total.total_tokens:.0f} / {self.budget_tokens}"
+                )
+            self._pending[run_id] = _Pending(
+                processor=metadata.get("processor") or (tags[0] if tags else "unknown"),
+                model=_model_name(serialized, kwargs),
+                trace_ids=list(metadata.get("trace_ids") or []),
+                started=time.perf_counter(),
+                prompt_tokens=sum(estimate_tokens(t) for t in texts),
+            )
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs
+    ) -> None:
+        texts = (str(m.content) for batch in messages for m in batch)
+        self._start(run_id, serialized, texts, tags, metadata, kwargs)
+
+    def on_llm_start(
+        self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs
+    ) -> None:
+        self._start(run_id, serialized, prompts, tags, metadata, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        inp, out, model = _reported_usage(response)
+        estimated = inp is None
+        if estimated:
+            text = "".join(g.text for gens in response.generations for g in gens)
+            out = estimate_tokens(text)
+        self._finish(run_id, inp, out, model, estimated, None)
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs) -> None:
+        self._finish(run_id, None, 0, None, True, f"{type(error).__name__}: {error}")
+
+    def _finish(
+        self,
+        run_id: UUID,
+        inp: Optional[int],
+        out: Optional[int],
+        model: Optional[str],
+        estimated: bool,
+        error: Optional[str],
+    ) -> None:
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+            if pending is None:
+                return
+            model = model or pending.model
+            input_tokens = pending.prompt_tokens if inp is None else inp
+            price_in, price_out = self.prices.get(model, (0.0, 0.0))
+            call = LLMCall(
+                processor=pending.processor,
+                model=model,
+                trace_ids=pending.trace_ids,
+                input_tokens=input_tokens,
+                output_tokens=out or 0,
+                wall_ms=(time.perf_counter() - pending.started) * 1000,
+                cost=(input_tokens * price_in + (out or 0) * price_out) / 1000,
+                estimated=estimated,
+                error=error,
+            )
+            self.calls.append(call)
+            self.total.add(call)
+            self.by_processor.setdefault(call.processor, UsageTotals()).add(call)
+            self.by_model.setdefault(call.model, UsageTotals()).add(call)
+            if self.keep_articles > 0:
+                self._add_articles(call)
+            if self.calls_sink is not None:
+                self.calls_sink.write(json.dumps(asdict(call), ensure_ascii=False) + "\n")
+
+    def _add_articles(self, call: LLMCall) -> None:
+        share = 1 / len(call.trace_ids) if call.trace_ids else 0.0
+        for trace_id in call.trace_ids:
+            totals = self.by_article.get(trace_id)
+            if totals is None:
+                totals = self.by_article[trace_id] = UsageTotals()
+            else:
+                self.by_article.move_to_end(trace_id)
+            totals.add(call, share)
+        while len(self.by_article) > self.keep_articles:
+            self.by_article.popitem(last=False)
+            self.evicted_articles += 1
+
+    # ------------------- 报告 ------------------- #
+    def article(self, trace_id: str) -> Dict[str, Any]:
+        """未开启 keep_articles 或该文章已被淘汰时返回全零。"""
+        with self._lock:
+            return self.by_article.get(trace_id, UsageTotals()).as_dict()
+
+    def report(self, *, per_article: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            report: Dict[str, Any] = {
+                "total": self.total.as_dict(),
+                "by_processor": {k: v.as_dict() for k, v in sorted(self.by_processor.items())},
+                "by_model": {k: v.as_dict() for k, v in sorted(self.by_model.items())},
+                "budget": {
+                    "tokens": self.budget_tokens,
+                    "used": round(self.total.total_tokens, 2),
+                    "exhausted": self.exhausted,
+                    "rejected_calls": self.rejected,
+                },
+            }
+            if per_article and self.keep_articles > 0:
+                report["by_article"] = {k: v.as_dict() for k, v in self.by_article.items()}
+                report["evicted_articles"] = self.evicted_articles
+            return report
+
+    def write_report(self, path: str, *, per_article: bool = True) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.report(per_article=per_article), fp, ensure_ascii=False, indent=2)
+
+    def write_calls_jsonl(self, fp: IO[str]) -> int:
+        """每行一次保留中的 LLM 调用（最近 keep_calls 次），返回写入条数。"""
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            fp.write(json.dumps(asdict(call), ensure_ascii=False))
+            fp.write("\n")
+        return len(calls)
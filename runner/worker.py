@@ -0,0 +1,166 @@
+"""runner.worker
+
+独立 worker：从消息总线消费 Processor 任务，执行后按 task_id 回写结果。
+
+每个 Processor 对应一个队列 `proc.<name>`，worker 为每个队列启动 `concurrency[name]`
+个消费线程，即单个 worker 对该队列的并发上限。可横向启动多个 worker 进程 / 机器扩容。
+
+运行：
+$ python -m runner.worker --bus sqlite:///tmp/bus.db \
+      --modules processors.cleaner processors.event_extractor \
+      --steps cleaner event_dummy --concurrency event_dummy=4
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Mapping
+
+from common.protocol import REGISTRY, Context, Processor
+from .bus import Bus, Delivery, bus_from_url
+
+QUEUE_PREFIX = "proc."
+
+logger = logging.getLogger("runner.worker")
+
+
+def queue_name(proc_name: str) -> str:
+    return f"{QUEUE_PREFIX}{proc_name}"
+
+
+class BusWorker:
+    def __init__(
+        self,
+        bus: Bus,
+        steps: List[str],
+        *,
+        configs: Mapping[str, Mapping[str, Any]] | None = None,
+        concurrency: Mapping[str, int] | int = 1,
+        visibility_timeout: float = 60.0,
+        max_attempts: int = 3,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.bus = bus
+        self.steps = list(dict.fromkeys(steps))
+        self.configs = configs or {}
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._shared: Dict[str, Processor] = {}
+
+    def _slots(self, name: str) -> int:
+        if isinstance(self.concurrency, int):
+            return self.concurrency
+        return self.concurrency.get(name, 1)
+
+    def _instance(self, name: str) -> Processor:
+        """线程安全的 Processor 全 worker 共享；声明了 pool_size 的每个消费线程独占一个。"""
+        proc_cls = REGISTRY[name]
+        if getattr(proc_cls, "pool_size", None) is None and name in self._shared:
+            return self._shared[name]
+        proc = proc_cls(**dict(self.configs.get(name, {})))  # type: ignore[arg-type]
+        setup = getattr(proc, "setup", None)
+        if callable(setup):
+            setup()
+        if getattr(proc_cls, "pool_size", None) is None:
+            self._shared[name] = proc
+        return proc
+
+    def handle(self, proc: Processor, queue: str, delivery: Delivery) -> None:
+        body = delivery.body
+        started_at = time.time()
+        try:
+            out = proc.run(body["data"], Context(trace_id=body["trace_id"]))
+        except Exception as e:  # noqa: BLE001
+            if delivery.attempts < self.max_attempts:
+                logger.warning(
+                    "task %s failed (attempt %d), redeliver: %s",
+                    body["task_id"], delivery.attempts, e,
+                )
+                self.bus.nack(queue, delivery.msg_id)
+                return
+            logger.exception("task %s failed permanently", body["task_id"])
+            self.bus.put_result(body["task_id"], {"error": str(e)})
+        else:
+            self.bus.put_result(body["task_id"], {"output": out, "started_at": started_at})
+        self.bus.ack(queue, delivery.msg_id)
+
+    def _consume_loop(self, name: str, proc: Processor) -> None:
+        queue = queue_name(name)
+        while not self._stop.is_set():
+            delivery = self.bus.consume(queue, visibility_timeout=self.visibility_timeout)
+            if delivery is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.handle(proc, queue, delivery)
+
+    def start(self) -> None:
+        for name in self.steps:
+            for i in range(self._slots(name)):
+                thread = threading.Thread(
+                    target=self._consume_loop,
+                    args=(name, self._instance(name)),
+                    name=f"bus-worker-{name}-{i}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        for proc in self._shared.values():
+            teardown = getattr(proc, "teardown", None)
+            if callable(teardown):
+                teardown()
+        self._shared = {}
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+def _parse_concurrency(items: List[str]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for item in items:
+        name, _, n = item.partition("=")
+        out[name] = int(n)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EventBus Processor worker")
+    parser.add_argument("--bus", required=True, help="sqlite:///path | redis://host:port/db")
+    parser.add_argument("--modules", nargs="+", default=[], help="需导入以完成注册的模块")
+    parser.add_argument("--steps", nargs="+", help="本 worker 承接的 Processor，默认全部已注册")
+    parser.add_argument("--concurrency", nargs="*", default=[], help="name=N，每队列消费线程数")
+    parser.add_argument("--visibility-timeout", type=float, default=60.0)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for module in args.modules:
+        importlib.import_module(module)
+    worker = BusWorker(
+        bus_from_url(args.bus),
+        args.steps or list(REGISTRY),
+        concurrency=_parse_concurrency(args.concurrency),
+        visibility_timeout=args.visibility_timeout,
+        max_attempts=args.max_attempts,
+    )
+    worker.run_forever()
@@ -0,0 +1,95 @@
+import asyncio
+import importlib
+from contextlib import aclosing
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from repo import SqlNewsRepository, ThreadedNewsRepository, WriteBehind, open_async_repository, prefetch
+from repo.async_news_repository import asyncpg_dsn, decode_vector, encode_vector
+
+T0 = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'news.db'}"
+    repo = SqlNewsRepository(url)
+    with repo.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, created_at TIMESTAMP, title TEXT, text TEXT,"
+            " summary TEXT, keywords TEXT, embedding TEXT)"
+        ))
+        rows = [{"id": i, "ts": T0 + timedelta(minutes=i), "t": f"新闻{i}"} for i in range(7)]
+        conn.execute(text("INSERT INTO articles (id, created_at, title, text) VALUES (:id, :ts, :t, :t)"), rows)
+    repo.dispose()
+    return url
+
+
+def test_vector_codec_and_dsn():
+    data = encode_vector([0.5, -1.25, 3.0])
+    assert data[:4] == b"\x00\x03\x00\x00" and decode_vector(data) == [0.5, -1.25, 3.0]
+    assert asyncpg_dsn("postgresql+psycopg://u:p@h/db") == "postgresql://u:p@h/db"
+    assert asyncpg_dsn("postgresql://u:p@h/db") == "postgresql://u:p@h/db"
+
+
+def test_threaded_repository_streams_and_writes(db_url):
+    async def go():
+        repo = await open_async_repository(db_url)
+        assert isinstance(repo, ThreadedNewsRepository)
+        chunks = [c async for c in repo.iter_without_abstract(chunk_size=3)]
+        await repo.update_abstracts([(0, "摘要", ["芯片"])])
+        page = await repo.fetch_without_abstract(after_ts=datetime.min, limit=10, after_id=0)
+        await repo.dispose()
+        return chunks, page
+
+    chunks, page = asyncio.run(go())
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    assert [r[0] for r in page] == [1, 2, 3, 4, 5, 6]
+
+
+def test_prefetch_overlaps_reads_and_write_behind_keeps_order():
+    log = []
+
+    async def source():
+        for i in range(3):
+            log.append(f"read{i}")
+            await asyncio.sleep(0)
+            yield i
+
+    async def write(i):
+        await asyncio.sleep(0.01)
+        log.append(f"write{i}")
+
+    async def go():
+        writes = WriteBehind()
+        async with aclosing(prefetch(source())) as batches:
+            async for i in batches:
+                await asyncio.sleep(0.001)  # 处理当前块期间下一块已在读取
+                log.append(f"proc{i}")
+                await writes.submit(write(i))
+        await writes.flush()
+
+    asyncio.run(go())
+    assert log.index("read1") < log.index("proc0")
+    assert [x for x in log if x.startswith("write")] == ["write0", "write1", "write2"]
+    assert log.index("proc1") < log.index("write0")  # 写回与下一块处理重叠
+
+
+def test_async_abstract_pipeline_walks_all_rows(db_url, monkeypatch):
+    monkeypatch.setenv("PG_CONN", "sqlite://")
+    pipeline = importlib.import_module("pipeline.news_abstract_process")
+    monkeypatch.setattr(pipeline, "CONNECTION_STRING", db_url)
+    monkeypatch.setattr(pipeline, "BATCH_SIZE", 3)
+
+    async def fake_batch(texts, *args, **kwargs):
+        return list(texts), [["芯片"]] * len(texts)
+
+    monkeypatch.setattr(pipeline, "process_batch_async", fake_batch)
+    asyncio.run(pipeline.main_async(dedup=False))
+    repo = SqlNewsRepository(db_url)
+    with repo.engine.connect() as conn:
+        missing = conn.execute(text("SELECT COUNT(*) FROM articles WHERE summary IS NULL")).scalar()
+    repo.dispose()
+    assert missing == 0
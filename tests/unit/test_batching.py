@@ -0,0 +1,78 @@
+from common.models import ArticleInput
+from common.protocol import register
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  (register)
+
+
+@register
+class _Batched:
+    name = "test_batched_upper"
+    requires = {"clean_text"}
+    provides = {"summary"}
+    batch_sizes: list = []
+    single_calls = 0
+    fail_whole_batch = False
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        type(self).single_calls += 1
+        if data["clean_text"] == "bad":
+            raise ValueError("bad item")
+        return {"summary": data["clean_text"].upper()}
+
+    def run_batch(self, batch, ctx):
+        cls = type(self)
+        cls.batch_sizes.append(len(batch))
+        if cls.fail_whole_batch:
+            raise RuntimeError("backend down")
+        return [
+            ValueError("bad item") if d["clean_text"] == "bad" else {"summary": d["clean_text"].upper()}
+            for d in batch
+        ]
+
+
+def _reset(fail=False):
+    _Batched.batch_sizes = []
+    _Batched.single_calls = 0
+    _Batched.fail_whole_batch = fail
+
+
+def _articles(texts):
+    return [ArticleInput(id=str(i), title="T", text=t) for i, t in enumerate(texts)]
+
+
+def test_stream_uses_micro_batches_with_per_item_errors():
+    _reset()
+    texts = ["a", "b", "bad", "c", "d", "e", "f"]
+    with FlowRunner(
+        steps=["cleaner", "test_batched_upper"],
+        batch_config={"test_batched_upper": {"size": 4, "max_wait": 0.05}},
+    ) as runner:
+        results = list(runner.process_many(_articles(texts), ordered=True))
+
+    assert _Batched.single_calls == 0
+    assert max(_Batched.batch_sizes) == 4
+    assert sum(_Batched.batch_sizes) == 7
+    assert results[0].summary == "A" and results[6].summary == "F"
+    assert results[2].errors == {"test_batched_upper": "bad item"}
+    assert all(not r.errors for i, r in enumerate(results) if i != 2)
+
+
+def test_whole_batch_failure_falls_back_to_run():
+    _reset(fail=True)
+    with FlowRunner(steps=["cleaner", "test_batched_upper"], batch_size=8) as runner:
+        results = list(runner.process_many(_articles(["x", "bad", "y"]), ordered=True))
+
+    assert _Batched.single_calls == 3
+    assert [r.summary for r in results] == ["X", None, "Y"]
+    assert results[1].errors == {"test_batched_upper": "bad item"}
+
+
+def test_single_article_path_ignores_run_batch():
+    _reset()
+    with FlowRunner(steps=["cleaner", "test_batched_upper"]) as runner:
+        result = runner.process(ArticleInput(title="T", text="z"))
+    assert result.summary == "Z"
+    assert _Batched.batch_sizes == [] and _Batched.single_calls == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from benchmarks.bench_flow_runner import (
+    SCENARIOS,
+    _peak_rss_mb,
+    _reset_peak_rss,
+    compare,
+    load_previous,
+    run_case,
+    save,
+)
+from benchmarks.corpus import make_corpus
+from benchmarks.fake_llm import FakeChatModel
+from processors.event_llm import LLMEvtExtractor
+from processors.summarizer import LLMSummarizer
+from common.protocol import Context
+from runner.flow_runner import FlowRunner
+
+
+def test_corpus_is_deterministic():
+    a, b = make_corpus(5, seed=7), make_corpus(5, seed=7)
+    assert [x.text for x in a] == [x.text for x in b]
+    assert make_corpus(5, seed=8)[0].text != a[0].text
+
+
+def test_fake_llm_drives_real_processors():
+    llm = FakeChatModel(latency=0.0)
+    data = {"clean_text": "华为发布新一代芯片。业内人士认为此举将巩固地位。"}
+    out = LLMSummarizer(llm=llm).run(data, Context())
+    assert out["summary"].startswith("华为发布") and out["keywords"]
+    events = LLMEvtExtractor(llm=llm).run(data, Context())["events"]
+    assert [e.trigger for e in events] == ["发布"]
+
+
+def test_run_case_save_and_compare(tmp_path):
+    case = run_case("llm", "stream", articles=8, latency=0.005)
+    assert case["articles"] == 8 and case["errors"] == 0
+    assert case["throughput_aps"] > 0 and case["latency_p95_ms"] >= case["latency_p50_ms"]
+
+    save([case], {"articles": 8}, results_dir=tmp_path)
+    previous = load_previous(tmp_path)
+    assert previous["cases"][0]["mode"] == "stream"
+
+    slower = dict(case, throughput_aps=case["throughput_aps"] / 2)
+    assert compare([slower], previous["cases"]) and not compare([case], previous["cases"])
+
+
+def test_case_reports_its_own_peak_rss():
+    if not _reset_peak_rss():
+        pytest.skip("平台不支持清零峰值内存")
+    bloat = bytearray(b"x" * (200 * 1024 * 1024))  # 抬高本进程高水位
+    high = _peak_rss_mb()
+    del bloat
+    case = run_case("dummy", "stream", articles=4, latency=0.0)
+    assert 0 < case["peak_rss_mb"] < high - 150
+
+
+def test_repo_write_bench_runs_on_sqlite(tmp_path):
+    from benchmarks.bench_repo_writes import run
+
+    results = run(f"sqlite:///{tmp_path / 'bench.db'}", rows=50, dim=4)
+    assert list(results) == ["executemany"]  # SQLite 无 COPY 路径
+    assert results["executemany"]["embeddings_rows_per_s"] > 0
+
+
+def test_micro_batching_does_not_slow_llm_steps():
+    llm = FakeChatModel(latency=0.0)
+    configs = {"summarizer_llm": {"llm": llm}, "event_llm": {"llm": llm}}
+    with FlowRunner(SCENARIOS["llm"], configs=configs) as runner:
+        assert not runner._make_batchers()  # 有 arun 的 LLM 步骤不经线程内 run_batch
+    packed = {"summarizer_llm": {"llm": llm, "packed": True}}
+    with FlowRunner(["cleaner", "summarizer_llm"], configs=packed) as runner:
+        assert list(runner._make_batchers()) == ["summarizer_llm"]
+
+    batched = run_case("llm", "stream", articles=64, latency=0.05)
+    unbatched = run_case("llm", "unbatched", articles=64, latency=0.05)
+    assert batched["errors"] == unbatched["errors"] == 0
+    assert batched["throughput_aps"] >= 0.5 * unbatched["throughput_aps"]  # 修复前约 0.4
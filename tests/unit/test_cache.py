@@ -0,0 +1,62 @@
+from common.models import ArticleInput
+from common.protocol import register
+from runner.cache import ResultCache, SqliteCache
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  (register)
+
+
+@register
+class _Counting:
+    name = "test_counting_summary"
+    version = "1.0.0"
+    requires = {"clean_text"}
+    provides = {"summary"}
+    calls = 0
+
+    def __init__(self, max_len: int = 4, **cfg):
+        self.max_len = max_len
+
+    def run(self, data, ctx):
+        type(self).calls += 1
+        return {"summary": data["clean_text"][: self.max_len]}
+
+
+def _run(cache, texts, **configs):
+    with FlowRunner(
+        steps=["cleaner", "test_counting_summary"], cache=cache,
+        configs={"test_counting_summary": configs},
+    ) as runner:
+        return [runner.process(ArticleInput(title="T", text=t)) for t in texts]
+
+
+def test_cache_hits_skip_processor(tmp_path):
+    _Counting.calls = 0
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache(path=path)
+    first = _run(cache, ["苹果公司发布", "苹果公司发布", "华为公司发布"])
+    assert _Counting.calls == 2
+    assert [r.summary for r in first] == ["苹果公司", "苹果公司", "华为公司"]
+    stats = cache.stats.as_dict()
+    assert stats["per_processor"]["test_counting_summary"] == {"hits": 1, "misses": 2}
+    cache.close()
+
+    # 新进程级缓存：内存层为空，从磁盘层命中
+    cache = ResultCache(path=path)
+    _run(cache, ["苹果公司发布"])
+    assert _Counting.calls == 2
+    assert cache.stats.disk_hits >= 1
+
+    # 配置变化 ⇒ 新键
+    _run(cache, ["苹果公司发布"], max_len=2)
+    assert _Counting.calls == 3
+    cache.close()
+
+
+def test_sqlite_cache_evicts_by_size(tmp_path):
+    disk = SqliteCache(str(tmp_path / "c.db"), max_bytes=1000)
+    for i in range(20):
+        disk.put(f"k{i}", b"x" * 100)
+    assert disk.total_bytes <= 1000
+    assert disk.get("k19") is not None
+    assert disk.get("k0") is None
+    disk.close()
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from common.models import ArticleInput
+from common.protocol import register
+from runner.dag import CycleError, ProviderConflictError, build_dependencies, topo_sort
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  (register)
+
+
+class _Proc:
+    def __init__(self, name, requires, provides):
+        self.name, self.requires, self.provides = name, set(requires), set(provides)
+
+
+@register
+class _SlowSummary:
+    name = "test_slow_summary"
+    requires = {"clean_text"}
+    provides = {"summary"}
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        time.sleep(0.2)
+        return {"summary": data["clean_text"][:4]}
+
+
+@register
+class _SlowKeywords:
+    name = "test_slow_keywords"
+    requires = {"clean_text"}
+    provides = {"keywords"}
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        time.sleep(0.2)
+        return {"keywords": data["clean_text"].split()}
+
+
+def test_topo_sort_orders_by_dependencies():
+    procs = [
+        _Proc("summary", {"clean_text"}, {"summary"}),
+        _Proc("cleaner", {"text"}, {"clean_text"}),
+    ]
+    deps = build_dependencies(procs)
+    assert deps == {"summary": {"cleaner"}, "cleaner": set()}
+    assert topo_sort(["summary", "cleaner"], deps) == ["cleaner", "summary"]
+
+
+def test_provider_conflict_detected():
+    procs = [_Proc("a", {"clean_text"}, {"summary"}), _Proc("b", {"clean_text"}, {"summary"})]
+    with pytest.raises(ProviderConflictError):
+        build_dependencies(procs)
+
+
+def test_cycle_detected():
+    procs = [_Proc("a", {"y"}, {"x"}), _Proc("b", {"x"}, {"y"})]
+    with pytest.raises(CycleError):
+        topo_sort(["a", "b"], build_dependencies(procs))
+
+
+def test_independent_processors_run_concurrently():
+    article = ArticleInput(title="T", text="苹果 发布 新品")
+    # 故意倒序给出步骤，FlowRunner 需自行排序
+    runner = FlowRunner(steps=["test_slow_summary", "test_slow_keywords", "cleaner"])
+    start = time.perf_counter()
+    result = runner.process(article)
+    elapsed = time.perf_counter() - start
+
+    assert not result.errors
+    assert result.summary == "苹果 发"
+    assert result.keywords == ["苹果", "发布", "新品"]
+    assert elapsed < 0.35
+
+
+@pytest.fixture
+def stock_registry():
+    """全局 REGISTRY 只保留仓库自带的 Processor（按导入顺序注册），测试结束后恢复。"""
+    from common.protocol import REGISTRY
+    import processors.summarizer, processors.summarizer_dummy, processors.event_llm  # noqa: E401,F401
+    import processors.event_extractor, processors.nlp_llm  # noqa: E401,F401
+
+    saved = dict(REGISTRY)
+    stock = ["cleaner", "summarizer_llm", "dummy_summary", "event_llm", "event_dummy"]
+    REGISTRY.clear()
+    REGISTRY.update({name: saved[name] for name in stock})
+    try:
+        yield REGISTRY, saved
+    finally:
+        REGISTRY.clear()
+        REGISTRY.update(saved)
+
+
+def test_default_runner_runs_stock_processors(stock_registry, caplog):
+    registry, saved = stock_registry
+    with FlowRunner() as runner:
+        assert runner.plan.order == ["cleaner", "dummy_summary", "event_dummy"]
+        result = runner.process(ArticleInput(title="T", text="苹果公司发布新款手机。"))
+    assert not result.errors and result.summary and result.events
+    assert "summarizer_llm 与后注册的 dummy_summary" in caplog.text
+
+    registry["nlp_llm"] = saved["nlp_llm"]  # 后注册者优先
+    with FlowRunner() as runner:
+        assert runner.plan.order == ["cleaner", "nlp_llm"]
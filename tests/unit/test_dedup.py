@@ -0,0 +1,86 @@
+import asyncio
+import importlib
+import random
+
+import pytest
+
+from algo.dedup import NearDupIndex, plan_batch
+from algo.summarizers.llm_summarizer import SummaryResult
+
+BASE = "新华社北京10月17日电 国务院常务会议今日召开，会议部署进一步推动新能源汽车产业高质量发展的若干措施，要求各地加快充电基础设施建设。"
+REPRINT = "（来源：人民网）" + BASE.replace("今日", "今天")
+OTHER = "某科技公司发布新一代手机芯片，性能较上一代提升百分之四十，预计明年一季度量产上市。"
+
+
+@pytest.mark.parametrize("method, threshold", [("minhash", 0.8), ("simhash", 0.9)])
+def test_find_near_duplicate(method, threshold):
+    index = NearDupIndex(method=method, threshold=threshold)
+    index.add("a", BASE, "S")
+    match = index.find(REPRINT)
+    assert match is not None and match.key == "a" and match.payload == "S"
+    assert index.find(OTHER) is None
+    assert index.find("") is None
+
+
+@pytest.mark.parametrize("threshold", [1.0, 0.95, 0.92, 0.9])
+def test_simhash_tables_keep_candidates_small(threshold):
+    rng = random.Random(0)
+    index = NearDupIndex(method="simhash", threshold=threshold, capacity=10_000)
+    for i in range(10_000):
+        index.add(i, "x", sig=rng.getrandbits(64))
+    sizes = [len(index._candidates(rng.getrandbits(64))) for _ in range(200)]
+    assert sum(sizes) / len(sizes) < 10 and max(sizes) < 30
+
+    # 汉明距离恰为上限的变体必须仍能召回
+    for key in rng.sample(range(10_000), 50):
+        sig, _ = index._entries[key]
+        flipped = sig
+        for bit in rng.sample(range(64), index._max_dist):
+            flipped ^= 1 << bit
+        assert key in index._candidates(flipped)
+
+
+def test_simhash_rejects_low_threshold():
+    with pytest.raises(ValueError, match="minhash"):
+        NearDupIndex(method="simhash", threshold=0.8)
+
+
+def test_index_is_bounded_lru():
+    index = NearDupIndex(capacity=2)
+    index.add(1, BASE)
+    index.add(2, OTHER)
+    index.find(BASE)  # 触碰 1，使 2 成为最久未用
+    index.add(3, "完全不同的第三篇新闻正文内容，用于触发容量淘汰。")
+    assert len(index) == 2
+    assert index.find(OTHER) is None and index.find(BASE).key == 1
+
+
+def test_plan_batch_copies_and_follows():
+    index = NearDupIndex()
+    index.add("old", BASE, "S")
+    plan = plan_batch(index, ["x", "y", "z"], [REPRINT, OTHER, OTHER + " "])
+    assert plan.copied == {0: "S"} and plan.leaders == [1] and plan.followers == {2: 1}
+    assert plan.resolve({1: "T"}) == ["S", "T", "T"]
+    assert index.stats.as_dict() == {"seen": 3, "duplicates": 2, "saved_calls": 2, "ratio": 0.6667}
+
+
+def test_pipeline_reuses_summaries(monkeypatch):
+    monkeypatch.setenv("PG_CONN", "sqlite://")
+    pipeline = importlib.import_module("pipeline.news_abstract_process")
+    calls = []
+
+    def fake(text, max_chars):
+        calls.append(text)
+        return SummaryResult(summary=text[:5], keywords=["k"])
+
+    async def afake(text, max_chars):
+        return fake(text, max_chars)
+
+    index = NearDupIndex()
+    abstracts, keywords = pipeline.process_batch_sync([BASE, OTHER], 50, fake, [1, 2], index)
+    assert len(calls) == 2
+    abstracts, _ = asyncio.run(
+        pipeline.process_batch_async([REPRINT, OTHER, REPRINT], 50, afake, None, [3, 4, 5], index)
+    )
+    assert len(calls) == 2 and abstracts == [BASE[:5], OTHER[:5], BASE[:5]]
+    assert index.stats.saved_calls == 3
@@ -0,0 +1,64 @@
+from algo.event_gate import TriggerGate, TriggerMatcher, evaluate_gate
+from algo.text import split_sentences
+from benchmarks.fake_llm import FakeChatModel
+from common.protocol import Context
+from processors.event_llm import LLMEvtExtractor
+
+TEXT = "今日天气晴朗。华为发布新一代芯片！“市场反应积极。”分析师看好后市"
+
+
+def test_split_sentences_keeps_punctuation():
+    assert split_sentences(TEXT) == ["今日天气晴朗。", "华为发布新一代芯片！", "“市场反应积极。”", "分析师看好后市"]
+    assert split_sentences("") == []
+
+
+def test_gate_selects_trigger_sentences_and_counts():
+    gate = TriggerGate()
+    assert gate.select(TEXT) == "华为发布新一代芯片！"
+    assert gate.select("今日天气晴朗，气温适宜。") == ""
+    st = gate.stats.as_dict()
+    assert st["articles"] == 2 and st["articles_filtered"] == 1
+    assert st["sentences"] == 5 and st["sentences_passed"] == 1
+
+    wide = TriggerGate(context_window=1)
+    assert wide.select(TEXT) == "今日天气晴朗。华为发布新一代芯片！“市场反应积极。”"
+
+
+def test_matcher_prefers_longer_words():
+    matcher = TriggerMatcher(["上市", "上市公司", "IPO"])
+    assert matcher.findall("该上市公司计划ipo") == ["上市公司", "ipo"]
+
+
+def test_evaluate_gate_recall():
+    samples = [
+        {"text": "腾讯宣布收购某游戏公司。", "events": [{"trigger": "收购"}]},
+        {"text": "某公司高管被带走调查。", "events": [{"trigger": "带走"}]},  # 词表未覆盖
+        {"text": "今日股市平稳。", "events": []},
+    ]
+    gate = TriggerGate()
+    report = evaluate_gate(gate, samples)
+    assert report.positives == 2 and report.recalled_articles == 1
+    assert report.article_recall == 0.5 and report.event_recall == 0.5
+    assert report.filtered_articles == 2
+    assert gate.stats.articles == 0  # 评估不计入线上统计
+
+
+def test_event_llm_cascade_skips_llm_without_triggers():
+    calls = []
+
+    class _Counting(FakeChatModel):
+        def respond(self, prompt):
+            calls.append(prompt)
+            return super().respond(prompt)
+
+    proc = LLMEvtExtractor(llm=_Counting(latency=0.0), cascade=True)
+    assert proc.run({"clean_text": "今日天气晴朗，气温适宜。"}, Context()) == {"events": []}
+    assert calls == []
+
+    out = proc.run({"clean_text": TEXT}, Context())
+    assert [e.trigger for e in out["events"]] == ["发布"]
+    assert "今日天气晴朗" not in calls[0].split("【句子】:")[-1]
+
+    batch = proc.run_batch([{"clean_text": "无事发生。"}, {"clean_text": TEXT}], Context())
+    assert batch[0] == {"events": []} and batch[1]["events"]
+    assert proc.gate_stats()["articles_filtered"] == 2
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 from common.models import ArticleInput
 from runner.flow_runner import FlowRunner
@@ -12,7 +12,9 @@ MOCK_RESPONSE = (
 
 def test_event_llm_processor(monkeypatch):
     # Mock ChatOllama.invoke to return predefined JSON
-    with patch("processors.event_llm.ChatOllama.invoke", return_value=MOCK_RESPONSE):
+    # FlowRunner 优先走 arun → ainvoke，同步 invoke 一并 mock
+    with patch("processors.event_llm.ChatOllama.invoke", return_value=MOCK_RESPONSE), \
+            patch("processors.event_llm.ChatOllama.ainvoke", new=AsyncMock(return_value=MOCK_RESPONSE)):
         article = ArticleInput(title="发布会", text="苹果公司今日发布 iPhone 15。")
         runner = FlowRunner(steps=["cleaner", "event_llm"])
         result = runner.process(article)
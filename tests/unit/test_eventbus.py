@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from common.models import ArticleInput
+from common.protocol import Context, register
+from processors.cleaner import Cleaner
+from runner.bus import MemoryBus, SqliteBus
+from runner.executor import EventBusExecutor, Task
+from runner.flow_runner import FlowRunner
+from runner.worker import BusWorker, queue_name
+import processors.cleaner  # noqa: F401  (register)
+import processors.event_extractor  # noqa: F401
+
+
+@register
+class _Flaky:
+    name = "test_flaky"
+    requires = {"clean_text"}
+    provides = {"summary"}
+    calls = 0
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        type(self).calls += 1
+        if type(self).calls % 2:
+            raise RuntimeError("transient")
+        return {"summary": data["clean_text"][:2]}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def bus(request, tmp_path):
+    b = MemoryBus() if request.param == "memory" else SqliteBus(str(tmp_path / "bus.db"))
+    yield b
+    b.close()
+
+
+def test_flow_runner_eventbus_roundtrip(bus):
+    worker = BusWorker(bus, ["cleaner", "event_dummy"], concurrency={"event_dummy": 2})
+    worker.start()
+    try:
+        articles = [
+            ArticleInput(id=str(i), title="T", text=f"公司{i}今日宣布收购。") for i in range(6)
+        ]
+        with FlowRunner(
+            steps=["cleaner", "event_dummy"], mode="eventbus", bus=bus,
+            queue_limits={"event_dummy": 2},
+        ) as runner:
+            results = list(runner.process_many(articles, ordered=True))
+    finally:
+        worker.stop()
+
+    assert [r.id for r in results] == [str(i) for i in range(6)]
+    assert all(not r.errors for r in results)
+    assert results[3].events[0].trigger == "宣布"
+
+
+def test_failed_task_is_redelivered(bus):
+    _Flaky.calls = 0
+    worker = BusWorker(bus, ["cleaner", "test_flaky"], max_attempts=2)
+    worker.start()
+    try:
+        with FlowRunner(steps=["cleaner", "test_flaky"], mode="eventbus", bus=bus) as runner:
+            result = runner.process(ArticleInput(title="T", text="苹果公司"))
+    finally:
+        worker.stop()
+
+    assert not result.errors
+    assert result.summary == "苹果"
+    assert _Flaky.calls == 2
+
+
+def test_unacked_message_reappears_after_visibility_timeout(bus):
+    bus.publish(queue_name("x"), {"n": 1})
+    first = bus.consume(queue_name("x"), visibility_timeout=0.1)
+    assert first.attempts == 1
+    assert bus.consume(queue_name("x"), visibility_timeout=0.1) is None
+    time.sleep(0.15)
+    again = bus.consume(queue_name("x"), visibility_timeout=0.1)
+    assert again.msg_id == first.msg_id and again.attempts == 2
+    bus.ack(queue_name("x"), again.msg_id)
+    time.sleep(0.15)
+    assert bus.consume(queue_name("x"), visibility_timeout=0.1) is None
+
+
+def test_submit_timeout_abandons_task(bus):
+    proc = Cleaner()
+    executor = EventBusExecutor(bus, timeout=0.05)
+    task = Task(processor=proc, data={"text": "x"}, context=Context())
+    with pytest.raises(TimeoutError):
+        asyncio.run(executor.submit(task))
+
+    delivery = bus.consume(queue_name(proc.name), visibility_timeout=1)
+    task_id = delivery.body["task_id"]
+    bus.put_result(task_id, {"output": {}})  # worker 迟到的结果
+    bus.ack(queue_name(proc.name), delivery.msg_id)
+    assert bus.pop_result(task_id) is None
+
+
+def test_duplicate_result_after_redelivery_is_dropped(bus):
+    bus.put_result("t1", {"output": {"n": 1}})
+    assert bus.pop_result("t1") == {"output": {"n": 1}}
+    bus.put_result("t1", {"output": {"n": 1}})  # put_result 后、ack 前崩溃，重投再次回传
+    assert bus.pop_result("t1") is None
+
+
+def test_unclaimed_results_expire(tmp_path):
+    for b in (MemoryBus(result_ttl=0.05), SqliteBus(str(tmp_path / "ttl.db"), result_ttl=0.05)):
+        b.put_result("orphan", {"output": {}})
+        time.sleep(0.1)
+        b.put_result("other", {"output": {}})  # 写入时顺带清理过期结果
+        assert b.pop_result("orphan") is None
+        assert b.pop_result("other") == {"output": {}}
+        b.close()
@@ -18,4 +18,36 @@ def test_inproc_executor_summary():
     executor = InProcExecutor()
     result = run_async(executor.submit(task))
 
-    assert result["summary"] == "苹果公司推出新款 i" 
\ No newline at end of file
+    assert result["summary"] == "苹果公司推出新款 i" 
+
+class _AsyncOnly:
+    name = "test_async_only"
+    requires = {"clean_text"}
+    provides = {"summary"}
+
+    def run(self, data, ctx):
+        raise AssertionError("应走 arun")
+
+    async def arun(self, data, ctx):
+        await asyncio.sleep(0.05)
+        return {"summary": data["clean_text"]}
+
+
+def test_inproc_executor_prefers_arun_without_threads():
+    import threading
+
+    proc = _AsyncOnly()
+    executor = InProcExecutor()
+
+    async def many():
+        tasks = [
+            executor.submit({"processor": proc, "data": {"clean_text": str(i)}, "context": Context()})
+            for i in range(500)
+        ]
+        threads_during = threading.active_count()
+        return await asyncio.gather(*tasks), threads_during
+
+    before = threading.active_count()
+    results, during = asyncio.run(many())
+    assert [r["summary"] for r in results] == [str(i) for i in range(500)]
+    assert during <= before + 1
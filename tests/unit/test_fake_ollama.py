@@ -0,0 +1,78 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+from algo.summarizers.llm_summarizer import LLMSummarizerImpl
+from benchmarks.fake_ollama import FakeOllamaServer, LatencyModel, ServerConfig
+from common.protocol import Context
+from processors.event_llm import LLMEvtExtractor
+
+TEXT = "华为发布新一代芯片。"
+
+
+def _post(url, payload):
+    req = urllib.request.Request(url, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def test_real_clients_against_fake_server():
+    with FakeOllamaServer(ServerConfig(dim=16)) as url:
+        llm = ChatOllama(model="fake", base_url=url, format="json", temperature=0)
+        assert LLMSummarizerImpl(llm=llm).summarize(TEXT).summary
+        events = LLMEvtExtractor(llm=llm).run({"clean_text": TEXT}, Context())["events"]
+        assert events[0].trigger == "发布"
+
+        emb = OllamaEmbeddings(model="fake", base_url=url)
+        a, b = emb.embed_documents([TEXT, "另一条新闻"])
+        assert len(a) == 16 and a != b
+        assert emb.embed_query(TEXT) == pytest.approx(a)
+
+        legacy = _post(f"{url}/api/embeddings", {"model": "fake", "prompt": TEXT})["embedding"]
+        assert legacy == pytest.approx(a)
+        out = _post(f"{url}/api/chat", {"model": "fake", "stream": False,
+                                          "messages": [{"role": "user", "content": TEXT}]})
+        assert out["done"] and json.loads(out["message"]["content"])["data"]
+
+
+def test_fault_injection():
+    with FakeOllamaServer(ServerConfig(error_rate=1.0)) as url:
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            _post(f"{url}/api/embed", {"model": "fake", "input": TEXT})
+        assert exc.value.code == 500
+    with FakeOllamaServer(ServerConfig(throttle_rate=1.0)) as url:
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            _post(f"{url}/api/embed", {"model": "fake", "input": TEXT})
+        assert exc.value.code == 429
+
+
+def test_queue_limit_rejects_overflow():
+    config = ServerConfig(embed_latency=LatencyModel.parse("fixed:0.3"), concurrency=1, max_queue=0)
+    server = FakeOllamaServer(config)
+    codes = []
+
+    def call():
+        try:
+            _post(f"{server.base_url}/api/embed", {"model": "fake", "input": TEXT})
+            codes.append(200)
+        except urllib.error.HTTPError as e:
+            codes.append(e.code)
+
+    with server:
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert sorted(codes) == [200, 503, 503]
+    assert server.counters["rejected"] == 2
+
+
+def test_latency_spec():
+    assert LatencyModel.parse("uniform:0.1,0.2").kind == "uniform"
+    with pytest.raises(ValueError):
+        LatencyModel.parse("lognormal:0.2")
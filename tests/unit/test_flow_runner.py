@@ -1,4 +1,8 @@
+import asyncio
+import time
+
 from common.models import ArticleInput
+from common.protocol import register
 from runner.flow_runner import FlowRunner
 import processors.cleaner  # noqa: F401  (register)
 import processors.summarizer_dummy  # noqa: F401
@@ -13,4 +17,74 @@ def test_flow_runner_summary():
     # summary 应去掉换行且长度<=30
     assert "\n" not in result.summary
     assert len(result.summary) <= 30
-    assert not result.errors 
\ No newline at end of file
+    assert not result.errors 
+
+@register
+class _SleepyUpper:
+    """按正文长度倒序耗时，便于观察乱序完成。"""
+
+    name = "test_sleepy_upper"
+    requires = {"clean_text"}
+    provides = {"summary"}
+    in_flight = 0
+    peak = 0
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        cls = type(self)
+        cls.in_flight += 1
+        cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(0.05 / len(data["clean_text"]))
+        cls.in_flight -= 1
+        return {"summary": data["clean_text"].upper()}
+
+
+def _articles(n):
+    return [ArticleInput(id=str(i), title="T", text="x" * (i + 1)) for i in range(n)]
+
+
+def test_process_many_ordered():
+    runner = FlowRunner(steps=["cleaner", "test_sleepy_upper"])
+    results = list(runner.process_many(_articles(8), max_in_flight=4, ordered=True))
+    assert [r.id for r in results] == [str(i) for i in range(8)]
+    assert results[2].summary == "XXX"
+
+
+def test_process_many_unordered_yields_fast_first():
+    runner = FlowRunner(steps=["cleaner", "test_sleepy_upper"])
+    results = list(runner.process_many(_articles(4), max_in_flight=4))
+    assert sorted(r.id for r in results) == ["0", "1", "2", "3"]
+    assert results[0].id == "3"  # 最长正文耗时最短
+
+
+def test_stream_backpressure_limits_pulls():
+    pulled = []
+
+    def source():
+        for art in _articles(20):
+            pulled.append(art.id)
+            yield art
+
+    runner = FlowRunner(steps=["cleaner", "test_sleepy_upper"])
+    _SleepyUpper.peak = 0
+    stream = runner.process_many(source(), max_in_flight=3)
+    first = next(stream)
+    assert first is not None
+    assert len(pulled) <= 4  # 已完成 1 篇 + 至多 3 篇在途
+    assert len(list(stream)) == 19
+    assert _SleepyUpper.peak <= 3
+
+
+def test_aprocess_stream_accepts_async_iterable():
+    async def source():
+        for art in _articles(5):
+            yield art
+
+    async def collect():
+        runner = FlowRunner(steps=["cleaner", "test_sleepy_upper"])
+        return [r async for r in runner.aprocess_stream(source(), max_in_flight=2, ordered=True)]
+
+    results = asyncio.run(collect())
+    assert [r.id for r in results] == ["0", "1", "2", "3", "4"]
@@ -0,0 +1,62 @@
+import json
+import random
+
+from langchain_core.runnables import RunnableLambda
+
+from algo.keywords import AD, STOP, build_keyword_filter, normalize_keyword
+from algo.summarizers.llm_summarizer import LLMSummarizerImpl
+
+
+def test_normalize_width_and_symbols():
+    assert normalize_keyword("  【ｉＰｈｏｎｅ　１５】 ") == "iPhone 15"
+    assert normalize_keyword("“芯片”") == "芯片"
+
+
+def test_clean_filters_and_dedups(tmp_path):
+    kf = build_keyword_filter(cache_dir=tmp_path)
+    raw = ["华为", "ＨＵＡＷＥＩ", "huawei", "新闻", "扫码领取优惠券", "2024", "锂", "【芯片】", "芯片"]
+    assert kf.clean(raw) == ["华为", "HUAWEI", "锂", "芯片"]
+    assert kf.stats.as_dict() == {
+        "seen": 9, "kept": 4, "stopword": 1, "ad": 1, "duplicate": 2, "invalid": 1
+    }
+    assert kf.clean(None) == []
+    assert build_keyword_filter(cache_dir=tmp_path, min_len=2).clean(["锂", "锂电池"]) == ["锂电池"]
+
+
+def test_ad_words_match_whole_terms_only(tmp_path):
+    kf = build_keyword_filter(cache_dir=tmp_path)
+    raw = ["推广", "广告", "团购", "新能源汽车推广", "广告行业", "社区团购", "扫码支付", "关注公众号领红包"]
+    assert kf.clean(raw) == ["新能源汽车推广", "广告行业", "社区团购", "扫码支付"]
+    assert kf.stats.ad == 4
+
+
+def test_automaton_matches_brute_force(tmp_path):
+    stop_file, ad_file = tmp_path / "stop.txt", tmp_path / "ad.txt"
+    stop_file.write_text("# 注释\n甲乙\n乙丙丁\n\n", encoding="utf-8")
+    ad_file.write_text("丙丁\n甲乙丙甲\nＡＢ\n", encoding="utf-8")
+    kf = build_keyword_filter([str(stop_file)], [str(ad_file)], cache_dir=tmp_path / "cache")
+    stops = {"甲乙", "乙丙丁", "新闻"}
+    ads = ["丙丁", "甲乙丙甲", "ab", "加微信"]
+    rng = random.Random(0)
+    for _ in range(3000):
+        word = "".join(rng.choice("甲乙丙丁ab") for _ in range(rng.randint(1, 7)))
+        flags = kf.lexicon.scan(word)
+        assert bool(flags & AD) == any(t in word for t in ads), word
+        assert bool(flags & STOP) == (word in stops), word
+
+
+def test_compiled_lexicon_is_reused(tmp_path):
+    first = build_keyword_filter(cache_dir=tmp_path)
+    mtime = first.lexicon.path.stat().st_mtime_ns
+    second = build_keyword_filter(cache_dir=tmp_path)
+    assert second.lexicon.path == first.lexicon.path
+    assert second.lexicon.path.stat().st_mtime_ns == mtime
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_summarizer_applies_filter(tmp_path):
+    keywords = ["芯片", "关注公众号", "记者", "芯片", "华为"]
+    llm = RunnableLambda(lambda _: json.dumps({"summary": "摘要", "keywords": keywords}))
+    summarizer = LLMSummarizerImpl(llm=llm, keyword_filter=build_keyword_filter(cache_dir=tmp_path))
+    assert summarizer.summarize("华为发布芯片。").keywords == ["芯片", "华为"]
+    assert summarizer.summarize_batch(["华为发布芯片。"])[0].keywords == ["芯片", "华为"]
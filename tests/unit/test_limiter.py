@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from runner.limiter import AdaptiveCaller, AIMDLimiter, TokenBucket, classify_error
+
+
+class _Throttled(Exception):
+    status_code = 429
+
+
+def test_classify_error():
+    assert classify_error(_Throttled()) == "throttle"
+    assert classify_error(RuntimeError("HTTP 429 Too Many Requests")) == "throttle"
+    assert classify_error(TimeoutError()) == "overload"
+    assert classify_error(ValueError("invalid json")) == "other"
+
+
+def test_aimd_increase_and_decrease():
+    limiter = AIMDLimiter(initial=4, max_limit=8)
+    for _ in range(20):
+        limiter.on_success(0.5)
+    assert limiter.limit > 4
+    grown = limiter.limit
+    limiter.on_failure("throttle")
+    assert limiter.limit == grown // 2
+    limiter.on_failure("throttle")  # 同一延迟窗口内不重复降
+    assert limiter.limit == grown // 2
+    limiter.on_failure("other")
+    assert limiter.limit == grown // 2
+
+
+def test_aimd_decreases_on_latency_spike():
+    limiter = AIMDLimiter(initial=8, latency_tolerance=2.0, ewma_alpha=1.0)
+    limiter.on_success(0.01)
+    limiter.on_success(0.1)
+    assert limiter.limit == 4
+
+
+def test_limiter_caps_inflight():
+    limiter = AIMDLimiter(initial=2, max_limit=2)
+    caller = AdaptiveCaller(limiter)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        peak = max(peak, limiter.inflight)
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def main():
+        return await asyncio.gather(*(caller.call(work) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
+    assert peak == 2 and limiter.inflight == 0
+
+
+def test_retry_with_backoff_then_give_up():
+    attempts = {"ok": 0, "bad": 0}
+
+    async def flaky(key):
+        attempts[key] += 1
+        if key == "bad" or attempts[key] < 2:
+            raise _Throttled()
+        return key
+
+    caller = AdaptiveCaller(max_attempts=3, backoff_base=0.001, seed=1)
+
+    async def main():
+        return await asyncio.gather(caller.call(flaky, "ok"), caller.call(flaky, "bad"), return_exceptions=True)
+
+    ok, bad = asyncio.run(main())
+    assert ok == "ok" and isinstance(bad, _Throttled)
+    assert attempts == {"ok": 2, "bad": 3}
+    assert caller.stats.retries == 3 and caller.stats.failed == 1 and caller.stats.throttled == 4
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+
+    async def main():
+        for _ in range(6):
+            await bucket.acquire()
+
+    t0 = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - t0 >= 0.045
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
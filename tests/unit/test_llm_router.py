@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from algo.llm_router import AllBackendsFailed, Backend, LLMRouter, router_from_env
+from algo.summarizers.llm_summarizer import LLMSummarizerImpl
+from benchmarks.fake_llm import FakeChatModel
+from common.protocol import Context
+from processors.event_llm import LLMEvtExtractor
+
+PROMPT = "【新闻正文】:华为发布新一代芯片。"
+
+
+def _router(*llms, **kw):
+    return LLMRouter([Backend(name=f"b{i}", llm=llm) for i, llm in enumerate(llms)], **kw)
+
+
+def test_failover_and_circuit_breaker():
+    router = _router(FakeChatModel(latency=0, error_rate=1.0), FakeChatModel(latency=0))
+    for _ in range(3):
+        assert router.invoke(PROMPT).content
+    bad, good = router.backends
+    assert bad.failures == 3 and good.calls == 3
+    assert not bad.healthy(time.monotonic())
+    router.invoke(PROMPT)
+    assert bad.calls == 3  # 熔断期间不再尝试
+
+    with pytest.raises(AllBackendsFailed):
+        _router(FakeChatModel(latency=0, error_rate=1.0)).invoke(PROMPT)
+
+
+def test_prefers_faster_backend():
+    router = _router(FakeChatModel(latency=0.03), FakeChatModel(latency=0.0), hedge_percentile=None)
+    for _ in range(6):
+        router.invoke(PROMPT)
+    slow, fast = router.backends
+    assert slow.calls == 1 and fast.calls == 5
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_hedges_slow_requests(use_async):
+    router = _router(FakeChatModel(latency=0.01), FakeChatModel(latency=0.01), hedge_min_samples=1)
+    for _ in range(6):
+        router.invoke(PROMPT)
+    primary = router.ranked()[0]
+    primary.latencies.clear()  # 排除首次调用的预热耗时
+    primary.record_success(0.01)
+    primary.llm = FakeChatModel(latency=1.0)  # 突然变慢
+    hedges = sum(b.hedges for b in router.backends)
+
+    t0 = time.monotonic()
+    if use_async:
+        asyncio.run(router.ainvoke(PROMPT))
+    else:
+        router.invoke(PROMPT)
+    assert time.monotonic() - t0 < 0.5
+    assert sum(b.hedges for b in router.backends) == hedges + 1
+    if use_async:  # 被取消的主请求按耗时下限计入，不再排在首位
+        assert primary.ewma > 0.01 and router.ranked()[0] is not primary
+    router.close()
+
+
+def test_router_shared_by_processors():
+    router = _router(FakeChatModel(latency=0))
+    summary = LLMSummarizerImpl(llm=router).summarize("华为发布新一代芯片。")
+    events = LLMEvtExtractor(llm=router).run({"clean_text": "华为发布新一代芯片。"}, Context())["events"]
+    assert summary.summary and events[0].trigger == "发布"
+    assert router.stats()[0]["calls"] == 2
+
+
+def test_router_from_env():
+    assert router_from_env("") is None
+    router = router_from_env("ollama=qwen3:4b@http://127.0.0.1:1,ollama=qwen3:8b")
+    assert [b.name for b in router.backends] == ["ollama=qwen3:4b@http://127.0.0.1:1", "ollama=qwen3:8b"]
+    with pytest.raises(ValueError):
+        router_from_env("unknown=x")
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from langchain_core.runnables import RunnableLambda
+
+from algo.summarizers.llm_summarizer import LLMSummarizerImpl
+from algo.text import chunk_sentences, clip_summary, estimate_tokens, truncate_to_budget
+
+LEAD = "新能源汽车销量创新高。"
+ON_TOPIC = "新能源汽车企业加快新能源汽车电池研发。"
+OFF_TOPIC = "当天下午有小雨。记者现场看到排队的人不多。会场外停着几辆大巴。"
+
+
+def test_truncate_keeps_lead_and_salient_sentences():
+    text = LEAD + OFF_TOPIC + ON_TOPIC + "活动持续到傍晚结束。"
+    out = truncate_to_budget(text, budget=estimate_tokens(LEAD) + estimate_tokens(ON_TOPIC), lead_sentences=1)
+    assert out == LEAD + ON_TOPIC
+    assert truncate_to_budget("短文。", 100) == "短文。"
+
+
+def test_chunk_sentences_respects_budget():
+    text = "甲乙丙丁。" * 30 + "很" * 50 + "。"
+    chunks = chunk_sentences(text, budget=20)
+    assert all(estimate_tokens(c) <= 20 for c in chunks)
+    assert "".join(chunks) == text
+
+
+def test_clip_summary():
+    assert clip_summary("一二三。四五六七八九", 8) == "一二三。"
+    assert clip_summary("一二三四五六七八九十", 5) == "一二三四五"
+    assert clip_summary("短句", 10) == "短句"
+
+
+def _summarizer(calls):
+    def fake(prompt_value):
+        article = prompt_value.to_string().split("【新闻正文】:")[-1]
+        calls.append(article)
+        return json.dumps({"summary": "要点" * 40, "keywords": ["汽车", f"k{len(calls)}"]})
+
+    return LLMSummarizerImpl(
+        llm=RunnableLambda(fake), input_token_budget=30, map_reduce_tokens=60, map_concurrency=2
+    )
+
+
+def test_medium_article_is_truncated_before_llm():
+    calls = []
+    _summarizer(calls).summarize("句子内容很多。" * 6)  # ~42 tokens: 截断而非 map-reduce
+    assert len(calls) == 1 and estimate_tokens(calls[0]) <= 30
+
+
+def test_long_article_map_reduce_respects_max_chars():
+    calls = []
+    summarizer = _summarizer(calls)
+    text = "句子内容很多。" * 20  # ~140 tokens
+    result = summarizer.summarize(text, max_chars=20)
+    n_chunks = len(chunk_sentences(text, 30))
+    assert len(calls) == n_chunks + 1  # map + reduce
+    assert len(result.summary) <= 20
+    assert result.keywords[0] == "汽车" and "汽车" in result.keywords
+
+    calls.clear()
+    result = asyncio.run(summarizer.summarize_async(text, max_chars=20))
+    assert len(calls) == n_chunks + 1 and len(result.summary) <= 20
+
+    calls.clear()
+    out = summarizer.summarize_batch([text, "短文。"], max_chars=20)
+    assert len(out[0].summary) <= 20 and len(calls) == n_chunks + 2
+
+
+def test_every_path_clips_summary_to_max_chars():
+    summarizer = _summarizer([])
+    assert len(summarizer.summarize("短文。", max_chars=10).summary) <= 10
+    assert len(asyncio.run(summarizer.summarize_async("短文。", max_chars=10)).summary) <= 10
+    assert all(len(r.summary) <= 10 for r in summarizer.summarize_batch(["短文一。", "短文二。"], max_chars=10))
+
+    packed = json.dumps([{"id": i, "summary": "要点" * 40, "keywords": ["汽车"]} for i in (1, 2)])
+    summarizer = LLMSummarizerImpl(llm=RunnableLambda(lambda _: packed))
+    assert [len(r.summary) for r in summarizer.summarize_pack(["甲。", "乙。"], max_chars=10)] == [10, 10]
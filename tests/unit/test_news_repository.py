@@ -0,0 +1,195 @@
+import importlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from algo.summarizers.llm_summarizer import SummaryResult
+from repo import LeaseHeartbeat, SqlNewsRepository
+from repo.news_repository import parse_index_params, vector_index_ddl
+
+T0 = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SqlNewsRepository(f"sqlite:///{tmp_path / 'news.db'}")
+    with repo.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, created_at TIMESTAMP, title TEXT, text TEXT,"
+            " summary TEXT, keywords TEXT, embedding TEXT)"
+        ))
+        # 每 3 行共用一个时间戳，id 与时间顺序交错
+        rows = [{"id": 100 - i, "ts": T0 + timedelta(minutes=i // 3), "t": f"新闻{i}"} for i in range(10)]
+        conn.execute(text("INSERT INTO articles (id, created_at, title, text) VALUES (:id, :ts, :t, :t)"), rows)
+    yield repo
+    repo.dispose()
+
+
+def _all_ids(repo):
+    with repo.engine.connect() as conn:
+        return {r[0] for r in conn.execute(text("SELECT id FROM articles"))}
+
+
+def test_keyset_pages_do_not_skip_shared_timestamps(repo):
+    seen, after_ts, after_id = [], datetime.min, None
+    while True:
+        page = repo.fetch_without_abstract(after_ts=after_ts, limit=2, after_id=after_id)
+        if not page:
+            break
+        seen += [r[0] for r in page]
+        after_ts, after_id = page[-1][1], page[-1][0]
+    assert len(seen) == len(set(seen)) == 10 and set(seen) == _all_ids(repo)
+
+    # 旧的纯时间戳游标会跳过与页尾同时间戳的行
+    first = repo.fetch_without_abstract(after_ts=datetime.min, limit=2)
+    assert len(repo.fetch_without_abstract(after_ts=first[-1][1], limit=100)) < 8
+
+
+def test_iterator_streams_in_chunks_and_resumes(repo):
+    chunks = list(repo.iter_without_embedding(chunk_size=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    rows = [r for c in chunks for r in c]
+    assert [r[0] for r in rows] == [98, 99, 100, 95, 96, 97, 92, 93, 94, 91]  # (时间戳, id) 升序
+
+    resumed = [r[0] for c in repo.iter_without_embedding(chunk_size=4, after=(rows[4][1], rows[4][0])) for r in c]
+    assert resumed == [r[0] for r in rows[5:]]
+    with pytest.raises(ValueError):
+        next(repo.iter_without_abstract(chunk_size=0))
+
+
+def test_abstract_pipeline_walks_all_rows(repo, monkeypatch):
+    monkeypatch.setenv("PG_CONN", "sqlite://")
+    pipeline = importlib.import_module("pipeline.news_abstract_process")
+    monkeypatch.setattr(pipeline, "CONNECTION_STRING", repo.conn_str)
+    monkeypatch.setattr(pipeline, "BATCH_SIZE", 3)
+    monkeypatch.setattr(pipeline, "summarize", lambda text, max_chars, config=None: SummaryResult(summary=text, keywords=[]))
+    pipeline.main_sync(dedup=False)
+    with repo.engine.connect() as conn:
+        missing = conn.execute(text("SELECT COUNT(*) FROM articles WHERE summary IS NULL")).scalar()
+    assert missing == 0
+
+
+def test_updates_fall_back_to_executemany_on_sqlite(repo):
+    assert not repo._use_bulk(10_000, None) and not repo._use_bulk(10, True)
+    repo.update_abstracts([(100, "摘要", ["芯片"]), (99, "旧", ["x"]), (99, "新", [])], bulk=True)
+    repo.update_embeddings([(100, [0.5, 1.0]), (100, [0.25, 0.75])], bulk=True)
+    with repo.engine.connect() as conn:
+        rows = dict(conn.execute(text("SELECT id, summary FROM articles WHERE summary IS NOT NULL")).fetchall())
+        kw = conn.execute(text("SELECT keywords, embedding FROM articles WHERE id = 100")).one()
+    assert rows == {100: "摘要", 99: "新"}  # 同一 id 以最后一次为准
+    assert json.loads(kw[0]) == ["芯片"] and json.loads(kw[1]) == [0.25, 0.75]
+
+
+def test_schema_helpers_build_partial_indexes_idempotently(repo):
+    ensure_indexes = importlib.import_module("pipeline.ensure_indexes")
+    report = ensure_indexes.build_indexes(repo, vector_size=4)
+    assert [(b["name"], b["created"]) for b in report["indexes"]] == [
+        ("articles_summary_pending_idx", True), ("articles_embedding_pending_idx", True),
+    ]
+    assert "SCAN articles" in " ".join(report["plans"]["abstract"]["before"])
+    assert "articles_summary_pending_idx" in " ".join(report["plans"]["abstract"]["after"])
+    assert [b.created for b in repo.ensure_abstract_schema() + repo.ensure_embedding_schema(4)] == [False, False]
+
+
+def test_vector_index_ddl_and_params():
+    assert parse_index_params("m=32, ef_construction=128", "hnsw") == {"m": 32, "ef_construction": 128}
+    with pytest.raises(ValueError):
+        parse_index_params("lists=10", "hnsw")
+    name, ddl = vector_index_ddl("public.articles", "ivfflat", "vector_l2_ops", {"lists": 100})
+    assert name == "articles_embedding_ivfflat_idx"
+    assert ddl == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS articles_embedding_ivfflat_idx ON public.articles"
+        " USING ivfflat (embedding vector_l2_ops) WITH (lists = 100)"
+    )
+
+
+def test_claims_are_disjoint_across_workers_and_leases_expire(repo):
+    a = repo.claim("abstract", worker="a", limit=4)
+    b = repo.claim("abstract", worker="b", limit=4)
+    assert [r[0] for r in a] == [98, 99, 100, 95] and not {r[0] for r in a} & {r[0] for r in b}
+
+    # a 崩溃：租约到期后其行可被接管；b 仍持有的行不受影响
+    repo.renew_claims("abstract", "a", [r[0] for r in a], lease_seconds=-1)
+    c = repo.claim("abstract", worker="c", limit=10)
+    assert {r[0] for r in c} == _all_ids(repo) - {r[0] for r in b}
+    assert repo.renew_claims("abstract", "a", [r[0] for r in a]) == 0  # 租约已被接管
+
+
+def test_iter_claimed_splits_work_between_concurrent_workers(repo):
+    done = {}
+    lock = threading.Lock()
+
+    def work(name):
+        for batch in repo.iter_claimed("abstract", worker=name, chunk_size=2):
+            with lock:
+                for r in batch:
+                    done.setdefault(r[0], []).append(name)
+            time.sleep(0.01)
+            repo.update_abstracts([(r[0], "摘要", []) for r in batch])
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(done) == _all_ids(repo) and all(len(v) == 1 for v in done.values())
+    with repo.engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM articles_claims")).scalar() == 0
+
+
+def test_heartbeat_renews_and_early_exit_releases(repo):
+    batch = repo.claim("embedding", worker="a", limit=3, lease_seconds=0.2)
+    beat = LeaseHeartbeat(repo, "embedding", "a", [r[0] for r in batch], 0.2, interval=0.02).start()
+    time.sleep(0.3)
+    beat.stop()
+    assert beat.renewals >= 2
+    assert not {r[0] for r in repo.claim("embedding", worker="b", limit=10)} & {r[0] for r in batch}
+
+    it = repo.iter_claimed("abstract", worker="x", chunk_size=4)
+    first = next(it)
+    it.close()  # 未处理即退出：立即释放
+    assert [r[0] for r in repo.claim("abstract", worker="y", limit=4)] == [r[0] for r in first]
+
+
+def test_abstract_pipeline_claim_mode(repo, monkeypatch):
+    monkeypatch.setenv("PG_CONN", "sqlite://")
+    pipeline = importlib.import_module("pipeline.news_abstract_process")
+    monkeypatch.setattr(pipeline, "CONNECTION_STRING", repo.conn_str)
+    monkeypatch.setattr(pipeline, "BATCH_SIZE", 4)
+    monkeypatch.setattr(pipeline, "summarize", lambda text, max_chars, config=None: SummaryResult(summary=text, keywords=[]))
+    pipeline.main_sync(dedup=False, claim=True, worker="w1")
+    with repo.engine.connect() as conn:
+        missing = conn.execute(text("SELECT COUNT(*) FROM articles WHERE summary IS NULL")).scalar()
+    assert missing == 0
+
+
+def test_embedding_backfill_builds_vector_index_after_load(repo, monkeypatch):
+    backfill = importlib.import_module("pipeline.backfill_embeddings")
+    events = []
+
+    class _Recording(SqlNewsRepository):
+        def ensure_embedding_schema(self, vector_size=1024, **kwargs):
+            events.append(("schema", kwargs.get("vector_index", "default")))
+            return super().ensure_embedding_schema(vector_size, **kwargs)
+
+        def update_embeddings(self, rows, **kwargs):
+            events.append(("update", None))
+            return super().update_embeddings(rows, **kwargs)
+
+    class _FakeEmbeddings:
+        def __init__(self, **kwargs):
+            pass
+
+        def embed_documents(self, texts):
+            return [[0.0, 1.0] for _ in texts]
+
+    monkeypatch.setattr(backfill, "CONNECTION_STRING", repo.conn_str)
+    monkeypatch.setattr(backfill, "BATCH_SIZE", 4)
+    monkeypatch.setattr(backfill, "SqlNewsRepository", _Recording)
+    monkeypatch.setattr(backfill, "OllamaEmbeddings", _FakeEmbeddings)
+    backfill.main()
+    assert events == [("schema", None)] + [("update", None)] * 3 + [("schema", "default")]
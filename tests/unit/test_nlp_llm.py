@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from benchmarks.fake_llm import FakeChatModel
+from common.models import ArticleInput
+from common.protocol import Context
+from processors.nlp_llm import LLMNlpExtractor
+from runner.dag import ProviderConflictError
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  ensure registration
+import processors.event_llm  # noqa: F401  ensure registration
+
+TEXT = "华为发布新一代芯片。业内人士认为此举将巩固地位。"
+
+
+class CountingLLM(FakeChatModel):
+    calls: int = 0
+
+    def respond(self, prompt: str) -> str:
+        self.calls += 1
+        return super().respond(prompt)
+
+
+def test_single_call_provides_all_fields():
+    llm = CountingLLM(latency=0.0)
+    out = LLMNlpExtractor(llm=llm, max_chars=6).run({"clean_text": TEXT}, Context())
+    assert llm.calls == 1
+    assert out["summary"] == "华为发布新一" and out["keywords"]
+    assert [e.trigger for e in out["events"]] == ["发布"]
+
+
+def test_flow_runner_replaces_two_steps():
+    llm = CountingLLM(latency=0.0)
+    articles = [ArticleInput(title="t", text=TEXT), ArticleInput(title="t", text="今天天气不错。")]
+    with FlowRunner(["cleaner", "nlp_llm"], configs={"nlp_llm": {"llm": llm}}) as runner:
+        results = list(runner.process_many(articles, ordered=True))
+    assert llm.calls == 2 and not any(r.errors for r in results)
+    assert results[0].summary and results[0].keywords and results[0].events
+    assert results[1].events == []
+
+    with pytest.raises(ProviderConflictError):
+        FlowRunner(["cleaner", "nlp_llm", "event_llm"], configs={"nlp_llm": {"llm": llm}}).plan
+
+
+def test_batch_isolates_failures_and_async():
+    def fake(prompt_value):
+        if "坏" in prompt_value.to_string():
+            raise RuntimeError("boom")
+        return '{"summary": "摘要", "keywords": ["芯片"], "events": []}'
+
+    proc = LLMNlpExtractor(llm=RunnableLambda(fake))
+    outs = proc.run_batch([{"clean_text": "好新闻。"}, {"clean_text": "坏新闻。"}, {"clean_text": ""}], Context())
+    assert outs[0]["summary"] == "摘要" and isinstance(outs[1], RuntimeError)
+    assert outs[2] == {"summary": None, "keywords": None, "events": []}
+    assert asyncio.run(proc.arun({"clean_text": "好新闻。"}, Context()))["keywords"] == ["芯片"]
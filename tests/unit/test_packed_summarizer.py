@@ -0,0 +1,67 @@
+import json
+
+from langchain_core.runnables import RunnableLambda
+
+from algo.summarizers.llm_summarizer import (
+    LLMSummarizerImpl,
+    estimate_tokens,
+    pack_by_budget,
+    parse_packed,
+)
+from benchmarks.fake_llm import FakeChatModel
+from common.models import ArticleInput
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  (register)
+import processors.summarizer  # noqa: F401  (register)
+
+
+def test_pack_by_budget_groups_short_and_isolates_long():
+    texts = ["短" * 100] * 5 + ["长" * 500] + ["短" * 100] * 3
+    groups = pack_by_budget(texts, token_budget=250, max_items=8, max_article_tokens=400)
+    assert [5] in groups
+    assert all(sum(estimate_tokens(texts[i]) for i in g) <= 250 for g in groups if len(g) > 1)
+    assert sorted(i for g in groups for i in g) == list(range(9))
+    assert max(len(g) for g in pack_by_budget(["短"] * 20, max_items=8)) == 8
+
+
+def test_parse_packed_tolerates_missing_and_malformed():
+    raw = json.dumps({"items": [
+        {"id": "2", "summary": "乙", "keywords": ["b"]},
+        {"id": "1", "summary": "甲"},  # 缺 keywords
+        {"id": "9", "summary": "越界", "keywords": []},
+    ]})
+    out = parse_packed(f"```json\n{raw}\n```", 3)
+    assert out[0] is None and out[1].summary == "乙" and out[2] is None
+    assert parse_packed("not json", 2) == [None, None]
+
+
+def test_summarize_packed_falls_back_to_single_calls():
+    calls = {"packed": 0, "single": 0}
+
+    def fake(prompt_value):
+        text = prompt_value.to_string()
+        if "【新闻 id=" in text:
+            calls["packed"] += 1
+            return json.dumps({"items": [{"id": "1", "summary": "P1", "keywords": ["k"]}]})
+        calls["single"] += 1
+        return json.dumps({"summary": "S", "keywords": ["k"]})
+
+    summarizer = LLMSummarizerImpl(llm=RunnableLambda(fake))
+    results = summarizer.summarize_packed(["甲新闻", "乙新闻", "丙新闻"])
+    assert [r.summary for r in results] == ["P1", "S", "S"]
+    assert calls == {"packed": 1, "single": 2}
+
+
+def test_flow_runner_packed_run_batch():
+    llm = FakeChatModel(latency=0.0)
+    articles = [ArticleInput(id=str(i), title="T", text=f"第{i}条快讯：华为发布新品。") for i in range(6)]
+    with FlowRunner(
+        steps=["cleaner", "summarizer_llm"],
+        configs={"summarizer_llm": {"llm": llm, "packed": True}},
+        batch_size=6,
+    ) as runner:
+        results = list(runner.process_many(articles, ordered=True))
+    assert [r.summary for r in results] == [a.text for a in articles]
+    assert all(not r.errors for r in results)
+    spans = [s for r in results for s in r.spans if s.processor == "summarizer_llm"]
+    assert {s.executor for s in spans} == {"batch"}  # 打包模式经 arun_batch 攒批
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from common.models import ArticleInput
+from common.protocol import register
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  (register)
+
+
+@register
+class _Lifecycle:
+    name = "test_lifecycle"
+    requires = {"clean_text"}
+    provides = {"summary"}
+    created = 0
+    setups = 0
+    teardowns = 0
+
+    def __init__(self, prefix: str = "", **cfg):
+        type(self).created += 1
+        self.prefix = prefix
+
+    def setup(self):
+        type(self).setups += 1
+
+    def teardown(self):
+        type(self).teardowns += 1
+
+    def run(self, data, ctx):
+        return {"summary": self.prefix + data["clean_text"]}
+
+
+@register
+class _NotThreadSafe:
+    name = "test_not_thread_safe"
+    requires = {"clean_text"}
+    provides = {"keywords"}
+    pool_size = 2
+    lock = threading.Lock()
+    busy: set = set()
+    overlap = False
+    peak = 0
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        cls = type(self)
+        with cls.lock:
+            if id(self) in cls.busy:
+                cls.overlap = True
+            cls.busy.add(id(self))
+            cls.peak = max(cls.peak, len(cls.busy))
+        time.sleep(0.02)
+        with cls.lock:
+            cls.busy.discard(id(self))
+        return {"keywords": [data["clean_text"]]}
+
+
+def test_processors_constructed_once_per_runner():
+    articles = [ArticleInput(id=str(i), title="T", text=f"正文{i}") for i in range(5)]
+    with FlowRunner(
+        steps=["cleaner", "test_lifecycle"], configs={"test_lifecycle": {"prefix": ">"}}
+    ) as runner:
+        first = runner.process(articles[0])
+        rest = list(runner.process_many(articles[1:], ordered=True))
+
+    assert first.summary == ">正文0"
+    assert [r.summary for r in rest] == [">正文1", ">正文2", ">正文3", ">正文4"]
+    assert _Lifecycle.created == 1
+    assert _Lifecycle.setups == 1
+    assert _Lifecycle.teardowns == 1
+
+
+def test_pool_size_bounds_instance_concurrency():
+    articles = [ArticleInput(id=str(i), title="T", text=f"正文{i}") for i in range(8)]
+    runner = FlowRunner(steps=["cleaner", "test_not_thread_safe"])
+    results = list(runner.process_many(articles, max_in_flight=8))
+    assert len(runner.plan.pools["test_not_thread_safe"].instances) == 2
+    runner.close()
+
+    assert len(results) == 8 and not any(r.errors for r in results)
+    assert not _NotThreadSafe.overlap
+    assert _NotThreadSafe.peak == 2
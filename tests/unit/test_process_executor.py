@@ -0,0 +1,50 @@
+import os
+
+from common.models import ArticleInput
+from common.protocol import register
+from runner.flow_runner import FlowRunner
+import processors.cleaner  # noqa: F401  (register)
+import processors.event_extractor  # noqa: F401
+
+
+@register
+class _PidTagger:
+    name = "test_pid_tagger"
+    requires = {"clean_text"}
+    provides = {"keywords"}
+    executor_kind = "process"
+    instances = 0
+
+    def __init__(self, **cfg):
+        type(self).instances += 1
+        self.instance_no = type(self).instances
+
+    def run(self, data, ctx):
+        assert set(data) == {"clean_text"}  # 只传输 requires 字段
+        sum(i * i for i in range(20000))
+        return {"keywords": [str(os.getpid()), str(self.instance_no)]}
+
+
+def test_process_kind_runs_in_worker_processes():
+    articles = [ArticleInput(id=str(i), title="T", text=f"正文{i}") for i in range(12)]
+    with FlowRunner(steps=["cleaner", "test_pid_tagger"], process_workers=2) as runner:
+        results = list(runner.process_many(articles, max_in_flight=6))
+
+    assert not any(r.errors for r in results)
+    pids = {r.keywords[0] for r in results}
+    assert str(os.getpid()) not in pids
+    assert 1 <= len(pids) <= 2
+    # 每个 worker 只实例化一次，因此所有结果的实例序号一致
+    assert len({r.keywords[1] for r in results}) == 1
+
+
+def test_executor_kind_override():
+    article = ArticleInput(title="T", text="苹果公司今日宣布推出全新iPhone 15系列。")
+    with FlowRunner(
+        steps=["cleaner", "event_dummy"],
+        executor_kinds={"cleaner": "async", "event_dummy": "process"},
+        process_workers=1,
+    ) as runner:
+        result = runner.process(article)
+
+    assert result.events[0].trigger == "宣布"
@@ -0,0 +1,69 @@
+import io
+import json
+import time
+
+from common.models import ArticleInput
+from common.protocol import register
+from runner.cache import ResultCache
+from runner.flow_runner import FlowRunner
+from runner.tracing import iter_spans, summarize_spans, to_otlp, write_jsonl
+import processors.cleaner  # noqa: F401  (register)
+
+
+@register
+class _Slow:
+    name = "test_traced_slow"
+    version = "2.0.0"
+    requires = {"clean_text"}
+    provides = {"summary"}
+
+    def __init__(self, **cfg):
+        pass
+
+    def run(self, data, ctx):
+        time.sleep(0.05)
+        if data["clean_text"] == "boom":
+            raise RuntimeError("boom")
+        return {"summary": data["clean_text"]}
+
+
+def _run(texts, **kw):
+    articles = [ArticleInput(id=str(i), title="T", text=t) for i, t in enumerate(texts)]
+    with FlowRunner(steps=["cleaner", "test_traced_slow"], **kw) as runner:
+        return list(runner.process_many(articles, ordered=True))
+
+
+def test_each_article_gets_own_trace_and_spans():
+    results = _run(["甲", "boom"])
+    assert results[0].trace_id and results[0].trace_id != results[1].trace_id
+
+    spans = {s.processor: s for s in results[0].spans}
+    assert set(spans) == {"cleaner", "test_traced_slow"}
+    slow = spans["test_traced_slow"]
+    assert slow.trace_id == results[0].trace_id
+    assert slow.executor == "thread" and slow.version == "2.0.0"
+    assert slow.exec_ms >= 45 and slow.queue_wait_ms >= 0
+    assert slow.start_at >= spans["cleaner"].end_at - 1e-3
+
+    failed = [s for s in results[1].spans if s.processor == "test_traced_slow"][0]
+    assert failed.error == "boom"
+
+
+def test_cache_hit_and_exports():
+    cache = ResultCache()
+    _run(["乙"], cache=cache)
+    results = _run(["乙"], cache=cache)
+    hit = [s for s in results[0].spans if s.processor == "test_traced_slow"][0]
+    assert hit.cache_hit and hit.executor == "cache" and hit.exec_ms < 45
+
+    buf = io.StringIO()
+    assert write_jsonl(iter_spans(results), buf) == 2
+    assert json.loads(buf.getvalue().splitlines()[0])["trace_id"] == results[0].trace_id
+
+    otlp = to_otlp(iter_spans(results))
+    otel_spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(otel_spans) == 2 and len(otel_spans[0]["traceId"]) == 32
+
+    report = summarize_spans(iter_spans(_run(["丙", "丁"])))
+    assert report[0]["processor"] == "test_traced_slow"
+    assert report[0]["count"] == 2
@@ -0,0 +1,108 @@
+import asyncio
+import io
+import json
+
+import pytest
+from langchain_community.chat_models import ChatOllama
+
+from algo.summarizers.llm_summarizer import LLMSummarizerImpl
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.fake_ollama import FakeOllamaServer
+from common.models import ArticleInput
+from common.protocol import Context
+from processors.event_llm import LLMEvtExtractor
+from runner.flow_runner import FlowRunner
+from runner.usage import TokenBudgetExceeded, UsageTracker, parse_prices
+import processors.cleaner  # noqa: F401  ensure registration
+import processors.summarizer  # noqa: F401  ensure registration
+
+TEXT = "华为发布新一代芯片。"
+
+
+def _articles(n):
+    return [ArticleInput(title="t", text=f"{TEXT}第{i}条。") for i in range(n)]
+
+
+def test_flow_runner_accounts_per_article_and_processor():
+    llm = FakeChatModel(latency=0.0)
+    usage = UsageTracker(prices={"fake-chat": (1.0, 2.0)}, keep_calls=100, keep_articles=100)
+    configs = {"summarizer_llm": {"llm": llm}, "event_llm": {"llm": llm}}
+    with FlowRunner(["cleaner", "summarizer_llm", "event_llm"], configs=configs, usage=usage) as runner:
+        results = list(runner.process_many(_articles(4)))  # 微批 run_batch 路径
+        results.append(runner.process(_articles(1)[0]))  # 单篇 arun 路径
+
+    report = usage.report()
+    assert report["by_processor"]["summarizer_llm"]["calls"] == 5
+    assert report["by_processor"]["event_llm"]["calls"] == 5
+    assert set(report["by_article"]) == {r.trace_id for r in results}
+    assert all(v["calls"] == 2 for v in report["by_article"].values())
+    total = report["total"]
+    assert total["total_tokens"] == sum(c.input_tokens + c.output_tokens for c in usage.calls)
+    assert total["cost"] == pytest.approx((total["input_tokens"] + 2 * total["output_tokens"]) / 1000)
+    assert not any(c.estimated for c in usage.calls) and report["by_model"]["fake-chat"]["calls"] == 10
+
+
+def test_packed_call_is_split_across_articles():
+    usage = UsageTracker(keep_calls=10, keep_articles=10)
+    summarizer = LLMSummarizerImpl(llm=FakeChatModel(latency=0.0))
+    configs = [usage.config("summarizer_llm", [t]) for t in ("a", "b")]
+    out = summarizer.summarize_packed(["第一篇短文。", "第二篇短文。"], 50, configs)
+    assert all(r.summary for r in out)
+    assert len(usage.calls) == 1 and usage.calls[0].trace_ids == ["a", "b"]
+    a, b = usage.article("a"), usage.article("b")
+    assert a["total_tokens"] == b["total_tokens"] == pytest.approx(usage.total.total_tokens / 2)
+
+
+def test_budget_rejects_calls_and_stops_stream():
+    usage = UsageTracker(budget_tokens=1)
+    proc = LLMEvtExtractor(llm=FakeChatModel(latency=0.0))
+    ctx = Context(callbacks=[usage])
+    proc.run({"clean_text": TEXT}, ctx)
+    assert usage.exhausted
+    with pytest.raises(TokenBudgetExceeded):
+        asyncio.run(proc.arun({"clean_text": TEXT}, ctx))
+    assert usage.report()["budget"]["rejected_calls"] == 1
+
+    usage = UsageTracker(budget_tokens=1)
+    llm = FakeChatModel(latency=0.0)
+    with FlowRunner(["cleaner", "event_llm"], configs={"event_llm": {"llm": llm}}, usage=usage) as runner:
+        results = list(runner.process_many(_articles(10), max_in_flight=1))
+    assert len(results) == 1 and usage.total.calls == 1
+
+
+def test_ollama_native_counts():
+    usage = UsageTracker(keep_calls=1)
+    with FakeOllamaServer() as url:
+        llm = ChatOllama(model="fake", base_url=url, format="json", temperature=0)
+        LLMEvtExtractor(llm=llm).run({"clean_text": TEXT}, Context(callbacks=[usage]))
+    call = usage.calls[0]
+    assert call.processor == "event_llm" and call.model == "fake"
+    assert not call.estimated and call.input_tokens > 0 and call.output_tokens > 0
+
+
+def test_retention_is_opt_in_and_bounded():
+    llm = FakeChatModel(latency=0.0)
+    proc = LLMEvtExtractor(llm=llm)
+
+    def run(usage, n):
+        for i in range(n):
+            proc.run({"clean_text": TEXT}, Context(callbacks=[usage], trace_id=f"a{i}"))
+
+    usage = UsageTracker()
+    run(usage, 5)
+    assert usage.total.calls == 5 and usage.by_model["fake-chat"].calls == 5
+    assert not usage.calls and not usage.by_article and "by_article" not in usage.report()
+
+    sink = io.StringIO()
+    usage = UsageTracker(keep_calls=2, keep_articles=3, calls_sink=sink)
+    run(usage, 5)
+    assert len(usage.calls) == 2 and list(usage.by_article) == ["a2", "a3", "a4"]
+    assert usage.report()["evicted_articles"] == 2 and usage.article("a0")["calls"] == 0
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [c["trace_ids"] for c in lines] == [[f"a{i}"] for i in range(5)]
+
+
+def test_parse_prices():
+    assert parse_prices("qwen3:4b=0.1/0.2, m=0/0") == {"qwen3:4b": (0.1, 0.2), "m": (0.0, 0.0)}
+    with pytest.raises(ValueError):
+        parse_prices("bad")